@@ -0,0 +1,281 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""
+Benchmarks for dependency graph construction, layout and rendering.
+
+Synthetic provenance graphs of different shapes and sizes are generated,
+and for each of them the script measures
+
+- construction of the :class:`SimpleGraph`,
+- the mean cost of a single :class:`GraphLayout` iteration,
+- the number of iterations and the time until the layout has converged,
+- the time of the :class:`LayeredGraphLayout`,
+- the peak memory allocated while setting up and iterating the layout,
+- the mean frame time of :meth:`DtoolGraphWidget.on_draw` on an offscreen
+  cairo surface (only if GTK is available).
+
+Results are written as JSON. Pass a previous result file to ``--compare``
+to list all timings that got slower by more than ``--tolerance``; the
+script then exits with a non-zero status, such that it can guard against
+performance regressions, e.g.
+
+    python benchmarks/graph_benchmark.py --output baseline.json
+    # ... modify code ...
+    python benchmarks/graph_benchmark.py --compare baseline.json
+
+All-pairs repulsion needs memory quadratic in the number of vertices,
+hence graphs larger than ``--exact-limit`` vertices are laid out with
+the cell-list cutoff given by ``--cutoff``.
+"""
+
+import argparse
+import functools
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from dtool_lookup_gui import __version__
+from dtool_lookup_gui.models.simple_graph import SimpleGraph, GraphLayout, LayeredGraphLayout
+
+logger = logging.getLogger(__name__)
+
+GRAPH_KINDS = ['chain', 'tree', 'hub', 'random']
+
+DEFAULT_SIZES = [10, 100, 1000, 20000]
+
+# Timings compared against a baseline, all others are informative
+TIMING_KEYS = ['construction_s', 'iteration_s', 'convergence_s', 'layered_s', 'draw_s']
+
+
+def parents(kind, nb_vertices, seed=0):
+    """List of parent indices of each vertex for the synthetic graph `kind`."""
+    rng = np.random.default_rng(seed)
+    if kind == 'chain':
+        # Each dataset derived from its predecessor
+        return [[i - 1] if i > 0 else [] for i in range(nb_vertices)]
+    elif kind == 'tree':
+        # Each dataset derived from one dataset, two datasets derived from each
+        return [[(i - 1) // 2] if i > 0 else [] for i in range(nb_vertices)]
+    elif kind == 'hub':
+        # All datasets derived from the root
+        return [[0] if i > 0 else [] for i in range(nb_vertices)]
+    elif kind == 'random':
+        # Each dataset derived from one to three recent datasets
+        return [sorted(set(rng.integers(max(0, i - 20), i, size=rng.integers(1, 4)).tolist()))
+                if i > 0 else [] for i in range(nb_vertices)]
+    raise ValueError(f"Unknown graph kind '{kind}', must be one of {GRAPH_KINDS}.")
+
+
+def build_graph(parents_of_vertex):
+    """Build graph like DependencyGraph does, vertex 0 is the root."""
+    graph = SimpleGraph()
+    for i in range(len(parents_of_vertex)):
+        graph.add_vertex(uuid=f'{i:08d}-0000-0000-0000-000000000000', name=f'dataset-{i}',
+                         kind='root' if i == 0 else 'dependent')
+    for i, parents_of_i in enumerate(parents_of_vertex):
+        for j in parents_of_i:
+            graph.add_edge(i, j)
+    return graph
+
+
+@functools.lru_cache(maxsize=None)
+def _graph_widget_class():
+    """Graph widget class, or None if GTK is not available."""
+    try:
+        import gi
+        gi.require_version('Gtk', '3.0')
+        from dtool_lookup_gui.widgets.graph_widget import DtoolGraphWidget
+    except Exception as exc:
+        logger.warning("Cannot render graphs, skip frame time measurements: %s", exc)
+        return None
+    return DtoolGraphWidget
+
+
+def _draw_frame_time(graph, nb_frames, width=800, height=600):
+    """Mean on_draw time in seconds on an offscreen surface, or None without GTK."""
+    widget_class = _graph_widget_class()
+    if widget_class is None:
+        return None
+    import cairo
+    widget = widget_class()
+
+    class Area:
+        def get_allocated_width(self):
+            return width
+
+        def get_allocated_height(self):
+            return height
+
+    # Layered positions are available without relaxation
+    widget.layout_engine = 'layered'
+    widget.graph = graph
+    widget.pause_layout()
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    try:
+        start = time.perf_counter()
+        for _ in range(nb_frames):
+            widget.on_draw(Area(), cairo.Context(surface))
+        return (time.perf_counter() - start) / nb_frames
+    finally:
+        widget._cancel_layout_worker()
+
+
+def benchmark(kind, nb_vertices, nb_iterations=10, max_iterations=200, exact_limit=2000, cutoff=8.,
+              nb_frames=5, draw=True, seed=0):
+    """Run all measurements for one synthetic graph, return them as dictionary."""
+    parents_of_vertex = parents(kind, nb_vertices, seed=seed)
+    result = {'kind': kind, 'nb_vertices': nb_vertices}
+
+    start = time.perf_counter()
+    graph = build_graph(parents_of_vertex)
+    result['construction_s'] = time.perf_counter() - start
+    result['nb_edges'] = graph.nb_edges
+
+    cutoff = None if nb_vertices <= exact_limit else cutoff
+    result['cutoff'] = cutoff
+
+    # Peak memory of setting up the layout and one iteration; measured
+    # separately as tracing allocations slows down the timings below
+    tracemalloc.start()
+    GraphLayout(graph, init_iter=1, cutoff=cutoff)
+    result['peak_memory_mib'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    layout = GraphLayout(graph, init_iter=0, cutoff=cutoff)
+    start = time.perf_counter()
+    for _ in range(nb_iterations):
+        layout.iterate()
+    result['iteration_s'] = (time.perf_counter() - start) / nb_iterations
+
+    layout = GraphLayout(graph, init_iter=0, cutoff=cutoff)
+    nb_converged_iterations = 0
+    start = time.perf_counter()
+    while not layout.converged and nb_converged_iterations < max_iterations:
+        layout.iterate()
+        nb_converged_iterations += 1
+    result['convergence_s'] = time.perf_counter() - start
+    result['nb_iterations_to_convergence'] = nb_converged_iterations
+    result['converged'] = bool(layout.converged)
+    result['max_force'] = float(layout.max_force)
+
+    start = time.perf_counter()
+    LayeredGraphLayout(graph)
+    result['layered_s'] = time.perf_counter() - start
+
+    result['draw_s'] = _draw_frame_time(graph, nb_frames) if draw else None
+
+    logger.info("%s", result)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Return list of descriptions of timings slower than baseline by more than tolerance."""
+    baseline_results = {(r['kind'], r['nb_vertices']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        reference = baseline_results.get((result['kind'], result['nb_vertices']))
+        if reference is None:
+            continue
+        for key in TIMING_KEYS:
+            value, reference_value = result.get(key), reference.get(key)
+            if value is None or not reference_value:
+                continue
+            if value > (1 + tolerance) * reference_value:
+                regressions += [f"{result['kind']} graph with {result['nb_vertices']} vertices: "
+                                f"{key} {value:.3g} s vs. {reference_value:.3g} s "
+                                f"(+{100 * (value / reference_value - 1):.0f}%)"]
+    return regressions
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--kinds', nargs='+', choices=GRAPH_KINDS, default=GRAPH_KINDS,
+                        help='shapes of the synthetic graphs')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help='numbers of vertices of the synthetic graphs')
+    parser.add_argument('--iterations', type=int, default=10,
+                        help='number of iterations to average the per-iteration cost over')
+    parser.add_argument('--max-iterations', type=int, default=200,
+                        help='give up waiting for convergence after this many iterations')
+    parser.add_argument('--exact-limit', type=int, default=2000,
+                        help='lay out larger graphs with a repulsion cutoff')
+    parser.add_argument('--cutoff', type=float, default=8.,
+                        help='repulsion cutoff for graphs beyond the exact limit')
+    parser.add_argument('--frames', type=int, default=5,
+                        help='number of frames to average the draw time over')
+    parser.add_argument('--no-draw', action='store_true',
+                        help='skip measuring the frame time')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for random graphs')
+    parser.add_argument('--output', '-o',
+                        help='write JSON results to this file instead of stdout')
+    parser.add_argument('--compare',
+                        help='JSON results of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative slowdown reported as regression')
+    parser.add_argument('--verbose', '-v', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    results = [benchmark(kind, nb_vertices, nb_iterations=args.iterations,
+                         max_iterations=args.max_iterations, exact_limit=args.exact_limit,
+                         cutoff=args.cutoff, nb_frames=args.frames, draw=not args.no_draw,
+                         seed=args.seed)
+               for kind in args.kinds for nb_vertices in args.sizes]
+
+    report = {
+        'metadata': {
+            'version': __version__,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(run())
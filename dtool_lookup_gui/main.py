@@ -153,6 +153,7 @@ class Application(Gtk.Application):
                 logger.warning("Could not load app icons.")
             win.connect("destroy", self.on_window_destroy)
             self.loop.call_soon(win.refresh)  # Populate widgets after event loop starts
+            self.loop.call_soon(win.offer_copy_resume)
 
         logger.debug("Present main window.")
         win.present()
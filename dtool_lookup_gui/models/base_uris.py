@@ -23,6 +23,7 @@
 # SOFTWARE.
 #
 
+import asyncio
 import logging
 
 from io import StringIO
@@ -36,6 +37,7 @@ from dtool_create.dataset import _get_readme_template
 from dtool_lookup_api.core.LookupClient import ConfigurationBasedLookupClient
 
 from .datasets import DatasetModel
+from .provenance_index import ProvenanceIndex
 from .settings import settings
 
 
@@ -51,6 +53,7 @@ class BaseURI:
     def __init__(self, uri_name):
         self._uri_name = uri_name
         self._cache = None
+        self._provenance_index = None
 
     def __str__(self):
         return f'{self.scheme}://{self.uri_name}'
@@ -61,8 +64,17 @@ class BaseURI:
     async def all_datasets(self):
         if self._cache is None or not self._use_cache:
             self._cache = await DatasetModel.all(str(self))
+            # Index provenance from the harvested READMEs along with the listing
+            loop = asyncio.get_running_loop()
+            self._provenance_index = await loop.run_in_executor(
+                None, ProvenanceIndex.from_datasets, self._cache)
         return self._cache
 
+    @property
+    def provenance_index(self):
+        """Provenance of datasets found by last listing, None if never listed."""
+        return self._provenance_index
+
     # causes trouble for python < 3.9,
     # see https://docs.python.org/3.9/library/functions.html#classmethod or
     #     https://stackoverflow.com/questions/128573/using-property-on-classmethods/64738850#64738850
@@ -237,6 +249,7 @@ class LookupBaseURIModel(BaseURI):
         p = generous_parse_uri(base_uri)
         self._scheme = p.scheme
         self._uri_name = p.netloc
+        self._provenance_index = None
 
 
 _base_uri_models = [S3BaseURIModel, SMBBaseURIModel]
@@ -25,12 +25,16 @@
 #
 
 import asyncio
+import errno
+import functools
 import logging
 import os
 import json
+import shutil
+import threading
 
 import yaml
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 import dtoolcore
 from dtoolcore.utils import generous_parse_uri
@@ -39,6 +43,9 @@ from dtool_info.utils import date_fmt, sizeof_fmt
 from dtool_info.inventory import _dataset_info
 from dtool_lookup_api.core.LookupClient import ConfigurationBasedLookupClient
 
+from .hash_index import HashIndex
+from .settings import settings
+from ..utils.bandwidth import acquire_bandwidth
 from ..utils.logging import _log_nested
 from ..utils.multiprocessing import StatusReportingChildProcessBuilder, process_initializer
 from ..utils.progressbar import ProgressBar
@@ -47,20 +54,406 @@ from ..utils.progressbar import ProgressBar
 logger = logging.getLogger(__name__)
 
 
+class ItemSizeProgressBar:
+    """Translate per-item progress updates into bytes.
+
+    dtoolcore reports one update per item copied or hashed and sets
+    item_show_func to return the item's relpath (or handle) just before.
+    This looks up the size of that item in the source manifest and forwards
+    it in bytes. Unknown items count with the mean item size.
+
+    Items skipped since they exist at the destination already are reported
+    without setting item_show_func. dtoolcore walks the items in manifest
+    order, hence such an update refers to the item at the same position in
+    the manifest. sizes must be in manifest order."""
+    def __init__(self, progressbar, sizes):
+        self._progressbar = progressbar
+        self._sizes = sizes
+        self._ordered_sizes = list(sizes.values())
+        self._mean_size = sum(sizes.values()) / len(sizes) if sizes else 0
+        self._nb_updates = 0
+        self._item_show_func = None
+        # whether item_show_func has been set for the next update
+        self._item_shown = False
+        self.label = None
+
+    @property
+    def item_show_func(self):
+        return self._item_show_func
+
+    @item_show_func.setter
+    def item_show_func(self, item_show_func):
+        self._item_show_func = item_show_func
+        self._item_shown = True
+
+    def update(self, step):
+        if self._item_shown:
+            size = self._sizes.get(self._item_show_func(None), self._mean_size)
+        elif self._nb_updates < len(self._ordered_sizes):
+            size = self._ordered_sizes[self._nb_updates]
+        else:
+            size = self._mean_size
+        self._item_shown = False
+        self._nb_updates += step
+        self._progressbar.update(step * size)
+
+
+class TransferProgress:
+    """Tell transfer and freeze of a copy apart in its progress reports.
+
+    A copy reports every byte twice, first when transferred and then when
+    hashed at freeze. One update per item arrives in either phase, hence
+    ItemSizeProgressBar reports exactly num_bytes while transferring. This
+    forwards progress to progressbar together with the bytes transferred so
+    far, such that hashing does not count as throughput."""
+    def __init__(self, progressbar, num_bytes):
+        self._progressbar = progressbar
+        self._num_bytes = num_bytes
+
+    def set_step(self, step, length):
+        self._progressbar.set_step(step, length, transferred=min(step, self._num_bytes))
+
+    def __getattr__(self, name):
+        return getattr(self._progressbar, name)
+
+
+def _item_sizes(manifest):
+    """Map relpath to size in bytes for all items of a manifest"""
+    return {properties["relpath"]: properties["size_in_bytes"] for properties in manifest["items"].values()}
+
+
+def _free_bytes(uri):
+    """Free space at a file URI, of its closest existing ancestor if it does not exist yet.
+
+    Returns None for other schemes."""
+    parsed_uri = generous_parse_uri(uri)
+    if parsed_uri.scheme != "file":
+        return None
+    path = parsed_uri.path
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    return shutil.disk_usage(path).free
+
+
+class CopyPlan:
+    """Source manifest and destination of a copy, determined once before the copy starts.
+
+    The plan is handed to the child process that runs the copy, so the
+    manifest and admin metadata are not read again there."""
+    def __init__(self, src_uri, target_base_uri, dest_uri, manifest, resume, free_bytes=None,
+                 admin_metadata=None):
+        self.src_uri = src_uri
+        self.target_base_uri = target_base_uri
+        self.dest_uri = dest_uri
+        self.manifest = manifest
+        self.admin_metadata = admin_metadata
+        self.resume = resume
+        self.free_bytes = free_bytes
+        self.item_sizes = _item_sizes(manifest)
+
+    @property
+    def num_items(self):
+        return len(self.manifest["items"])
+
+    @property
+    def num_bytes(self):
+        return sum(self.item_sizes.values())
+
+
+def plan_copy(uri, target_base_uri, resume=False, auto_resume=True, config_path=None):
+    """Pre-flight check of copying dataset at uri to target_base_uri.
+
+    Reads the source manifest once, decides whether to resume a previous
+    copy and, for file URIs, checks that the destination has enough free
+    space for a new copy. Raises FileExistsError if the dataset exists at
+    the destination and should not be resumed, OSError if space is short."""
+    dataset = dtoolcore.DataSet.from_uri(uri, config_path=config_path)
+    manifest = dataset._manifest
+
+    dest_uri = dtoolcore._generate_uri(
+        admin_metadata=dataset._admin_metadata,
+        base_uri=target_base_uri
+    )
+
+    is_dataset = dtoolcore._is_dataset(dest_uri, config_path=config_path)
+    if resume or (auto_resume and is_dataset):
+        # copy resume
+        resume = True
+    elif is_dataset:
+        # don't resume
+        raise FileExistsError("Dataset already exists: {}".format(dest_uri))
+    else:
+        # If the destination URI is a "file" dataset one needs to check if
+        # the path already exists and exit gracefully if true.
+        parsed_dataset_uri = generous_parse_uri(dest_uri)
+        if parsed_dataset_uri.scheme == "file":
+            if os.path.exists(parsed_dataset_uri.path):
+                raise FileExistsError(
+                    "Path already exists: {}".format(parsed_dataset_uri.path))
+
+    plan = CopyPlan(uri, target_base_uri, dest_uri, manifest, resume, _free_bytes(target_base_uri),
+                    admin_metadata=dataset._admin_metadata)
+
+    # a resumed copy needs less, but we do not know how much is there already
+    if not resume and plan.free_bytes is not None and plan.num_bytes > plan.free_bytes:
+        raise OSError(errno.ENOSPC,
+                      f"Not enough space at {target_base_uri}: dataset needs {sizeof_fmt(plan.num_bytes).strip()}, "
+                      f"{sizeof_fmt(plan.free_bytes).strip()} available")
+
+    logger.debug(f"Planned copy of {plan.num_items} items, {plan.num_bytes} bytes from {uri} to {dest_uri}.")
+    return plan
+
+
 class CopyFuncWrapper:
     def __init__(self, copy_func):
         self._copy_func = copy_func
 
-    def __call__(self, src_uri, dest_base_uri, status_report_callback):
-        """Wraps a dtool copy_func into interface compatible with StatusReportingChildProcessBuilder"""
-        self._copy_func(
-            src_uri=src_uri,
-            dest_base_uri=dest_base_uri,
+    def __call__(self, plan, status_report_callback):
+        """Wraps a dtool copy_func into interface compatible with StatusReportingChildProcessBuilder
+
+        Progress is reported in bytes, see ItemSizeProgressBar."""
+        return self._copy_func(
+            src_uri=plan.src_uri,
+            dest_base_uri=plan.target_base_uri,
             config_path=None,
-            progressbar=status_report_callback,
+            progressbar=ItemSizeProgressBar(status_report_callback, plan.item_sizes),
         )
 
 
+_known_manifest_storage_broker_classes = {}
+
+
+def _known_manifest_storage_broker_class(uri):
+    """Storage broker class for uri that serves a manifest passed on construction.
+
+    Storage brokers read the manifest again to locate every single item. The
+    manifest of a frozen dataset does not change, hence the subclass returns
+    the known one instead."""
+    StorageBroker = dtoolcore._generate_storage_broker_lookup()[generous_parse_uri(uri).scheme]
+    if StorageBroker not in _known_manifest_storage_broker_classes:
+        class KnownManifestStorageBroker(StorageBroker):
+            def __init__(self, uri, config_path=None, manifest=None):
+                super().__init__(uri, config_path)
+                self._known_manifest = manifest
+
+            def get_manifest(self):
+                return self._known_manifest
+
+        KnownManifestStorageBroker.__name__ = f'KnownManifest{StorageBroker.__name__}'
+        _known_manifest_storage_broker_classes[StorageBroker] = KnownManifestStorageBroker
+    return _known_manifest_storage_broker_classes[StorageBroker]
+
+
+class _PlannedDataSet(dtoolcore.DataSet):
+    """Frozen dataset whose admin metadata and manifest are known already, e.g. from a CopyPlan.
+
+    Nothing is read from storage to set it up. Its storage broker serves
+    the known manifest."""
+
+    def __init__(self, uri, admin_metadata, manifest, config_path=None):
+        # Like dtoolcore._BaseDataSet.__init__, but with a broker that knows the manifest
+        uri = dtoolcore.utils.sanitise_uri(uri)
+        self._admin_metadata = admin_metadata
+        self._storage_broker = _known_manifest_storage_broker_class(uri)(uri, config_path, manifest)
+        self._uri = uri
+        self._manifest_cache = manifest
+
+
+def _load_source_dataset(uri, config_path=None, manifest=None, admin_metadata=None):
+    """Load a frozen dataset, reusing its manifest and admin metadata if already known"""
+    if manifest is None:
+        return dtoolcore.DataSet.from_uri(uri, config_path=config_path)
+    if admin_metadata is None:
+        admin_metadata = dtoolcore.DataSet.from_uri(uri, config_path=config_path)._admin_metadata
+    return _PlannedDataSet(uri, admin_metadata, manifest, config_path)
+
+
+class _ThreadLocalDatasets(threading.local):
+    """Source and destination dataset instances private to a worker thread.
+
+    Storage brokers (e.g. boto3 resources in dtool-s3) are not guaranteed to
+    be thread-safe, hence every worker thread sets up its own instances when
+    it first uses them."""
+
+    def __init__(self, src_uri, dest_uri, config_path, manifest=None, admin_metadata=None):
+        self.src_uri = src_uri
+        self.dest_uri = dest_uri
+        self.config_path = config_path
+        self.manifest = manifest
+        self.admin_metadata = admin_metadata
+        self._src_dataset = None
+        self._dest_proto_dataset = None
+        self.duplicate_datasets = {}
+
+    @property
+    def src_dataset(self):
+        if self._src_dataset is None:
+            self._src_dataset = _load_source_dataset(self.src_uri, self.config_path, self.manifest,
+                                                     self.admin_metadata)
+        return self._src_dataset
+
+    @property
+    def dest_proto_dataset(self):
+        if self._dest_proto_dataset is None:
+            self._dest_proto_dataset = dtoolcore.ProtoDataSet.from_uri(self.dest_uri, config_path=self.config_path)
+        return self._dest_proto_dataset
+
+    def duplicate_dataset(self, uri):
+        if uri not in self.duplicate_datasets:
+            self.duplicate_datasets[uri] = dtoolcore.DataSet.from_uri(uri, config_path=self.config_path)
+        return self.duplicate_datasets[uri]
+
+
+def _parallel_copy_content(src_dataset, dest_proto_dataset, config_path=None, progressbar=None, max_workers=4,
+                           hash_index=None, bandwidth_limits=()):
+    """Transfer items concurrently, then README, tags, overlays and annotations.
+
+    Mirrors dtoolcore._copy_content: items already present at the destination
+    with matching size are skipped, and progressbar.update(1) is called once
+    per item. All calls to the progressbar happen on the calling thread.
+
+    Items whose hash is found in hash_index are copied from that duplicate
+    next to the destination instead of from the source. If this fails, e.g.
+    since the duplicate has been removed meanwhile, the item is transferred
+    from the source.
+
+    Transfers from the source wait for the BandwidthLimits in bandwidth_limits
+    before every item. Limits apply per item, a single large item is
+    transferred at full speed and delays the items after it accordingly."""
+    dest_storage_broker = dest_proto_dataset._storage_broker
+    dest_sizes = {}
+    for handle in dest_storage_broker.iter_item_handles():
+        dest_sizes[dtoolcore.utils.generate_identifier(handle)] = dest_storage_broker.get_size_in_bytes(handle)
+
+    thread_datasets = _ThreadLocalDatasets(src_dataset.uri, dest_proto_dataset.uri, config_path,
+                                           src_dataset._manifest, src_dataset._admin_metadata)
+
+    def put_item(identifier, relpath, size_in_bytes, duplicate):
+        if duplicate is not None:
+            duplicate_uri, duplicate_identifier = duplicate
+            try:
+                duplicate_abspath = thread_datasets.duplicate_dataset(duplicate_uri).item_content_abspath(
+                    duplicate_identifier)
+                thread_datasets.dest_proto_dataset.put_item(duplicate_abspath, relpath)
+                logger.debug(f"Copied {relpath} from duplicate in {duplicate_uri}")
+                return relpath
+            except Exception as exc:
+                logger.warning(f"Could not copy {relpath} from duplicate in {duplicate_uri}, "
+                               f"transferring from source instead: {exc}")
+        acquire_bandwidth(bandwidth_limits, size_in_bytes)
+        src_abspath = thread_datasets.src_dataset.item_content_abspath(identifier)
+        thread_datasets.dest_proto_dataset.put_item(src_abspath, relpath)
+        return relpath
+
+    hash_function = src_dataset._manifest["hash_function"]
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = []
+        for identifier in src_dataset.identifiers:
+            src_properties = src_dataset.item_properties(identifier)
+            if dest_sizes.get(identifier) == src_properties["size_in_bytes"]:
+                if progressbar:
+                    progressbar.item_show_func = lambda x, relpath=src_properties["relpath"]: relpath
+                    progressbar.update(1)
+                continue
+            duplicate = None
+            if hash_index is not None:
+                duplicate = hash_index.lookup(hash_function, src_properties["hash"])
+            futures.append(executor.submit(put_item, identifier, src_properties["relpath"],
+                                           src_properties["size_in_bytes"], duplicate))
+
+        for future in as_completed(futures):
+            relpath = future.result()
+            if progressbar:
+                progressbar.item_show_func = lambda x: relpath
+                progressbar.update(1)
+    finally:
+        # on failure, do not start any further transfers
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    dest_proto_dataset.put_readme(src_dataset.get_readme_content())
+
+    for tag in src_dataset.list_tags():
+        dest_proto_dataset.put_tag(tag)
+
+    for overlay_name in src_dataset.list_overlay_names():
+        dest_proto_dataset._put_overlay(overlay_name, src_dataset.get_overlay(overlay_name))
+
+    for annotation_name in src_dataset.list_annotation_names():
+        dest_proto_dataset.put_annotation(annotation_name, src_dataset.get_annotation(annotation_name))
+
+
+def _destination_hash_index(dest_base_uri, config_path, deduplicate):
+    """Up to date hash index of the destination or None if not deduplicating.
+
+    Copying a duplicate only saves the transfer if the destination holds its
+    items locally, hence deduplication applies to file base URIs only."""
+    if not deduplicate:
+        return None
+    if generous_parse_uri(dest_base_uri).scheme != 'file':
+        logger.info(f"Deduplication is only supported for local destinations, not for {dest_base_uri}.")
+        return None
+    hash_index = HashIndex(dest_base_uri)
+    hash_index.update(config_path)
+    return hash_index
+
+
+def parallel_copy(src_uri, dest_base_uri, config_path=None, progressbar=None, max_workers=4, deduplicate=False,
+                  manifest=None, bandwidth_limits=(), admin_metadata=None):
+    """Copy a dataset like dtoolcore.copy, transferring items concurrently.
+
+    :param src_uri: URI of dataset to be copied
+    :param dest_base_uri: base of URI for copy target
+    :param config_path: path to dtool configuration file
+    :param max_workers: number of items transferred at the same time
+    :param deduplicate: copy items already held by datasets at the destination
+        base URI from there instead of from the source
+    :param manifest: manifest of the source dataset if already known, e.g. from a CopyPlan
+    :param bandwidth_limits: BandwidthLimits that transfers from the source must obey
+    :param admin_metadata: admin metadata of the source dataset if already known
+    :returns: URI of new dataset
+    """
+    logger.debug(f"Parallel copy {src_uri} -> {dest_base_uri} with {max_workers} workers")
+    hash_index = _destination_hash_index(dest_base_uri, config_path, deduplicate)
+    dataset = _load_source_dataset(src_uri, config_path, manifest, admin_metadata)
+    proto_dataset = dtoolcore._copy_create_proto_dataset(dataset, dest_base_uri, config_path, progressbar)
+    _parallel_copy_content(dataset, proto_dataset, config_path, progressbar, max_workers, hash_index,
+                           bandwidth_limits)
+    proto_dataset.freeze(progressbar=progressbar)
+    return proto_dataset.uri
+
+
+def parallel_copy_resume(src_uri, dest_base_uri, config_path=None, progressbar=None, max_workers=4,
+                         deduplicate=False, manifest=None, bandwidth_limits=(), admin_metadata=None):
+    """Resume copying a dataset like dtoolcore.copy_resume, transferring items concurrently.
+
+    :param src_uri: URI of dataset to be copied
+    :param dest_base_uri: base of URI for copy target
+    :param config_path: path to dtool configuration file
+    :param max_workers: number of items transferred at the same time
+    :param deduplicate: copy items already held by datasets at the destination
+        base URI from there instead of from the source
+    :param manifest: manifest of the source dataset if already known, e.g. from a CopyPlan
+    :param bandwidth_limits: BandwidthLimits that transfers from the source must obey
+    :param admin_metadata: admin metadata of the source dataset if already known
+    :returns: URI of new dataset
+    """
+    logger.debug(f"Parallel copy resume {src_uri} -> {dest_base_uri} with {max_workers} workers")
+    hash_index = _destination_hash_index(dest_base_uri, config_path, deduplicate)
+    dataset = _load_source_dataset(src_uri, config_path, manifest, admin_metadata)
+    dest_uri = dtoolcore._generate_uri(dataset._admin_metadata, dest_base_uri)
+    proto_dataset = dtoolcore.ProtoDataSet.from_uri(dest_uri, config_path=config_path)
+    _parallel_copy_content(dataset, proto_dataset, config_path, progressbar, max_workers, hash_index,
+                           bandwidth_limits)
+    proto_dataset._admin_metadata["frozen_at"] = dataset._admin_metadata["frozen_at"]
+    proto_dataset.freeze(progressbar=progressbar)
+    return proto_dataset.uri
+
+
 def _proto_dataset_info(dataset):
     """Return information about proto dataset as a dict."""
     # Analogous to dtool_info.inventory._dataset_info
@@ -191,48 +584,76 @@ def _load_dataset(uri):
     return dataset
 
 
-async def _copy_dataset(uri, target_base_uri, resume, auto_resume, progressbar=None):
+async def _copy_dataset(uri, target_base_uri, resume, auto_resume, progressbar=None, max_workers=None,
+                        deduplicate=None, plan=None, bandwidth_limits=()):
     logger.info(f'Copying dataset from URI {uri} to {target_base_uri}...')
 
-    dataset = _load_dataset(uri)
-
-    dest_uri = dtoolcore._generate_uri(
-        admin_metadata=dataset._admin_metadata,
-        base_uri=target_base_uri
-    )
-
-    copy_func = dtoolcore.copy
-    is_dataset = dtoolcore._is_dataset(dest_uri, config_path=None)
-    if resume or (auto_resume and is_dataset):
-        # copy resume
-        copy_func = dtoolcore.copy_resume
-    elif is_dataset:
-        # don't resume
-        raise FileExistsError("Dataset already exists: {}".format(dest_uri))
+    if plan is None:
+        # reading the manifest may take a while for remote datasets
+        loop = asyncio.get_running_loop()
+        plan = await loop.run_in_executor(None, plan_copy, uri, target_base_uri, resume, auto_resume)
+
+    if max_workers is None:
+        max_workers = settings.copy_item_workers
+    if deduplicate is None:
+        deduplicate = settings.deduplicate_copies
+
+    # a single worker without deduplication or bandwidth limit falls back to the serial implementation of dtoolcore,
+    # limits without a rate at the start of the copy do not count
+    bandwidth_limits = tuple(limit for limit in bandwidth_limits if limit.rate > 0)
+    if max_workers > 1 or deduplicate or bandwidth_limits:
+        copy_func = functools.partial(parallel_copy_resume if plan.resume else parallel_copy,
+                                      max_workers=max_workers, deduplicate=deduplicate, manifest=plan.manifest,
+                                      admin_metadata=plan.admin_metadata, bandwidth_limits=bandwidth_limits)
     else:
-        # If the destination URI is a "file" dataset one needs to check if
-        # the path already exists and exit gracefully if true.
-        parsed_dataset_uri = dtoolcore.utils.generous_parse_uri(dest_uri)
-        if parsed_dataset_uri.scheme == "file":
-            if os.path.exists(parsed_dataset_uri.path):
-                raise FileExistsError(
-                    "Path already exists: {}".format(parsed_dataset_uri.path))
-
-    num_items = len(list(dataset.identifiers))
+        copy_func = dtoolcore.copy_resume if plan.resume else dtoolcore.copy
 
     copy_func_wrapper = CopyFuncWrapper(copy_func)
 
-    with ProgressBar(length=2*num_items,
+    if hasattr(progressbar, 'set_step'):
+        progressbar = TransferProgress(progressbar, plan.num_bytes)
+
+    # every byte is reported twice, once when copied and once when hashed at freeze
+    with ProgressBar(length=2*plan.num_bytes,
                      label="Copying dataset",
                      pb=progressbar) as pb:
         non_blocking_copy_func = StatusReportingChildProcessBuilder(copy_func_wrapper, pb)
-        dest_uri = await non_blocking_copy_func(uri, target_base_uri)
+        dest_uri = await non_blocking_copy_func(plan)
 
     logger.info(f'Dataset successfully copied from {uri} to {target_base_uri}.')
 
     return dest_uri
 
 
+def copy_state(name, uuid, target_base_uri):
+    """State of the copy of dataset name, uuid at target_base_uri.
+
+    Returns 'dataset' if the copy is frozen, 'protodataset' if a copy has
+    been started but did not finish and None if there is no copy."""
+    dest_uri = dtoolcore._generate_uri({'name': name, 'uuid': uuid}, target_base_uri)
+    if not dtoolcore._is_dataset(dest_uri, config_path=None):
+        return None
+    return dtoolcore._admin_metadata_from_uri(dest_uri, config_path=None)['type']
+
+
+def plan_batch_copy(datasets, target_base_uri):
+    """Plan copying several datasets to the same base URI.
+
+    Returns the datasets to copy, largest first, and the datasets already
+    frozen at the target. Proto datasets left behind by an interrupted copy
+    are planned for copying, which resumes them. Starting the largest copies
+    first keeps the total time short when copies run in parallel."""
+    to_copy = []
+    existing = []
+    for dataset in datasets:
+        if copy_state(dataset.name, dataset.uuid, target_base_uri) == 'dataset':
+            existing.append(dataset)
+        else:
+            to_copy.append(dataset)
+    to_copy.sort(key=lambda dataset: dataset.size_int or 0, reverse=True)
+    return to_copy, existing
+
+
 class DatasetModel:
     """
     Model for both frozen and proto datasets, either received from dtoolcore
@@ -332,9 +753,21 @@ class DatasetModel:
         """
         self._dataset_info = _info(_load_dataset(uri))
 
-    async def copy(self, target_base_uri, resume=False, auto_resume=True, progressbar=None):
-        """Copy a dataset."""
-        await _copy_dataset(self.uri, target_base_uri, resume, auto_resume, progressbar)
+    async def copy(self, target_base_uri, resume=False, auto_resume=True, progressbar=None, max_workers=None,
+                   deduplicate=None, plan=None, bandwidth_limits=()):
+        """Copy a dataset, transferring up to max_workers items at the same time.
+
+        With deduplicate, items held by other datasets at the target are copied from there.
+        A CopyPlan from plan_copy skips the pre-flight check. Transfers obey all
+        BandwidthLimits in bandwidth_limits with a rate set when the copy starts,
+        their rates may be changed while copying."""
+        await _copy_dataset(self.uri, target_base_uri, resume, auto_resume, progressbar, max_workers, deduplicate,
+                            plan, bandwidth_limits)
+
+    async def get_copy_state(self, target_base_uri):
+        """State of the copy of this dataset at target_base_uri, see copy_state."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, copy_state, self.name, self.uuid, target_base_uri)
 
     def freeze(self):
         uri = str(self)
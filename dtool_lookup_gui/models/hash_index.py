@@ -0,0 +1,151 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import dtoolcore
+
+from gi.repository import GLib
+
+logger = logging.getLogger(__name__)
+
+
+def _default_cache_directory():
+    return os.path.join(GLib.get_user_cache_dir(), 'dtool-lookup-gui', 'hash-index')
+
+
+def _iter_datasets_in_base_uri(base_uri, config_path=None):
+    """Yield frozen datasets at base_uri like dtoolcore.iter_datasets_in_base_uri, reading config_path."""
+    base_uri = dtoolcore.utils.sanitise_uri(base_uri)
+    if config_path is None:
+        config_path = dtoolcore.utils.DEFAULT_CONFIG_PATH
+    storage_broker = dtoolcore._get_storage_broker(base_uri, config_path)
+    for uri in storage_broker.list_dataset_uris(base_uri, config_path):
+        try:
+            yield dtoolcore.DataSet.from_uri(uri, config_path=config_path)
+        except dtoolcore.DtoolCoreTypeError:
+            # proto dataset
+            pass
+
+
+class HashIndex:
+    """
+    Index of the item hashes of all frozen datasets at a base URI.
+
+    Frozen datasets never change, hence their manifests are read only once.
+    The index is kept as a JSON file on disk, keyed by the base URI, and
+    :meth:`update` only reads manifests of datasets not indexed yet and drops
+    datasets that disappeared. Hashes are only comparable if computed by the
+    same hash function, hence lookups require the hash function name.
+    """
+
+    def __init__(self, base_uri, directory=None):
+        if directory is None:
+            directory = _default_cache_directory()
+        self._base_uri = base_uri
+        self._directory = directory
+        self._datasets = {}
+        self._hashes = {}
+
+    @property
+    def path(self):
+        name = hashlib.sha256(self._base_uri.encode()).hexdigest()
+        return os.path.join(self._directory, f'{name}.json')
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _add(self, uuid, dataset):
+        self._datasets[uuid] = dataset
+        for identifier, item_hash in dataset['items'].items():
+            self._hashes.setdefault((dataset['hash_function'], item_hash), (dataset['uri'], identifier))
+
+    def _rebuild(self):
+        datasets, self._datasets, self._hashes = self._datasets, {}, {}
+        for uuid, dataset in datasets.items():
+            self._add(uuid, dataset)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                datasets = json.load(f)['datasets']
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Could not read hash index '%s': %s", self.path, exc)
+            return
+        self._datasets = datasets
+        self._rebuild()
+
+    def save(self):
+        tmp_path = None
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            # Write to temporary file first to never leave a truncated file behind. Several
+            # copy processes may save the same index at once, hence every save has its own file.
+            with tempfile.NamedTemporaryFile('w', dir=self._directory, prefix=os.path.basename(self.path),
+                                             suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                json.dump({'base_uri': self._base_uri, 'datasets': self._datasets}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logger.warning("Could not write hash index '%s': %s", self.path, exc)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def update(self, config_path=None):
+        """Index datasets new at the base URI and forget removed ones, then save.
+
+        Datasets are read with the dtool configuration at config_path, the default one if None."""
+        self.load()
+        present = set()
+        changed = False
+        for dataset in _iter_datasets_in_base_uri(self._base_uri, config_path):
+            present.add(dataset.uuid)
+            if dataset.uuid in self._datasets:
+                continue
+            manifest = dataset._manifest
+            self._add(dataset.uuid, {
+                'uri': dataset.uri,
+                'hash_function': manifest['hash_function'],
+                'items': {identifier: properties['hash'] for identifier, properties in manifest['items'].items()},
+            })
+            changed = True
+        removed = set(self._datasets) - present
+        if removed:
+            for uuid in removed:
+                del self._datasets[uuid]
+            self._rebuild()
+            changed = True
+        logger.debug(f"Hash index of {self._base_uri} holds {len(self)} hashes of {len(self._datasets)} datasets.")
+        if changed:
+            self.save()
+
+    def lookup(self, hash_function, item_hash):
+        """Return (dataset URI, item identifier) of an item with this hash, or None."""
+        return self._hashes.get((hash_function, item_hash))
@@ -0,0 +1,166 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import logging
+
+import yaml
+
+from .. import is_uuid
+
+logger = logging.getLogger(__name__)
+
+
+# same default as the 'dependency-keys' setting
+DEFAULT_DEPENDENCY_KEYS = ["readme.derived_from.uuid", "annotations.source_dataset_uuid"]
+
+
+def _values_at(document, key):
+    """All values at dotted key path in nested dicts, descending into lists."""
+    values = [document]
+    for field in key.split('.'):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                next_values += [v[field] for v in value if isinstance(v, dict) and field in v]
+            elif isinstance(value, dict) and field in value:
+                next_values += [value[field]]
+        values = next_values
+    leaves = []
+    for value in values:
+        leaves += value if isinstance(value, list) else [value]
+    return leaves
+
+
+class ProvenanceIndex:
+    """
+    Local index of the provenance of datasets listed from a base URI.
+
+    The index holds README content and annotations of all datasets harvested
+    while listing a base URI, so that dependencies can be traced without a
+    lookup server and without reading every README again. Dependency keys
+    are dotted paths into a document with fields 'readme' (the parsed
+    README.yml) and 'annotations', as understood by the lookup server's
+    dependency graph plugin.
+
+    :meth:`get_graph_by_uuid` mimics the lookup client's method of the same
+    name, hence :class:`DependencyGraph` traces local graphs just like
+    graphs queried from the server.
+    """
+
+    def __init__(self):
+        self._documents = {}
+        self._parents = {}
+
+    @classmethod
+    def from_datasets(cls, datasets):
+        index = cls()
+        for dataset in datasets:
+            index.add(dataset)
+        return index
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, uuid):
+        return uuid in self._documents
+
+    def add(self, dataset):
+        """Add dataset model (or its info dict) to the index."""
+        info = dataset if isinstance(dataset, dict) else dataset.__getstate__()
+        try:
+            readme = yaml.safe_load(info.get('readme_content') or '')
+        except yaml.YAMLError as exc:
+            logger.debug("README of dataset '%s' is no valid YAML, ignored: %s", info['uuid'], exc)
+            readme = None
+        self._documents[info['uuid']] = {
+            'uuid': info['uuid'],
+            'name': info['name'],
+            'uri': info['uri'],
+            'readme': readme if isinstance(readme, dict) else {},
+            'annotations': info.get('annotations') or {},
+        }
+        # Parents depend on the dependency keys, evaluate anew on next query
+        self._parents = {}
+
+    def parents(self, uuid, dependency_keys=None):
+        """UUIDs of datasets the dataset `uuid` is derived from."""
+        return self._parent_map(dependency_keys).get(uuid, [])
+
+    def _parent_map(self, dependency_keys=None):
+        if dependency_keys is None:
+            dependency_keys = DEFAULT_DEPENDENCY_KEYS
+        dependency_keys = tuple(dependency_keys)
+        if dependency_keys not in self._parents:
+            parent_map = {}
+            for uuid, document in self._documents.items():
+                parents = []
+                for key in dependency_keys:
+                    for value in _values_at(document, key):
+                        value = str(value)
+                        if is_uuid(value) and value != uuid and value not in parents:
+                            parents += [value]
+                parent_map[uuid] = parents
+            self._parents[dependency_keys] = parent_map
+        return self._parents[dependency_keys]
+
+    async def get_graph_by_uuid(self, uuid, dependency_keys=None, page_number=1, page_size=None,
+                                pagination=None):
+        """
+        All datasets connected to dataset `uuid` by dependencies, up- and downstream.
+
+        Each dataset is described by its 'uuid', 'name', 'uri' and the list
+        'derived_from' of parent UUIDs. Parents that are not part of the index
+        only appear in 'derived_from'. Results are never split into pages.
+        """
+        parent_map = self._parent_map(dependency_keys)
+        if page_number is not None and page_number > 1:
+            return []
+
+        # Traverse dependencies in both directions
+        neighbors = {}
+        for child, parents in parent_map.items():
+            for parent in parents:
+                neighbors.setdefault(child, []).append(parent)
+                neighbors.setdefault(parent, []).append(child)
+        connected = []
+        if uuid in self._documents:
+            visited = {uuid}
+            stack = [uuid]
+            while stack:
+                current = stack.pop()
+                if current in self._documents:
+                    connected += [current]
+                for neighbor in neighbors.get(current, []):
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        stack += [neighbor]
+
+        if pagination is not None:
+            pagination.update({'total': len(connected), 'total_pages': 1, 'first_page': 1,
+                               'last_page': 1, 'page': 1})
+
+        return [{'uuid': u,
+                 'name': self._documents[u]['name'],
+                 'uri': self._documents[u]['uri'],
+                 'derived_from': parent_map[u]} for u in connected]
@@ -1,13 +1,20 @@
 
+import collections
+
+
 class SearchState:
     """The client model of the search state, e.g. current pagination, sorting, search keywords, ..."""
 
+    # maximum number of pages kept in the dataset list when scrolling through search results
+    _max_loaded_pages = 10
+
     def __init__(self):
 
         self._search_text = ""
 
         self._page_size = 10
         self._fetching_results = False
+        self._results_generation = 0
 
         self.reset_pagination()
         self.reset_sorting()
@@ -31,6 +38,35 @@ class SearchState:
         self._last_page = 1
         self._total_pages = 1
         self._total_number_of_entries = 0
+        self._loaded_pages = collections.deque()
+
+    def invalidate_results(self):
+        """Mark results fetched so far as outdated, e.g. when a new search starts"""
+        self._results_generation += 1
+
+    def reset_loaded_pages(self, page, nb_datasets):
+        """Mark page holding nb_datasets datasets as the only page shown in the dataset list"""
+        self._loaded_pages = collections.deque([(page, nb_datasets)])
+
+    def add_loaded_page(self, page, nb_datasets, append=True):
+        """Mark page holding nb_datasets datasets as appended (or prepended) to the dataset list
+
+        Returns the number of datasets to remove at the opposite end of the
+        list to keep at most _max_loaded_pages pages."""
+        if append:
+            self._loaded_pages.append((page, nb_datasets))
+        else:
+            self._loaded_pages.appendleft((page, nb_datasets))
+        self.current_page = page
+
+        nb_evicted = 0
+        while len(self._loaded_pages) > self._max_loaded_pages:
+            if append:
+                _, nb = self._loaded_pages.popleft()
+            else:
+                _, nb = self._loaded_pages.pop()
+            nb_evicted += nb
+        return nb_evicted
 
     def reset_sorting(self):
         """Reset sorting information to uri"""
@@ -170,6 +206,31 @@ class SearchState:
             return self.first_page
         else:
             return self.current_page - 1
+
+    @property
+    def results_generation(self):
+        """Changes whenever the results shown are replaced, pages fetched for an older generation are outdated"""
+        return self._results_generation
+
+    @property
+    def loaded_pages(self):
+        """Pages currently shown in the dataset list, in list order"""
+        return [page for page, _ in self._loaded_pages]
+
+    @property
+    def next_page_to_load(self):
+        """Page following the pages shown in the dataset list, None if there is none"""
+        if len(self._loaded_pages) == 0 or self._loaded_pages[-1][0] >= self.last_page:
+            return None
+        return self._loaded_pages[-1][0] + 1
+
+    @property
+    def previous_page_to_load(self):
+        """Page preceding the pages shown in the dataset list, None if there is none"""
+        if len(self._loaded_pages) == 0 or self._loaded_pages[0][0] <= self.first_page:
+            return None
+        return self._loaded_pages[0][0] - 1
+
     @property
     def total_pages(self):
         return self._total_pages
@@ -103,5 +103,67 @@ class Settings:
     def base_uri_listing_timeout(self, value):
         self.settings.set_int('base-uri-listing-timeout', value)
 
+    @property
+    def infinite_scroll(self):
+        """Load further pages of search results when scrolling to the end of the list."""
+        return self.settings.get_boolean('infinite-scroll')
+
+    @infinite_scroll.setter
+    def infinite_scroll(self, value):
+        self.settings.set_boolean('infinite-scroll', value)
+
+    @property
+    def max_concurrent_copies(self):
+        """Maximum number of simultaneous copy operations. 0 = no limit."""
+        return self.settings.get_int('max-concurrent-copies')
+
+    @max_concurrent_copies.setter
+    def max_concurrent_copies(self, value):
+        self.settings.set_int('max-concurrent-copies', value)
+
+    @property
+    def max_concurrent_copies_per_destination(self):
+        """Maximum number of simultaneous copy operations per destination. 0 = no limit."""
+        return self.settings.get_int('max-concurrent-copies-per-destination')
+
+    @max_concurrent_copies_per_destination.setter
+    def max_concurrent_copies_per_destination(self, value):
+        self.settings.set_int('max-concurrent-copies-per-destination', value)
+
+    @property
+    def copy_item_workers(self):
+        """Number of items transferred concurrently within a single dataset copy."""
+        return self.settings.get_int('copy-item-workers')
+
+    @copy_item_workers.setter
+    def copy_item_workers(self, value):
+        self.settings.set_int('copy-item-workers', value)
+
+    @property
+    def deduplicate_copies(self):
+        return self.settings.get_boolean('deduplicate-copies')
+
+    @deduplicate_copies.setter
+    def deduplicate_copies(self, value):
+        self.settings.set_boolean('deduplicate-copies', value)
+
+    @property
+    def copy_bandwidth_limit(self):
+        """Maximum transfer rate in MB/s of all copies together. 0 = no limit."""
+        return self.settings.get_double('copy-bandwidth-limit')
+
+    @copy_bandwidth_limit.setter
+    def copy_bandwidth_limit(self, value):
+        self.settings.set_double('copy-bandwidth-limit', value)
+
+    @property
+    def copy_bandwidth_limit_per_copy(self):
+        """Initial maximum transfer rate in MB/s of every copy. 0 = no limit."""
+        return self.settings.get_double('copy-bandwidth-limit-per-copy')
+
+    @copy_bandwidth_limit_per_copy.setter
+    def copy_bandwidth_limit_per_copy(self, value):
+        self.settings.set_double('copy-bandwidth-limit-per-copy', value)
+
 
 settings = Settings()
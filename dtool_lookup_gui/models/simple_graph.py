@@ -30,6 +30,127 @@ from scipy.special import erf
 
 logger = logging.getLogger(__name__)
 
+# distances below are treated as this value to avoid divisions by zero
+_MIN_DISTANCE = 1e-12
+
+
+def _cell_list_neighbors(pos, cutoff):
+    """
+    Return all ordered pairs (i, j) with i != j of points closer than cutoff.
+
+    Points are binned into a uniform grid of square cells with edge length
+    `cutoff`, hence neighbors of a point can only reside in the 3x3 block of
+    cells around it. Only occupied cells are stored, such that memory and
+    time scale linearly with the number of points, not with the area the
+    points span.
+    """
+    nb_points = len(pos)
+    if nb_points == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    # Cell coordinates, padded by one cell on each side so that neighboring
+    # cell indices never wrap around into the adjacent column
+    cell_nc = np.floor((pos - pos.min(axis=0)) / cutoff).astype(np.int64) + 1
+    nb_cells_y = cell_nc[:, 1].max() + 2
+    cell_n = cell_nc[:, 0] * nb_cells_y + cell_nc[:, 1]
+
+    # Sort points by cell and locate the occupied cells in the sorted list
+    order_n = np.argsort(cell_n, kind='stable')
+    occupied_cells, first_in_cell, nb_in_cell = np.unique(
+        cell_n[order_n], return_index=True, return_counts=True)
+
+    i_n = []
+    j_n = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            neighbor_cell_n = cell_n + dx * nb_cells_y + dy
+            k_n = np.minimum(np.searchsorted(occupied_cells, neighbor_cell_n),
+                             len(occupied_cells) - 1)
+            nb_candidates_n = np.where(occupied_cells[k_n] == neighbor_cell_n,
+                                       nb_in_cell[k_n], 0)
+
+            # Expand the ragged per-point candidate lists into flat pair lists
+            total = np.sum(nb_candidates_n)
+            start_n = np.cumsum(nb_candidates_n) - nb_candidates_n
+            offset_n = np.arange(total) - np.repeat(start_n, nb_candidates_n)
+            i_n += [np.repeat(np.arange(nb_points), nb_candidates_n)]
+            j_n += [order_n[np.repeat(first_in_cell[k_n], nb_candidates_n) + offset_n]]
+
+    i_n = np.concatenate(i_n)
+    j_n = np.concatenate(j_n)
+
+    # Cells are only a coarse filter, discard self-pairs and distant pairs
+    dr_nc = pos[i_n] - pos[j_n]
+    m = np.logical_and(i_n != j_n, np.sum(dr_nc ** 2, axis=1) < cutoff ** 2)
+    return i_n[m], j_n[m]
+
+
+class UniformGrid:
+    """
+    Spatial index of points binned into square cells of edge length `cell_size`.
+
+    Supports queries for the closest point within a radius of at most
+    `cell_size` around an arbitrary location in O(log N), as only the 3x3
+    block of cells around the location needs to be searched.
+    """
+
+    def __init__(self, positions, cell_size=1):
+        self._positions = np.asarray(positions, dtype=float)
+        self._cell_size = cell_size
+        if len(self._positions) == 0:
+            self._origin = np.zeros(2)
+            self._nb_cells_y = 1
+            self._order_n = np.zeros(0, dtype=int)
+            self._occupied_cells = np.zeros(0, dtype=np.int64)
+            self._first_in_cell = np.zeros(0, dtype=int)
+            self._nb_in_cell = np.zeros(0, dtype=int)
+            return
+
+        # Pad by one empty cell on each side, and by an additional empty row
+        # that absorbs wrapping of y-neighbor indices into adjacent columns
+        self._origin = self._positions.min(axis=0) - cell_size
+        cell_nc = np.floor((self._positions - self._origin) / cell_size).astype(np.int64)
+        self._nb_cells_y = cell_nc[:, 1].max() + 3
+        cell_n = cell_nc[:, 0] * self._nb_cells_y + cell_nc[:, 1]
+
+        self._order_n = np.argsort(cell_n, kind='stable')
+        self._occupied_cells, self._first_in_cell, self._nb_in_cell = np.unique(
+            cell_n[self._order_n], return_index=True, return_counts=True)
+
+    @property
+    def positions(self):
+        return self._positions
+
+    def _candidates(self, x, y):
+        cx, cy = np.floor((np.array([x, y]) - self._origin) / self._cell_size).astype(np.int64)
+        if cx < 0 or cy < 0 or cy > self._nb_cells_y - 2:
+            # Location is outside of the padded grid, hence far from all points
+            return np.zeros(0, dtype=int)
+        candidates = []
+        for dx in (-1, 0, 1):
+            cells = (cx + dx) * self._nb_cells_y + cy + np.array([-1, 0, 1])
+            k = np.searchsorted(self._occupied_cells, cells)
+            for cell, k in zip(cells, k):
+                if k < len(self._occupied_cells) and self._occupied_cells[k] == cell:
+                    start = self._first_in_cell[k]
+                    candidates += [self._order_n[start:start + self._nb_in_cell[k]]]
+        if not candidates:
+            return np.zeros(0, dtype=int)
+        return np.concatenate(candidates)
+
+    def closest(self, x, y, radius):
+        """Index of the point closest to (x, y) within radius, or None."""
+        if radius > self._cell_size:
+            raise ValueError(f'Query radius {radius} exceeds cell size {self._cell_size}.')
+        candidates = self._candidates(x, y)
+        if len(candidates) == 0:
+            return None
+        dist_sq = np.sum((self._positions[candidates] - np.array([x, y])) ** 2, axis=1)
+        k = np.argmin(dist_sq)
+        if dist_sq[k] >= radius ** 2:
+            return None
+        return int(candidates[k])
+
 
 class SimpleGraph:
     def __init__(self):
@@ -91,13 +212,32 @@ class GraphLayout:
     """
     Simple graph layouter that uses spring and electrostatic forces between
     vertices and the Fast Intertial Relaxation Engine (FIRE) for optimization.
+
+    If `cutoff` is given, the electrostatic repulsion is truncated at that
+    distance and only evaluated for vertex pairs found by a cell list. The
+    pair energy is shifted to vanish at the cutoff to keep the total energy
+    continuous. The default (None) evaluates all pairs exactly.
+
+    Vertices start on a square grid unless initial `positions` are given,
+    e.g. those of a previously converged layout of the same graph.
+
+    The layout counts as converged once the largest force on any vertex drops
+    below `fmax`, or once the relative energy change per step stayed below
+    `etol` for `minsteps` consecutive steps.
+
+    Positions, velocities, forces and all intermediate per-pair quantities
+    live in buffers that are allocated once and updated in place, such that
+    an iteration allocates only a small, constant number of arrays. `dtype`
+    selects the floating point precision of these buffers; single precision
+    (np.float32) halves their memory footprint at the expense of accuracy.
     """
 
     def __init__(self, graph, spring_constant=10, equilibrium_distance=2,
                  coulomb=1, core_length=2, coulomb_exponent=1, mass=1,
                  max_timestep=1, minsteps=10, inc_timestep=1.2,
                  dec_timestep=0.5, mix=0.1, dec_mix=0.99,
-                 init_iter=100):
+                 init_iter=100, cutoff=None, fmax=1e-3, etol=1e-7,
+                 positions=None, dtype=np.float64):
         self.graph = graph
         self.spring_constant = spring_constant
         self.equilibrium_distance = equilibrium_distance
@@ -112,156 +252,267 @@ class GraphLayout:
         self.initial_mix = mix
         self.dec_mix = dec_mix
         self.init_iter = init_iter
+        self.cutoff = cutoff
+        self.fmax = fmax
+        self.etol = etol
+        self.dtype = np.dtype(dtype)
 
         self.timestep = max_timestep
         self.mix = mix
         self.cut = minsteps
 
         self._energy = None
+        self._nb_stagnant_steps = 0
 
-        self._initialize_positions()
+        # Edges and, for exact repulsion, all vertex pairs do not change
+        self._edge_i = np.array(graph.vertex1, dtype=int)
+        self._edge_j = np.array(graph.vertex2, dtype=int)
+        self._all_pairs = None
+        self._scratch = {}
+
+        self._initialize_positions(positions)
 
     @property
     def positions(self):
         return self._positions
 
-    def _initialize_positions(self):
+    @property
+    def energy(self):
+        return self._energy
+
+    @property
+    def max_force(self):
+        """Largest magnitude of the force on any vertex."""
+        if len(self._forces) == 0:
+            return 0.
+        return float(np.sqrt(np.max(np.einsum('ij,ij->i', self._forces, self._forces))))
+
+    @property
+    def converged(self):
+        if self._energy is None:
+            return False
+        return self.max_force < self.fmax or self._nb_stagnant_steps >= self.minsteps
+
+    def _initialize_positions(self, positions=None):
         nb_vertices = self.graph.nb_vertices
-        n = int(np.sqrt(nb_vertices)) + 1
-        grid = (np.mgrid[:n, :n].T).reshape(-1, 2)[:nb_vertices]
-        self._positions = grid.astype(float) * self.equilibrium_distance
+        if positions is not None:
+            self._positions = np.array(positions, dtype=self.dtype).reshape(nb_vertices, 2)
+        else:
+            n = int(np.sqrt(nb_vertices)) + 1
+            grid = (np.mgrid[:n, :n].T).reshape(-1, 2)[:nb_vertices]
+            self._positions = grid.astype(self.dtype) * self.equilibrium_distance
         self._velocities = np.zeros_like(self._positions)
         self._forces = np.zeros_like(self._positions)
+        # State before the current step, restored if the energy went uphill
+        self._old_positions = np.zeros_like(self._positions)
+        self._old_velocities = np.zeros_like(self._positions)
+        # Repulsion forces and scaled velocity or force increments
+        self._coulomb_forces = np.zeros_like(self._positions)
+        self._increment = np.zeros_like(self._positions)
         for i in range(self.init_iter):
             self.iterate()
 
-    def _compute_spring_energy_and_forces(self, pos):
+    def _buffer(self, name, shape):
+        """
+        Scratch array of given shape, reused across calls.
+
+        Arrays only grow, hence the number of vertex pairs within the cutoff
+        may fluctuate without reallocations.
+        """
+        size = int(np.prod(shape))
+        buffer = self._scratch.get(name)
+        if buffer is None or buffer.size < size:
+            # Leave some headroom for a growing number of pairs
+            buffer = np.empty(size + size // 4, dtype=self.dtype)
+            self._scratch[name] = buffer
+        return buffer[:size].reshape(shape)
+
+    def _pair_distances(self, pos, i_n, j_n):
+        """Distance vectors and distances of pairs, in scratch buffers."""
+        nb_pairs = len(i_n)
+        # Indices are valid; mode='raise' would buffer the output internally
+        dr_nc = np.take(pos, i_n, axis=0, out=self._buffer('dr_nc', (nb_pairs, 2)), mode='clip')
+        pos_j_nc = np.take(pos, j_n, axis=0, out=self._buffer('tmp_nc', (nb_pairs, 2)), mode='clip')
+        np.subtract(dr_nc, pos_j_nc, out=dr_nc)
+        abs_dr_n = np.einsum('ij,ij->i', dr_nc, dr_nc, out=self._buffer('abs_dr_n', nb_pairs))
+        np.sqrt(abs_dr_n, out=abs_dr_n)
+        # Coincident vertices (e.g. after a large step on the initial grid)
+        # must not yield 0/0; their force vanishes with their zero distance
+        # vector, and the energies approach their finite limits
+        np.maximum(abs_dr_n, _MIN_DISTANCE, out=abs_dr_n)
+        return dr_nc, abs_dr_n
+
+    def _accumulate_pair_forces(self, i_n, j_n, de_n, dr_nc, abs_dr_n, out):
+        """Sum pair forces -de/dr along dr (halved, pairs count twice) on vertices."""
+        nb_vertices = len(out)
+        np.divide(de_n, abs_dr_n, out=de_n)
+        de_n *= 0.5
+        for c in range(2):
+            # bincount copies non-contiguous (and single precision) weights,
+            # hence sum one contiguous component at a time
+            df_n = np.multiply(dr_nc[:, c], de_n, out=self._buffer('df_n', len(de_n)))
+            out[:, c] = np.bincount(j_n, weights=df_n, minlength=nb_vertices)
+            out[:, c] -= np.bincount(i_n, weights=df_n, minlength=nb_vertices)
+        return out
+
+    def _compute_spring_energy_and_forces(self, pos, out=None):
         nb_vertices = self.graph.nb_vertices
+        if out is None:
+            out = np.zeros_like(pos)
         # With no edges there are no spring forces; bail out before building the
         # neighbor list. An empty edge list would otherwise become a float NumPy
         # array and fail when used to index positions (raised on graphs whose
         # datasets have no dependencies).
-        if nb_vertices <= 1 or self.graph.nb_edges == 0:
-            return 0, np.zeros_like(pos)
+        if nb_vertices <= 1 or len(self._edge_i) == 0:
+            out.fill(0)
+            return 0, out
 
         # Neighbor list (edge list)
-        i_n = np.array(self.graph.vertex1)
-        j_n = np.array(self.graph.vertex2)
+        i_n = self._edge_i
+        j_n = self._edge_j
 
         # Vertex distances
-        dr_nc = pos[i_n] - pos[j_n]
-        abs_dr_n = np.sqrt(np.sum(dr_nc ** 2, axis=1))
+        dr_nc, abs_dr_n = self._pair_distances(pos, i_n, j_n)
 
-        # Energies (per pair)
-        e_n = 0.5 * self.spring_constant * (
-                abs_dr_n - self.equilibrium_distance) ** 2
-
-        # Forces (per pair)
-        de_n = self.spring_constant * (abs_dr_n - self.equilibrium_distance)
-        df_nc = 0.5 * de_n.reshape(-1, 1) * dr_nc / abs_dr_n.reshape(-1, 1)
+        # Forces (per pair) and energies (per pair)
+        de_n = np.subtract(abs_dr_n, self.equilibrium_distance, out=self._buffer('de_n', len(i_n)))
+        energy = 0.5 * self.spring_constant * np.dot(de_n, de_n)
+        de_n *= self.spring_constant
 
         # Sum for each vertex
-        fx_i = np.bincount(j_n, weights=df_nc[:, 0], minlength=nb_vertices) - \
-               np.bincount(i_n, weights=df_nc[:, 0], minlength=nb_vertices)
-        fy_i = np.bincount(j_n, weights=df_nc[:, 1], minlength=nb_vertices) - \
-               np.bincount(i_n, weights=df_nc[:, 1], minlength=nb_vertices)
+        self._accumulate_pair_forces(i_n, j_n, de_n, dr_nc, abs_dr_n, out)
 
         # Return energy and forces
-        return np.sum(e_n), np.transpose([fx_i, fy_i])
+        return float(energy), out
+
+    def _compute_coulomb_pair_energy(self, abs_dr_n):
+        drnorm_n = abs_dr_n / self.core_length
+        return self.coulomb * erf(drnorm_n ** self.coulomb_exponent) / \
+               (abs_dr_n ** self.coulomb_exponent)
 
-    def _compute_coulomb_energy_and_forces(self, pos):
+    def _compute_coulomb_energy_and_forces(self, pos, out=None):
         nb_vertices = self.graph.nb_vertices
+        if out is None:
+            out = np.zeros_like(pos)
         if nb_vertices <= 1:
-            return 0, np.zeros_like(pos)
-
-        # Neighbor list (between all atoms)
-        i_n, j_n = np.mgrid[:nb_vertices, :nb_vertices]
-        i_n.shape = (-1,)
-        j_n.shape = (-1,)
-        m = i_n != j_n
-        i_n = i_n[m]
-        j_n = j_n[m]
+            out.fill(0)
+            return 0, out
+
+        if self.cutoff is None:
+            # Neighbor list (between all atoms), built once
+            if self._all_pairs is None:
+                i_n, j_n = np.mgrid[:nb_vertices, :nb_vertices]
+                i_n.shape = (-1,)
+                j_n.shape = (-1,)
+                m = i_n != j_n
+                self._all_pairs = i_n[m], j_n[m]
+            i_n, j_n = self._all_pairs
+        else:
+            # Neighbor list (between atoms within cutoff)
+            i_n, j_n = _cell_list_neighbors(pos, self.cutoff)
+        nb_pairs = len(i_n)
 
         # Vertex distances
-        dr_nc = pos[i_n] - pos[j_n]
-        abs_dr_n = np.sqrt(np.sum(dr_nc ** 2, axis=1))
+        dr_nc, abs_dr_n = self._pair_distances(pos, i_n, j_n)
+
+        # Screened distances x = (r/a)^p, erf(x) and the Gaussian exp(-x^2)
+        x_n = np.divide(abs_dr_n, self.core_length, out=self._buffer('x_n', nb_pairs))
+        if self.coulomb_exponent != 1:
+            np.power(x_n, self.coulomb_exponent, out=x_n)
+        erf_n = erf(x_n, out=self._buffer('erf_n', nb_pairs))
+        gauss_n = np.square(x_n, out=self._buffer('gauss_n', nb_pairs))
+        np.negative(gauss_n, out=gauss_n)
+        np.exp(gauss_n, out=gauss_n)
+        # r^p
+        abs_dr_p_n = self._buffer('abs_dr_p_n', nb_pairs)
+        if self.coulomb_exponent != 1:
+            np.power(abs_dr_n, self.coulomb_exponent, out=abs_dr_p_n)
+        else:
+            abs_dr_p_n[...] = abs_dr_n
 
         # Energies (per pair)
-        drnorm_n = abs_dr_n / self.core_length
-        e_n = self.coulomb * erf(drnorm_n ** self.coulomb_exponent) / \
-              (abs_dr_n ** self.coulomb_exponent)
-
-        # Forces (per pair)
-        de_n = self.coulomb * self.coulomb_exponent * (
-                -erf(drnorm_n ** self.coulomb_exponent)
-                + 2 * np.exp(-drnorm_n ** (2 * self.coulomb_exponent))
-                * drnorm_n ** self.coulomb_exponent / np.sqrt(np.pi)) / \
-               abs_dr_n ** (self.coulomb_exponent + 1)
-
-        df_nc = 0.5 * de_n.reshape(-1, 1) * dr_nc / abs_dr_n.reshape(-1, 1)
+        e_n = np.divide(erf_n, abs_dr_p_n, out=self._buffer('e_n', nb_pairs))
+        energy = self.coulomb * np.sum(e_n)
+        if self.cutoff is not None:
+            energy -= nb_pairs * self._compute_coulomb_pair_energy(self.cutoff)
+
+        # Forces (per pair), de/dr = c p (-erf(x) + 2 x exp(-x^2) / sqrt(pi)) / r^(p+1)
+        de_n = np.multiply(gauss_n, x_n, out=gauss_n)
+        de_n *= 2 / np.sqrt(np.pi)
+        de_n -= erf_n
+        de_n /= abs_dr_p_n
+        de_n /= abs_dr_n
+        de_n *= self.coulomb * self.coulomb_exponent
 
         # Sum for each vertex
-        fx_i = np.bincount(j_n, weights=df_nc[:, 0], minlength=nb_vertices) - \
-               np.bincount(i_n, weights=df_nc[:, 0], minlength=nb_vertices)
-        fy_i = np.bincount(j_n, weights=df_nc[:, 1], minlength=nb_vertices) - \
-               np.bincount(i_n, weights=df_nc[:, 1], minlength=nb_vertices)
+        self._accumulate_pair_forces(i_n, j_n, de_n, dr_nc, abs_dr_n, out)
 
         # Return energy and forces
-        return np.sum(e_n), np.transpose([fx_i, fy_i])
+        return float(energy), out
+
+    def _compute_energy_and_forces(self):
+        """Total energy, forces stored in place"""
+        energy, _ = self._compute_spring_energy_and_forces(self._positions, out=self._forces)
+        e, f = self._compute_coulomb_energy_and_forces(self._positions, out=self._coulomb_forces)
+        self._forces += f
+        return energy + e
+
+    def _verlet_half_step(self):
+        """Advance velocities by half a time step"""
+        np.multiply(self._forces, 0.5 * self.timestep / self.mass, out=self._increment)
+        self._velocities += self._increment
 
     def iterate(self):
         """Carry out a single step of the graph layout optimization"""
 
         old_energy = self._energy
-        old_positions = self._positions.copy()
-        old_velocities = self._velocities.copy()
+        np.copyto(self._old_positions, self._positions)
+        np.copyto(self._old_velocities, self._velocities)
 
         it = 0
 
         action = 'uphill e'
         while action == 'uphill e' and it < 5:
             # Verlet step 1
-            self._velocities += 0.5 * self._forces * self.timestep / self.mass
-            self._positions += self._velocities * self.timestep
+            self._verlet_half_step()
+            np.multiply(self._velocities, self.timestep, out=self._increment)
+            self._positions += self._increment
 
             # Recompute forces
-            self._energy, self._forces = self._compute_spring_energy_and_forces(
-                self._positions)
-            e, f = self._compute_coulomb_energy_and_forces(self._positions)
-            self._energy += e
-            self._forces += f
+            self._energy = self._compute_energy_and_forces()
 
             # Verlet step 2
-            self._velocities += 0.5 * self._forces * self.timestep / self.mass
+            self._verlet_half_step()
 
             if self._energy is not None and old_energy is not None and \
                     self._energy > old_energy:
                 # The energy did not decrease, decrease time step and retry!
-                self._positions = old_positions.copy()
-                self._velocities = old_velocities.copy()
+                np.copyto(self._positions, self._old_positions)
+                np.copyto(self._velocities, self._old_velocities)
                 self.timestep *= self.dec_timestep
 
                 action = 'uphill e'
             else:
                 # Adjust velocities according to the FIRE algorithm
-                v_dot_f = np.sum(self._velocities * self._forces)
+                v_dot_f = np.vdot(self._velocities, self._forces)
                 if v_dot_f < 0:
-                    self._velocities = np.zeros_like(self._velocities)
+                    self._velocities.fill(0)
                     self.cut = self.minsteps
                     self.timestep = self.timestep * self.dec_timestep
                     self.mix = self.initial_mix
 
                     action = 'uphill v*f'
                 else:
-                    v_dot_v = np.sum(self._velocities ** 2)
-                    f_dot_f = np.sum(self._forces ** 2)
+                    v_dot_v = np.vdot(self._velocities, self._velocities)
+                    f_dot_f = np.vdot(self._forces, self._forces)
 
                     help = 0.0
                     if f_dot_f > 0:
                         help = self.mix * np.sqrt(v_dot_v / f_dot_f)
 
-                    self._velocities = (1 - self.mix) * self._velocities + \
-                                       help * self._forces
+                    self._velocities *= 1 - self.mix
+                    np.multiply(self._forces, help, out=self._increment)
+                    self._velocities += self._increment
 
                     if self.cut < 0:
                         self.timestep = min(self.timestep * self.inc_timestep,
@@ -278,3 +529,165 @@ class GraphLayout:
             #             f'(old energy: {old_energy}, '
             #             f'max |force|: {np.sqrt(np.max(np.sum(self._forces ** 2, axis=1)))},'
             #             f' timestep: {self.timestep}')
+
+        # Count steps without significant energy change for convergence check
+        if old_energy is not None and \
+                abs(self._energy - old_energy) <= self.etol * abs(self._energy):
+            self._nb_stagnant_steps += 1
+        else:
+            self._nb_stagnant_steps = 0
+
+
+class LayeredGraphLayout:
+    """
+    Deterministic layered (Sugiyama-style) layout for directed acyclic graphs.
+
+    An edge (i, j) places vertex j one or more layers above vertex i, i.e.
+    every vertex is put one layer below the lowest of its edge targets
+    (longest-path layering). Edges spanning several layers are routed through
+    virtual vertices, one per intermediate layer. Crossings are reduced by
+    `nb_sweeps` alternating down and up sweeps of the barycenter heuristic,
+    and each vertex is finally placed as close as possible to the mean
+    horizontal position of its neighbors in the layer above, while keeping
+    at least `vertex_distance` to its neighbors within the layer.
+
+    Cycles, which provenance graphs should not contain, are broken by
+    placing one of the remaining vertices at a time.
+
+    The layout is computed at construction. It exposes the same interface as
+    :class:`GraphLayout`, but is converged right away and `iterate` does
+    nothing.
+    """
+
+    def __init__(self, graph, layer_distance=2, vertex_distance=2, nb_sweeps=4):
+        self.graph = graph
+        self.layer_distance = layer_distance
+        self.vertex_distance = vertex_distance
+        self.nb_sweeps = nb_sweeps
+
+        self._compute_positions()
+
+    @property
+    def positions(self):
+        return self._positions
+
+    @property
+    def energy(self):
+        return 0.
+
+    @property
+    def max_force(self):
+        return 0.
+
+    @property
+    def converged(self):
+        return True
+
+    def iterate(self):
+        """Positions are final, nothing to iterate"""
+        pass
+
+    def _assign_layers(self):
+        """Longest-path layering; returns layer index of each vertex."""
+        nb_vertices = self.graph.nb_vertices
+        targets = [[] for _ in range(nb_vertices)]
+        sources = [[] for _ in range(nb_vertices)]
+        for i, j in self.graph.edges:
+            if i != j:
+                targets[i] += [j]
+                sources[j] += [i]
+
+        layer_n = np.full(nb_vertices, -1, dtype=int)
+        nb_unplaced_targets_n = np.array([len(t) for t in targets], dtype=int)
+        ready = [i for i in range(nb_vertices) if nb_unplaced_targets_n[i] == 0]
+        nb_placed = 0
+        next_unplaced = 0
+        while nb_placed < nb_vertices:
+            if not ready:
+                # Cycle: place the first vertex not yet placed and move on
+                while layer_n[next_unplaced] >= 0:
+                    next_unplaced += 1
+                ready = [next_unplaced]
+            i = ready.pop()
+            if layer_n[i] >= 0:
+                continue
+            placed_targets = [layer_n[j] for j in targets[i] if layer_n[j] >= 0]
+            layer_n[i] = max(placed_targets) + 1 if placed_targets else 0
+            nb_placed += 1
+            for k in sources[i]:
+                nb_unplaced_targets_n[k] -= 1
+                if nb_unplaced_targets_n[k] == 0 and layer_n[k] < 0:
+                    ready += [k]
+        return layer_n
+
+    def _compute_positions(self):
+        nb_vertices = self.graph.nb_vertices
+        layer_n = self._assign_layers()
+
+        # Split edges into segments between adjacent layers, inserting
+        # virtual vertices (indices >= nb_vertices) at intermediate layers
+        vertex_layer = list(layer_n)
+        upper_neighbors = [[] for _ in range(nb_vertices)]
+        lower_neighbors = [[] for _ in range(nb_vertices)]
+        for i, j in self.graph.edges:
+            lower, upper = (i, j) if layer_n[i] > layer_n[j] else (j, i)
+            if lower == upper:
+                continue
+            for layer in range(vertex_layer[lower] - 1, vertex_layer[upper], -1):
+                virtual = len(vertex_layer)
+                vertex_layer += [layer]
+                upper_neighbors += [[]]
+                lower_neighbors += [[]]
+                upper_neighbors[lower] += [virtual]
+                lower_neighbors[virtual] += [lower]
+                lower = virtual
+            upper_neighbors[lower] += [upper]
+            lower_neighbors[upper] += [lower]
+
+        nb_layers = max(vertex_layer) + 1 if vertex_layer else 0
+        layers = [[] for _ in range(nb_layers)]
+        for v, layer in enumerate(vertex_layer):
+            layers[layer] += [v]
+
+        # Crossing reduction: reorder each layer by the barycenter of the
+        # order of its neighbors in the previous layer of the sweep
+        order = np.zeros(len(vertex_layer))
+        for layer in layers:
+            order[layer] = np.arange(len(layer))
+        for sweep in range(self.nb_sweeps):
+            if sweep % 2 == 0:
+                sweep_layers, neighbors = layers[1:], upper_neighbors
+            else:
+                sweep_layers, neighbors = layers[-2::-1], lower_neighbors
+            for layer in sweep_layers:
+                barycenters = [np.mean(order[neighbors[v]]) if neighbors[v] else order[v]
+                               for v in layer]
+                # Ties keep their previous order, which makes the result deterministic
+                layer[:] = [v for _, _, v in sorted(zip(barycenters, order[layer], layer))]
+                order[layer] = np.arange(len(layer))
+
+        # Coordinate assignment: move vertices towards the mean position of
+        # their upper neighbors, subject to the minimum in-layer distance
+        x = np.zeros(len(vertex_layer))
+        for layer in layers:
+            x[layer] = (np.arange(len(layer)) - (len(layer) - 1) / 2) * self.vertex_distance
+        for layer in layers[1:]:
+            desired = np.array([np.mean(x[upper_neighbors[v]]) if upper_neighbors[v] else x[v]
+                                for v in layer])
+            x[layer] = self._place_in_layer(desired)
+
+        positions = np.zeros((nb_vertices, 2))
+        positions[:, 0] = x[:nb_vertices]
+        positions[:, 1] = layer_n * self.layer_distance
+        self._positions = positions
+
+    def _place_in_layer(self, desired):
+        """Positions closest to `desired` that keep the order and minimum distance."""
+        d = self.vertex_distance
+        offset = np.arange(len(desired)) * d
+        # Each vertex may not move left of where its left neighbors push it,
+        # nor right of where its right neighbors push it. Compute both sweeps
+        # and average both; each of them, hence also the mean, keeps the distance
+        left = np.maximum.accumulate(desired - offset) + offset
+        right = np.minimum.accumulate((desired - offset)[::-1])[::-1] + offset
+        return (left + right) / 2
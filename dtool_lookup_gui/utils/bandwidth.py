@@ -0,0 +1,94 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Bandwidth limits shared between the GUI and copy processes."""
+
+import logging
+import multiprocessing
+import time
+
+logger = logging.getLogger(__name__)
+
+# slices of waiting, rate changes take effect after at most this many seconds
+_MAX_WAIT = 0.25
+
+# indices into the shared state
+_RATE = 0
+_BACKLOG = 1
+_LAST_TIME = 2
+
+
+class BandwidthLimit:
+    """
+    Transfer rate limit in bytes per second. A rate of 0 means unlimited.
+
+    The limit is a leaky bucket living in shared memory: all transfers that
+    acquire the same limit, in this or in any child process, share the rate.
+    The rate may be changed at any time and applies immediately to transfers
+    waiting in child processes. The limit must be handed to child processes
+    on their creation, e.g. as an argument of the process target.
+    """
+
+    def __init__(self, rate=0., clock=time.monotonic, sleep=time.sleep):
+        # rate, bytes granted but not yet drained at rate, time of last drain
+        self._state = multiprocessing.Array('d', [rate, 0., clock()])
+        self._clock = clock
+        self._sleep = sleep
+
+    @property
+    def rate(self):
+        return self._state[_RATE]
+
+    @rate.setter
+    def rate(self, value):
+        with self._state.get_lock():
+            self._drain(self._clock())
+            self._state[_RATE] = max(0., value)
+        logger.debug(f"Bandwidth limit set to {value} bytes per second")
+
+    def _drain(self, now):
+        rate = self._state[_RATE]
+        if rate > 0:
+            self._state[_BACKLOG] = max(0., self._state[_BACKLOG] - rate * (now - self._state[_LAST_TIME]))
+        else:
+            self._state[_BACKLOG] = 0.
+        self._state[_LAST_TIME] = now
+
+    def acquire(self, nbytes):
+        """Block until nbytes may be transferred without exceeding the rate"""
+        while True:
+            with self._state.get_lock():
+                self._drain(self._clock())
+                rate = self._state[_RATE]
+                backlog = self._state[_BACKLOG]
+                if rate <= 0 or backlog <= 0:
+                    if rate > 0:
+                        self._state[_BACKLOG] = nbytes
+                    return
+            self._sleep(min(backlog / rate, _MAX_WAIT))
+
+
+def acquire_bandwidth(limits, nbytes):
+    """Block until nbytes may be transferred without exceeding any of the limits"""
+    for limit in limits:
+        limit.acquire(nbytes)
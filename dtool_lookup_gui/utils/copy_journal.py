@@ -0,0 +1,156 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Persistent journal of unfinished dataset copies."""
+
+import json
+import logging
+import os
+import time
+import uuid
+
+from gi.repository import GLib
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+FAILED = 'failed'
+
+
+def _default_path():
+    return os.path.join(GLib.get_user_data_dir(), 'dtool-lookup-gui', 'copy-journal.json')
+
+
+class CopyJournal:
+    """
+    Persistent record of dataset copies that have not finished yet.
+
+    An entry is added when a copy is requested and removed once it succeeded
+    or was cancelled. A failed copy, e.g. after the network went away, keeps
+    its entry together with the error. Entries left behind hence identify
+    interrupted copies; copying their source to their destination again
+    resumes them. Progress, the number of bytes transferred so far, is
+    written at most every min_write_interval seconds, all other changes are
+    written immediately.
+    """
+
+    def __init__(self, path=None, min_write_interval=10., clock=time.monotonic):
+        if path is None:
+            path = _default_path()
+        self._path = path
+        self._min_write_interval = min_write_interval
+        self._clock = clock
+        self._last_write = None
+        self._entries = self._read()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def entries(self):
+        """Unfinished copies in the order they were requested"""
+        return sorted(self._entries.values(), key=lambda entry: entry['requested_at'])
+
+    def _read(self):
+        try:
+            with open(self._path, 'r') as f:
+                return {entry['id']: entry for entry in json.load(f)['copies']}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Could not read copy journal '%s': %s", self._path, exc)
+            return {}
+
+    def _write(self):
+        self._last_write = self._clock()
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            # Write to temporary file first to never leave a truncated file behind
+            tmp_path = self._path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'copies': self.entries}, f)
+            os.replace(tmp_path, self._path)
+        except OSError as exc:
+            logger.warning("Could not write copy journal '%s': %s", self._path, exc)
+
+    def add(self, source_uri, destination, name=None, dataset_uuid=None):
+        """Record a requested copy and return the id of its entry"""
+        entry_id = str(uuid.uuid4())
+        self._entries[entry_id] = {
+            'id': entry_id,
+            'source_uri': source_uri,
+            'destination': destination,
+            'name': name,
+            'uuid': dataset_uuid,
+            'state': PENDING,
+            'requested_at': time.time(),
+            'bytes_done': 0,
+            'error': None,
+        }
+        self._write()
+        return entry_id
+
+    def set_running(self, entry_id):
+        if entry_id in self._entries:
+            self._entries[entry_id]['state'] = RUNNING
+            self._write()
+
+    def set_failed(self, entry_id, error):
+        if entry_id in self._entries:
+            self._entries[entry_id]['state'] = FAILED
+            self._entries[entry_id]['error'] = error
+            self._write()
+
+    def set_progress(self, entry_id, bytes_done):
+        if entry_id not in self._entries:
+            return
+        self._entries[entry_id]['bytes_done'] = bytes_done
+        if self._last_write is None or self._clock() - self._last_write >= self._min_write_interval:
+            self._write()
+
+    def remove(self, entry_id):
+        if self._entries.pop(entry_id, None) is not None:
+            self._write()
+
+    def clear(self):
+        self._entries = {}
+        self._write()
+
+
+class JournaledProgress:
+    """Forward progress reports to a status box and record them in a copy journal"""
+
+    def __init__(self, tracker, journal, entry_id):
+        self._tracker = tracker
+        self._journal = journal
+        self._entry_id = entry_id
+
+    def set_step(self, step, length, transferred=None):
+        self._tracker.set_step(step, length, transferred=transferred)
+        # the tracker's count of transferred bytes, step also counts hashing
+        self._journal.set_progress(self._entry_id, self._tracker.transferred)
+
+    def __getattr__(self, name):
+        return getattr(self._tracker, name)
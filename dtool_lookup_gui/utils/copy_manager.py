@@ -23,55 +23,458 @@
 # SOFTWARE.
 #
 
+import asyncio
+import collections
+import itertools
 import logging
+import urllib.parse
+from contextlib import asynccontextmanager
+
+from gi.repository import GLib
+
+from .bandwidth import BandwidthLimit
+from .copy_journal import JournaledProgress
 
 
 logger = logging.getLogger(__name__)
 
 
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+
+
+def destination_key(destination):
+    """Storage a copy destination writes to.
+
+    Copies to different prefixes of the same bucket or server compete for the
+    same bandwidth, hence only scheme and host identify a destination. All
+    local directories share the local disk."""
+    parsed = urllib.parse.urlparse(str(destination))
+    return f'{parsed.scheme}://{parsed.netloc}'
+
+
+def _string_attribute(dataset, name):
+    """Attribute of dataset if it is a string, None otherwise"""
+    try:
+        value = getattr(dataset, name)
+    except (AttributeError, KeyError):
+        return None
+    return value if isinstance(value, str) else None
+
+
+async def _is_resumable(dataset, destination, error):
+    """Whether copying dataset to destination again may succeed after error.
+
+    This is the case if the failed copy left a proto dataset behind or if
+    the destination cannot be reached. A copy that failed because the
+    dataset is frozen at the destination already, or that failed before it
+    wrote anything for reasons other than the network, would fail again."""
+    try:
+        state = await dataset.get_copy_state(destination)
+    except Exception as exc:
+        logger.debug("Could not check copy of %s at %s: %s", dataset, destination, exc)
+        return True
+    if state is not None:
+        return state == 'protodataset'
+    return isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError))
+
+
+class CopyJob:
+    """A single copy operation in a CopyQueue"""
+
+    def __init__(self, destination, priority, sequence_number):
+        self.destination = destination
+        self.priority = priority
+        self.state = QUEUED
+        self._sequence_number = sequence_number
+        self._started = asyncio.Event()
+
+    @property
+    def destination_key(self):
+        return destination_key(self.destination)
+
+    @property
+    def sort_key(self):
+        return -self.priority, self._sequence_number
+
+
+class CopyQueue:
+    """Schedule copy operations with global and per-destination concurrency.
+
+    Jobs start in order of descending priority and, within the same priority,
+    in order of submission. A job that would exceed the limit of its
+    destination does not block jobs to other destinations. A limit of zero or
+    None means unlimited."""
+
+    def __init__(self, max_concurrent=2, max_concurrent_per_destination=1, on_change=None):
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_per_destination = max_concurrent_per_destination
+        self._on_change = on_change
+        self._queued = []
+        self._running = []
+        self._counter = itertools.count()
+
+    @property
+    def queued(self):
+        """Queued jobs in the order they will be started"""
+        return sorted(self._queued, key=lambda job: job.sort_key)
+
+    @property
+    def running(self):
+        return list(self._running)
+
+    def submit(self, destination, priority=0):
+        job = CopyJob(destination, priority, next(self._counter))
+        self._queued.append(job)
+        self._schedule()
+        return job
+
+    def set_limits(self, max_concurrent, max_concurrent_per_destination):
+        """Change the concurrency limits, running jobs beyond lowered limits finish"""
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_per_destination = max_concurrent_per_destination
+        self._schedule()
+
+    def set_priority(self, job, priority):
+        job.priority = priority
+        self._schedule()
+
+    def prioritize(self, job):
+        """Move a queued job to the front of the queue"""
+        if job.state == QUEUED:
+            self.set_priority(job, max(other.priority for other in self._queued) + 1)
+
+    def finish(self, job):
+        """Mark job as done (or withdraw it if it never ran)"""
+        if job.state == RUNNING:
+            self._running.remove(job)
+        elif job.state == QUEUED:
+            self._queued.remove(job)
+        else:
+            return
+        job.state = DONE
+        self._schedule()
+
+    @asynccontextmanager
+    async def slot(self, destination, priority=0, submitted=None):
+        """Wait until a copy to destination may start, hold the slot while in context.
+
+        The optional callback submitted(job) is called before waiting, i.e.
+        while the job is still queued."""
+        job = self.submit(destination, priority)
+        try:
+            if submitted is not None:
+                submitted(job)
+            await job._started.wait()
+            yield job
+        finally:
+            self.finish(job)
+
+    def _destination_has_capacity(self, job, running_per_destination):
+        return not (self.max_concurrent_per_destination and
+                    running_per_destination.get(job.destination_key, 0) >= self.max_concurrent_per_destination)
+
+    def _schedule(self):
+        """Start queued jobs as capacity permits, then notify about changes."""
+        running_per_destination = {}
+        for job in self._running:
+            key = job.destination_key
+            running_per_destination[key] = running_per_destination.get(key, 0) + 1
+
+        for job in self.queued:
+            if self.max_concurrent and len(self._running) >= self.max_concurrent:
+                break
+            if not self._destination_has_capacity(job, running_per_destination):
+                continue
+            self._queued.remove(job)
+            self._running.append(job)
+            job.state = RUNNING
+            key = job.destination_key
+            running_per_destination[key] = running_per_destination.get(key, 0) + 1
+            logger.debug(f"Starting copy to {job.destination}, "
+                         f"{len(self._running)} running, {len(self._queued)} queued.")
+            job._started.set()
+
+        if self._on_change is not None:
+            self._on_change()
+
+
 class CopyManager:
     """Keep track of running copy operations"""
 
     _margin = 6
+    # the progress chart is refreshed at most every this many milliseconds
+    _chart_update_interval = 100
 
-    def __init__(self, progress_revealer, progress_popover):
+    def __init__(self, progress_revealer, progress_popover,
+                 max_concurrent_copies=2, max_concurrent_copies_per_destination=1, journal=None,
+                 bandwidth_limit=None, bandwidth_limit_per_copy=0.):
         # Note: This is not particularly abstract, as it interacts directly with the Gtk widgets
         self._progress_revealer = progress_revealer
         self._progress_chart = progress_revealer.get_child().get_child()
         self._progress_popover = progress_popover
+        self._copy_queue = CopyQueue(max_concurrent_copies, max_concurrent_copies_per_destination,
+                                     on_change=self.queue_update)
+        self._trackers = {}
+        # running totals over all status boxes, updated by their progress reports
+        self._total_step = 0
+        self._total_length = 0
+        self._chart_update_source = None
+        # optional CopyJournal recording unfinished copies across sessions
+        self._journal = journal
+        # optional BandwidthLimit shared by all copies, and initial limit in bytes per second of every copy
+        self._bandwidth_limit = bandwidth_limit
+        self._bandwidth_limit_per_copy = bandwidth_limit_per_copy
+
+    @property
+    def copy_queue(self):
+        return self._copy_queue
+
+    @property
+    def journal(self):
+        return self._journal
 
-    async def copy(self, dataset, destination):
+    @property
+    def bandwidth_limit_per_copy(self):
+        """Initial limit in bytes per second of every new copy, 0 means unlimited"""
+        return self._bandwidth_limit_per_copy
+
+    @bandwidth_limit_per_copy.setter
+    def bandwidth_limit_per_copy(self, value):
+        self._bandwidth_limit_per_copy = value
+
+    def _bandwidth_limits(self, own_limit):
+        return tuple(limit for limit in (self._bandwidth_limit, own_limit) if limit is not None)
+
+    def _journal_add(self, dataset, destination):
+        if self._journal is None:
+            return None
+        return self._journal.add(str(dataset), destination, name=_string_attribute(dataset, 'name'),
+                                 dataset_uuid=_string_attribute(dataset, 'uuid'))
+
+    def _journal_start(self, entry_id, tracker):
+        """Mark journal entry as running, return progress bar that records progress in the journal."""
+        if entry_id is None:
+            return tracker
+        self._journal.set_running(entry_id)
+        return JournaledProgress(tracker, self._journal, entry_id)
+
+    def _journal_remove(self, entry_id):
+        if entry_id is not None:
+            self._journal.remove(entry_id)
+
+    async def _journal_finish(self, entry_id, dataset, destination, error=None):
+        """Forget a copy that succeeded or was cancelled, keep a failed one if it may be resumed later."""
+        if entry_id is None:
+            return
+        if error is not None and await _is_resumable(dataset, destination, error):
+            self._journal.set_failed(entry_id, str(error))
+        else:
+            self._journal.remove(entry_id)
+
+    async def copy(self, dataset, destination, priority=0):
         self._progress_revealer.set_reveal_child(True)
+        copy_job = None
+        cancel_requested = False
+        journal_entry = self._journal_add(dataset, destination)
+        bandwidth_limit = BandwidthLimit(self._bandwidth_limit_per_copy)
+
+        def cancel(button):
+            nonlocal cancel_requested
+            cancel_requested = True
+            copy_task.cancel()
+
+        def prioritize(button):
+            if copy_job is not None:
+                self._copy_queue.prioritize(copy_job)
+
+        # The status box exists before the copy enters the queue, such that
+        # failures and cancellation before it got a slot show up there as well
         tracker = self._progress_popover.add_status_box(
-            self.progress_update, f'Copying dataset »{dataset}« to »{destination}«')
-        error_msg = None
+            self.progress_update, f'Copying dataset »{dataset}« to »{destination}«',
+            on_cancel=cancel, on_prioritize=prioritize, bandwidth_limit=bandwidth_limit)
+        self._total_length += len(tracker)
+
+        def submitted(job):
+            nonlocal copy_job
+            copy_job = job
+            self._trackers[job] = tracker
+            self.queue_update()
+
+        async def copy_in_slot():
+            async with self._copy_queue.slot(destination, priority, submitted=submitted):
+                await dataset.copy(destination, progressbar=self._journal_start(journal_entry, tracker),
+                                   bandwidth_limits=self._bandwidth_limits(bandwidth_limit))
+
+        # Cancelling this inner task terminates the copy process. The partial
+        # copy stays behind as a proto dataset that the next copy to the same
+        # destination resumes.
+        copy_task = asyncio.ensure_future(copy_in_slot())
+
+        error = None
+        cancelled = False
         try:
-            await dataset.copy(destination, progressbar=tracker)
+            await copy_task
+        except asyncio.CancelledError:
+            if not cancel_requested:
+                raise
+            logger.info(f"Copy of dataset {dataset} to {destination} cancelled.")
+            cancelled = True
         except ChildProcessError as exc:
             # dtoolcore.DtoolCoreTypeError: xyz is not a ProtoDataSet
             # arises if the dataset exists at the destination already.
             # TODO: check content of exc to provide simple "dataset exists" msg
             logger.error(str(exc))
-            error_msg = str(exc)
+            error = exc
         except Exception as exc:
             # Catch-all: missing storage plugin, wrong endpoint, network errors, etc.
             # Without this, any unexpected exception leaves the progress bar frozen forever.
             logger.error("Copy failed: %s", exc)
+            error = exc
+        error_msg = None if error is None else str(error)
+
+        # Copies interrupted by quitting the application stay in the journal, and so do resumable failed ones
+        await self._journal_finish(journal_entry, dataset, destination, error)
+        self._trackers.pop(copy_job, None)
+        self._finish(tracker, cancelled, error_msg)
+
+    async def copy_batch(self, datasets, destination, plan=None):
+        """Copy several datasets to the same destination as one operation.
+
+        The optional function plan(datasets, destination) runs in a thread and
+        returns the datasets to copy, in order, and the datasets to skip. A
+        fixed number of workers takes datasets to copy one after another,
+        each waiting for a slot in the copy queue. The batch shows as a single
+        status box with one child status box per dataset."""
+        self._progress_revealer.set_reveal_child(True)
+        cancel_requested = False
+
+        def cancel(button):
+            nonlocal cancel_requested
+            cancel_requested = True
+            batch_task.cancel()
+
+        # one limit shared by all copies of the batch
+        bandwidth_limit = BandwidthLimit(self._bandwidth_limit_per_copy)
+        batch_tracker = self._progress_popover.add_status_box(
+            self.progress_update, f'Copying {len(datasets)} datasets to »{destination}«', on_cancel=cancel,
+            bandwidth_limit=bandwidth_limit)
+        self._total_length += len(batch_tracker)
+        batch_tracker.set_queued()
+        failed = []
+        journal_entries = []
+
+        async def copy_one(dataset, tracker, journal_entry):
+            error = None
+            try:
+                async with self._copy_queue.slot(destination):
+                    tracker.set_running()
+                    await dataset.copy(destination, progressbar=self._journal_start(journal_entry, tracker),
+                                       bandwidth_limits=self._bandwidth_limits(bandwidth_limit))
+            except Exception as exc:
+                logger.error("Copy of %s failed: %s", dataset, exc)
+                error = exc
+                failed.append(dataset)
+            error_msg = None if error is None else str(error)
+            await self._journal_finish(journal_entry, dataset, destination, error)
+            # Work left undone by a failed copy will not happen anymore
+            tracker.set_step(tracker.step, tracker.step, tracker.transferred)
+            tracker.set_done(error=error_msg)
+
+        async def run_batch():
+            if plan is None:
+                to_copy, skipped = list(datasets), []
+            else:
+                loop = asyncio.get_running_loop()
+                to_copy, skipped = await loop.run_in_executor(None, plan, datasets, destination)
+            for dataset in skipped:
+                batch_tracker.add_child_status_box(f'»{dataset}«').set_skipped('exists at destination')
+            pending = collections.deque()
+            for dataset in to_copy:
+                tracker = batch_tracker.add_child_status_box(f'»{dataset}«')
+                tracker.set_queued()
+                journal_entries.append(self._journal_add(dataset, destination))
+                pending.append((dataset, tracker, journal_entries[-1]))
+
+            async def worker():
+                while pending:
+                    await copy_one(*pending.popleft())
+
+            limits = [limit for limit in (self._copy_queue.max_concurrent,
+                                          self._copy_queue.max_concurrent_per_destination) if limit]
+            nb_workers = max(1, min(limits + [len(to_copy)]))
+            await asyncio.gather(*[worker() for _ in range(nb_workers)])
+
+        batch_task = asyncio.ensure_future(run_batch())
+
+        cancelled = False
+        error_msg = None
+        try:
+            await batch_task
+        except asyncio.CancelledError:
+            if not cancel_requested:
+                raise
+            logger.info(f"Batch copy to {destination} cancelled.")
+            cancelled = True
+            for journal_entry in journal_entries:
+                self._journal_remove(journal_entry)
+            for tracker in batch_tracker.child_status_boxes:
+                if not tracker.is_done:
+                    tracker.set_step(tracker.step, tracker.step, tracker.transferred)
+                    tracker.set_cancelled()
+        except Exception as exc:
+            # e.g. planning the batch failed before any copy started
+            logger.error("Batch copy to %s failed: %s", destination, exc)
             error_msg = str(exc)
 
-        tracker.set_done(error=error_msg)
+        if failed:
+            error_msg = f'{len(failed)} of {len(datasets)} copies failed'
+        self._finish(batch_tracker, cancelled, error_msg)
+
+    def _finish(self, tracker, cancelled=False, error_msg=None):
+        if cancelled:
+            tracker.set_cancelled()
+        else:
+            tracker.set_done(error=error_msg)
+        # Work left undone by a failed or cancelled copy will not happen anymore
+        self.progress_update(length_delta=tracker.step - len(tracker))
 
         # Once all copy operations are done, we hide the pie chart and clear the popover
         if all([tracker.is_done for tracker in self._progress_popover.status_boxes]):
             for tracker in self._progress_popover.status_boxes:
                 tracker.destroy()
             self._progress_revealer.set_reveal_child(False)
+            self._total_step = self._total_length = 0
 
-    def progress_update(self):
-        # Refresh pie chart
-        total_length = sum([len(tracker) for tracker in self._progress_popover.status_boxes])
-        total_step = sum([tracker.step for tracker in self._progress_popover.status_boxes])
-        if total_length > 0:
-            self._progress_chart.set_fraction(total_step / total_length)
+    def queue_update(self):
+        # Show queue positions and start of copy operations in the status boxes
+        for position, job in enumerate(self._copy_queue.queued, start=1):
+            if job in self._trackers:
+                self._trackers[job].set_queued(position)
+        for job in self._copy_queue.running:
+            if job in self._trackers and not self._trackers[job].is_running:
+                self._trackers[job].set_running()
+
+    def progress_update(self, step_delta=0, length_delta=0, transferred_delta=0):
+        """Account for progress reported by a status box, refresh the pie chart soon.
+
+        The throughput shown is aggregated from the status boxes, hence transferred_delta is not needed here."""
+        self._total_step += step_delta
+        self._total_length += length_delta
+        if self._chart_update_source is None:
+            self._chart_update_source = GLib.timeout_add(self._chart_update_interval, self._update_chart)
+
+    def _update_chart(self):
+        self._chart_update_source = None
+        if self._total_length > 0:
+            self._progress_chart.set_fraction(self._total_step / self._total_length)
         else:
             self._progress_chart.set_fraction(1.)
+
+        # Aggregate throughput of running copies
+        rates = [tracker.rate for tracker in self._progress_popover.status_boxes if tracker.rate is not None]
+        total_rate = sum(rates) if rates else None
+        eta = (self._total_length - self._total_step) / total_rate if total_rate else None
+        self._progress_chart.set_throughput(total_rate, eta)
+        return GLib.SOURCE_REMOVE
@@ -0,0 +1,240 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Cache of converged dependency graph layouts."""
+
+import collections
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from gi.repository import GLib
+
+logger = logging.getLogger(__name__)
+
+# golden angle, spreads vertices placed around the same neighbor evenly
+_GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+
+def _default_cache_directory():
+    return os.path.join(GLib.get_user_cache_dir(), 'dtool-lookup-gui', 'graph-layouts')
+
+
+def graph_key(graph):
+    """
+    Hash identifying a graph by the UUIDs of its vertices and its edges.
+
+    Returns None if not all vertices carry a UUID.
+    """
+    try:
+        uuids = graph.get_vertex_properties('uuid')
+    except KeyError:
+        return None
+    edges = sorted(f'{uuids[i]}>{uuids[j]}' for i, j in graph.edges)
+    h = hashlib.sha256()
+    h.update('\n'.join(sorted(uuids)).encode())
+    h.update(b'\n\n')
+    h.update('\n'.join(edges).encode())
+    return h.hexdigest()
+
+
+def _root_uuid(graph):
+    for vertex in graph.vertex_properties:
+        if vertex.get('kind') == 'root' and 'uuid' in vertex:
+            return vertex['uuid']
+    return None
+
+
+def place_new_vertices(graph, positions, distance=2):
+    """
+    Fill in positions of vertices not known yet (NaN rows).
+
+    New vertices are placed around the mean position of their already placed
+    neighbors, at the given distance. Vertices without any placed neighbor
+    end up in a row below all other vertices.
+    """
+    positions = np.array(positions, dtype=float)
+    unknown = np.any(np.isnan(positions), axis=1)
+
+    neighbors = [[] for _ in range(graph.nb_vertices)]
+    for i, j in graph.edges:
+        neighbors[i] += [j]
+        neighbors[j] += [i]
+
+    # Grow from placed vertices, new vertices of one pass seed the next pass
+    while np.any(unknown):
+        placed = []
+        for i in np.nonzero(unknown)[0]:
+            known = [j for j in neighbors[i] if not unknown[j]]
+            if known:
+                angle = i * _GOLDEN_ANGLE
+                positions[i] = np.mean(positions[known], axis=0) + \
+                    distance * np.array([np.cos(angle), np.sin(angle)])
+                placed += [i]
+        if not placed:
+            break
+        unknown[placed] = False
+
+    if np.any(unknown):
+        if np.all(unknown):
+            x0, y0 = 0, 0
+        else:
+            x0, y0 = np.min(positions[~unknown], axis=0) - np.array([0, distance])
+        nb_unknown = np.sum(unknown)
+        positions[unknown, 0] = x0 + distance * np.arange(nb_unknown)
+        positions[unknown, 1] = y0
+
+    return positions
+
+
+class LayoutCache:
+    """
+    Remember converged vertex positions of dependency graphs.
+
+    Layouts are kept in memory and as JSON files on disk, keyed by
+    `graph_key`. In addition, the most recent layout stored for a root
+    dataset is kept. If a graph is not known exactly, e.g. since datasets
+    have been derived from the root in the meantime, this layout seeds the
+    positions of all vertices it knows.
+
+    At most max_layouts layouts are kept, in memory and on disk each. Beyond
+    that, the least recently used ones are dropped.
+    """
+
+    def __init__(self, directory=None, max_layouts=1000):
+        if directory is None:
+            directory = _default_cache_directory()
+        self._directory = directory
+        self._max_layouts = max_layouts
+        # least recently used first
+        self._layouts = collections.OrderedDict()
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def _path(self, name):
+        return os.path.join(self._directory, f'{name}.json')
+
+    def _remember(self, name, uuid_positions):
+        self._layouts[name] = uuid_positions
+        self._layouts.move_to_end(name)
+        while len(self._layouts) > self._max_layouts:
+            self._layouts.popitem(last=False)
+
+    def _read(self, name):
+        """Return uuid -> position mapping stored under name, or None."""
+        if name in self._layouts:
+            uuid_positions = self._layouts[name]
+            # the modification time of the file tracks its last use
+            try:
+                os.utime(self._path(name))
+            except OSError:
+                pass
+        else:
+            try:
+                with open(self._path(name), 'r') as f:
+                    uuid_positions = json.load(f)['positions']
+                os.utime(self._path(name))
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning("Could not read cached graph layout '%s': %s", self._path(name), exc)
+                return None
+        self._remember(name, uuid_positions)
+        return uuid_positions
+
+    def _write(self, name, uuid_positions):
+        self._remember(name, uuid_positions)
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            # Write to temporary file first to never leave a truncated file behind
+            tmp_path = self._path(name) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'positions': uuid_positions}, f)
+            os.replace(tmp_path, self._path(name))
+        except OSError as exc:
+            logger.warning("Could not write cached graph layout '%s': %s", self._path(name), exc)
+        self._prune()
+
+    def _prune(self):
+        """Remove the least recently used layout files beyond max_layouts."""
+        try:
+            paths = [entry.path for entry in os.scandir(self._directory) if entry.name.endswith('.json')]
+            if len(paths) <= self._max_layouts:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:len(paths) - self._max_layouts]:
+                os.remove(path)
+        except OSError as exc:
+            logger.warning("Could not prune cached graph layouts in '%s': %s", self._directory, exc)
+
+    def lookup(self, graph, distance=2):
+        """
+        Return initial positions for graph, or None if nothing is known.
+
+        Positions of an identical graph are returned as they are. Otherwise,
+        vertices are seeded from the latest layout of the same root and the
+        remaining vertices are placed next to their neighbors.
+        """
+        key = graph_key(graph)
+        if key is None:
+            return None
+
+        uuids = graph.get_vertex_properties('uuid')
+        exact = True
+        uuid_positions = self._read(key)
+        if uuid_positions is None:
+            root_uuid = _root_uuid(graph)
+            if root_uuid is None:
+                return None
+            uuid_positions = self._read(f'root-{root_uuid}')
+            if uuid_positions is None:
+                return None
+            exact = False
+
+        positions = np.array([uuid_positions.get(uuid, [np.nan, np.nan]) for uuid in uuids], dtype=float)
+        if exact:
+            logger.debug("Reuse cached layout for graph '%s'.", key)
+            return positions
+        if np.all(np.isnan(positions)):
+            return None
+        logger.debug("Seed layout for graph '%s' with %d of %d cached vertex positions.", key,
+                     np.sum(~np.isnan(positions[:, 0])), len(uuids))
+        return place_new_vertices(graph, positions, distance=distance)
+
+    def store(self, graph, positions):
+        """Remember positions of graph."""
+        key = graph_key(graph)
+        if key is None:
+            return
+        uuid_positions = {uuid: [float(x), float(y)]
+                          for uuid, (x, y) in zip(graph.get_vertex_properties('uuid'), positions)}
+        logger.debug("Cache layout for graph '%s'.", key)
+        self._write(key, uuid_positions)
+        root_uuid = _root_uuid(graph)
+        if root_uuid is not None:
+            self._write(f'root-{root_uuid}', uuid_positions)
@@ -0,0 +1,115 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Relax graph layouts off the GTK main loop."""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class GraphLayoutWorker:
+    """
+    Run the iterations of a GraphLayout in a background thread.
+
+    The first `nb_fast_iterations` steps run back to back, all further steps
+    are paced by `interval` (in seconds). After every step, a copy of the
+    positions is published as a snapshot. Consumers only ever read snapshots,
+    never the positions the worker is modifying. The worker stops by itself
+    once the layout has converged.
+    """
+
+    def __init__(self, layout, nb_fast_iterations=100, interval=0.05):
+        self._layout = layout
+        self._nb_fast_iterations = nb_fast_iterations
+        self._interval = interval
+
+        self._positions = layout.positions.copy()
+        self._generation = 0
+        self._nb_iterations = 0
+
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='GraphLayoutWorker')
+
+    @property
+    def layout(self):
+        return self._layout
+
+    @property
+    def positions(self):
+        """Latest published snapshot of the vertex positions."""
+        return self._positions
+
+    @property
+    def generation(self):
+        """Counter incremented with each published snapshot."""
+        return self._generation
+
+    @property
+    def nb_iterations(self):
+        return self._nb_iterations
+
+    @property
+    def is_running(self):
+        return self._thread.is_alive()
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        """Ask the worker to stop after the current iteration."""
+        self._cancelled.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _publish(self):
+        # Rebinding the attribute is atomic, readers see either the old or
+        # the new snapshot, never a partially updated array
+        self._positions = self._layout.positions.copy()
+        self._generation += 1
+
+    def _run(self):
+        logger.debug("Start relaxing graph layout of %d vertices.", self._layout.graph.nb_vertices)
+        while not self._cancelled.is_set():
+            try:
+                self._layout.iterate()
+            except Exception as e:
+                logger.error(str(e))
+                break
+            self._nb_iterations += 1
+            self._publish()
+            if self._layout.converged:
+                logger.debug("Graph layout converged, max |force|: %s.", self._layout.max_force)
+                break
+            if self._nb_iterations >= self._nb_fast_iterations:
+                # wait() returns True once cancelled
+                if self._cancelled.wait(self._interval):
+                    break
+        logger.debug("Stopped relaxing graph layout after %d iterations.", self._nb_iterations)
@@ -29,7 +29,6 @@
 import asyncio
 import logging
 import multiprocessing  # run task as child process to avoid side effects
-import queue
 import traceback  # forward exception from child process to parent process
 
 
@@ -48,46 +47,29 @@ def process_initializer():
     gi.require_version('Gtk', '3.0')
 
 
-# inspired by
-# https://stackoverflow.com/questions/19924104/python-multiprocessing-handling-child-errors-in-parent
-class Process(multiprocessing.Process):
-    """
-    Class which returns child Exceptions to Parent.
-    https://stackoverflow.com/a/33599967/4992248
-    """
-
-    def __init__(self, *args, **kwargs):
-        multiprocessing.Process.__init__(self, *args, **kwargs)
-        self._parent_conn, self._child_conn = multiprocessing.Pipe()
-        self._exception = None
-
-    def run(self):
-        try:
-            super().run()
-            self._child_conn.send(None)
-        except Exception as e:
-            tb = traceback.format_exc()
-            self._child_conn.send((e, tb))
-            raise e  # You can still rise this exception if you need to
-
-    @property
-    def exception(self):
-        if self._parent_conn.poll():
-            self._exception = self._parent_conn.recv()
-        return self._exception
+# message kinds sent from child to parent process
+_STATUS_REPORT = 'status-report'
+_RETURN_VALUE = 'return-value'
+_EXCEPTION = 'exception'
 
 
 class TargetWrapper:
     def __init__(self, target):
         self._target = target
 
-    def __call__(self, return_value_queue, status_progress_queue, *args):
+    def __call__(self, connection, *args):
         class StatusReportClass:
             def update(status_report):
-                logger.debug(f"Child process queues status report {status_report}")
-                status_progress_queue.put(status_report)
+                logger.debug(f"Child process sends status report {status_report}")
+                connection.send((_STATUS_REPORT, status_report))
 
-        return_value_queue.put(self._target(*args, status_report_callback=StatusReportClass))
+        try:
+            return_value = self._target(*args, status_report_callback=StatusReportClass)
+        except Exception:
+            connection.send((_EXCEPTION, traceback.format_exc()))
+            raise
+        connection.send((_RETURN_VALUE, return_value))
+        connection.close()
 
 
 class StatusReportingChildProcessBuilder:
@@ -99,7 +81,16 @@ class StatusReportingChildProcessBuilder:
 
     For any function that runs serial and reports status via such a callback,
     this wrapper can run them in a non-blocking forked process and forward the
-    status reports via queue to the callback.
+    status reports via pipe to the callback.
+
+    The parent process does not poll. The read end of the pipe is registered
+    with the event loop, and every wakeup drains all pending status reports.
+    The return value, an exception or the termination of the child wake the
+    waiting coroutine immediately. On event loops without add_reader support
+    (i.e. the proactor loop on Windows), a watcher thread receives the
+    messages instead.
+
+    Cancelling the awaiting coroutine terminates the child process.
 
     The function must have the signature
 
@@ -109,36 +100,95 @@ class StatusReportingChildProcessBuilder:
         self._target_wrapper = TargetWrapper(target)
         self._status_report_handler = status_report_callback
 
+    def _dispatch(self, message, result):
+        """Handle a single message from the child, return True if final."""
+        kind, payload = message
+        if kind == _STATUS_REPORT:
+            logger.debug(f"Parent process received status report {payload}")
+            self._status_report_handler.update(payload)
+            return False
+        if result.done():
+            return True
+        if kind == _RETURN_VALUE:
+            result.set_result(payload)
+        else:
+            result.set_exception(ChildProcessError(payload))
+        return True
+
+    def _dispatch_eof(self, process, result):
+        """Child closed its end of the pipe without return value."""
+        if result.done():
+            return
+
+        def set_exception(join):
+            if not result.done():
+                result.set_exception(ChildProcessError(
+                    f"Child process terminated with exit code {process.exitcode} "
+                    f"without returning a value"))
+
+        # wait for the exit code without blocking the event loop
+        result.get_loop().run_in_executor(None, process.join).add_done_callback(set_exception)
+
+    def _drain(self, connection, process, result):
+        """Reader callback, receive all messages pending in the pipe."""
+        try:
+            while not result.done() and connection.poll():
+                self._dispatch(connection.recv(), result)
+        except EOFError:
+            # the pipe stays readable at its end, stop watching it
+            result.get_loop().remove_reader(connection.fileno())
+            self._dispatch_eof(process, result)
+        except Exception as e:
+            if not result.done():
+                result.set_exception(e)
+
+    def _watch(self, loop, connection, process, result):
+        """Watcher thread, forward messages to the event loop."""
+        try:
+            while True:
+                message = connection.recv()
+                loop.call_soon_threadsafe(self._dispatch, message, result)
+                if message[0] != _STATUS_REPORT:
+                    return
+        except EOFError:
+            loop.call_soon_threadsafe(self._dispatch_eof, process, result)
+
     async def __call__(self, *args):
         """Spawn child process to assure my environment stays untouched."""
-        return_value_queue = multiprocessing.Queue()
-        status_progress_queue = multiprocessing.Queue()
-        process = Process(target=self._target_wrapper, args=[return_value_queue, status_progress_queue, *args])
+        loop = asyncio.get_running_loop()
+        connection, child_connection = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=self._target_wrapper, args=[child_connection, *args])
         process.start()
+        # only the child may hold the write end, otherwise we would never
+        # see the end of file if the child terminates without any message
+        child_connection.close()
 
-        # wait for child to queue its return value and
-        # check whether child raises exception
-        while return_value_queue.empty():
-            # if child raises exception, then it has terminated
-            # before queueing any return value
-            if process.exception:
-                error, p_traceback = process.exception
-                raise ChildProcessError(p_traceback)
-
-            try:
-                status_report = status_progress_queue.get_nowait()
-            except queue.Empty:
-                pass
-            else:
-                logger.debug(f"Parent process received status report {status_report}")
-                self._status_report_handler.update(status_report)
+        result = loop.create_future()
+        fd = connection.fileno()
+        try:
+            loop.add_reader(fd, self._drain, connection, process, result)
+        except NotImplementedError:
+            fd = None
+            watcher = loop.run_in_executor(None, self._watch, loop, connection, process, result)
 
-            await asyncio.sleep(0.1)
+        try:
+            return_value = await result
+        except asyncio.CancelledError:
+            # stop the child, its write end closes and a watcher thread sees EOF
+            logger.debug(f"Terminating child process {process.pid}")
+            process.terminate()
+            await loop.run_in_executor(None, process.join)
+            raise
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+                connection.close()
+            else:
+                await watcher
+                connection.close()
 
-        return_value = return_value_queue.get()
-        # for any child that never raises an exception and does not queue
-        # anything to the return_value_queue, will deadlock here
-        process.join()
+        # the child exits right after sending its return value
+        await loop.run_in_executor(None, process.join)
         return return_value
 
 
@@ -26,6 +26,8 @@
 """Progressbar"""
 
 import logging
+import math
+import time
 
 from gi.repository import Gtk
 
@@ -82,14 +84,16 @@ class ProgressBar(AbstractContextManager):
 
     def update(self, step):
         self._step += step
-        fraction = float(self._step) / float(self._length)
+        fraction = float(self._step) / float(self._length) if self._length else 1.
         if self._pb is not None:
             if hasattr(self._pb, 'set_fraction'):
                 self._pb.set_fraction(fraction)
             if hasattr(self._pb, 'set_step'):
                 self._pb.set_step(self._step, self._length)
-        logger.info(f"Progress fraction {fraction}")
-        self._set_text()
+        logger.debug(f"Progress fraction {fraction}")
+        # only the item shown changes the text from step to step
+        if self._item_show_func is not None:
+            self._set_text()
 
     def _set_text(self):
         if self._label is not None and self._item_show_func is not None:
@@ -107,4 +111,66 @@ class ProgressBar(AbstractContextManager):
                 self._pb.set_show_text(False)
 
         if text is not None:
-            logger.info(text)
\ No newline at end of file
+            logger.info(text)
+
+
+class ThroughputEstimator:
+    """Exponentially smoothed rate of progress in steps per second.
+
+    The weight of past samples decays with time_constant (in seconds), so
+    bursts of fast small items followed by slow large ones do not make the
+    rate (and the remaining time estimated from it) jump around."""
+    def __init__(self, time_constant=5., clock=time.monotonic):
+        self._time_constant = time_constant
+        self._clock = clock
+        self._last_time = None
+        self._last_step = None
+        self._rate = None
+
+    @property
+    def rate(self):
+        """Smoothed rate or None before the second sample"""
+        return self._rate
+
+    def update(self, step):
+        """Record absolute progress step"""
+        now = self._clock()
+        if self._last_time is None:
+            self._last_time, self._last_step = now, step
+            return
+        dt = now - self._last_time
+        if dt <= 0:
+            return
+        instantaneous_rate = (step - self._last_step) / dt
+        if self._rate is None:
+            self._rate = instantaneous_rate
+        else:
+            self._rate += (1 - math.exp(-dt / self._time_constant)) * (instantaneous_rate - self._rate)
+        self._last_time, self._last_step = now, step
+
+    def eta(self, remaining):
+        """Seconds until remaining steps are done or None if unknown"""
+        if not self._rate or self._rate <= 0:
+            return None
+        return remaining / self._rate
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours > 0:
+        return f'{hours}h {minutes:02d}m'
+    if minutes > 0:
+        return f'{minutes}m {seconds:02d}s'
+    return f'{seconds}s'
+
+
+def format_throughput(rate, eta):
+    """Human readable rate in bytes per second and remaining time"""
+    if rate is None:
+        return ''
+    text = f'{rate / 1e6:.1f} MB/s'
+    if eta is not None:
+        text += f', {format_duration(eta)} left'
+    return text
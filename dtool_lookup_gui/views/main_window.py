@@ -53,17 +53,21 @@ import yamllint.linter
 dtool_lookup_api.core.config.Config.interactive = False
 
 from ..models.base_uris import all, LocalBaseURIModel
-from ..models.datasets import DatasetModel
+from ..models.datasets import DatasetModel, plan_batch_copy
 from ..models.settings import settings
 from ..models.search_state import SearchState
+from ..utils.bandwidth import BandwidthLimit
+from ..utils.copy_journal import CopyJournal
 from ..utils.copy_manager import CopyManager
 from ..utils.date import date_to_string
 from ..utils.dependency_graph import DependencyGraph
+from ..utils.layout_cache import LayoutCache
 from ..utils.logging import FormattedSingleMessageGtkInfoBarHandler, DefaultFilter, _log_nested
 from ..utils.query import (is_valid_query, dump_single_line_query_text)
 from ..utils.subprocess import launch_default_app_for_uri
 from ..widgets.base_uri_list_box import LOOKUP_BASE_URI
 from ..widgets.base_uri_row import DtoolBaseURIRow
+from ..widgets.graph_widget import EXPORT_FORMATS
 from ..widgets.search_popover import DtoolSearchPopover
 from ..widgets.search_results_row import DtoolSearchResultsRow
 from .dataset_name_dialog import DatasetNameDialog
@@ -105,12 +109,21 @@ def _fill_manifest_tree_store(store, manifest, parent=None):
                       uuid])
 
 
+def _journaled_dataset(entry):
+    """Dataset of a copy recorded in the copy journal"""
+    return DatasetModel(dataset_info={'uri': entry['source_uri'], 'name': entry['name'], 'uuid': entry.get('uuid')})
+
+
 @Gtk.Template(filename=f'{os.path.dirname(__file__)}/main_window.ui')
 class MainWindow(Gtk.ApplicationWindow):
     __gtype_name__ = 'DtoolMainWindow'
 
     _max_nb_datasets = 100
 
+    # actions on the single dataset whose details are shown, disabled while several datasets are selected
+    _single_dataset_actions = ('get-item', 'put-tag', 'put-annotation', 'delete-tag', 'delete-annotation',
+                               'add-item', 'freeze-dataset', 'save-metadata')
+
     create_dataset_button = Gtk.Template.Child()
     menu_button = Gtk.Template.Child()
 
@@ -195,6 +208,9 @@ class MainWindow(Gtk.ApplicationWindow):
         # Initialize pagination and sort parameters
         self.search_state = SearchState()
 
+        # base URI the dataset list currently shows, None for search results
+        self._dataset_list_base_uri = None
+
         self.application = self.get_application()
 
         self.main_stack.set_visible_child(self.main_label)
@@ -340,6 +356,20 @@ class MainWindow(Gtk.ApplicationWindow):
         build_dependency_graph_by_uri_action.connect("activate", self.do_build_dependency_graph_by_uri)
         self.add_action(build_dependency_graph_by_uri_action)
 
+        # select layout engine of dependency graph, 'force' or 'layered'
+        layout_engine_variant = GLib.Variant.new_string("force")
+        dependency_graph_layout_action = Gio.SimpleAction.new_stateful(
+            "dependency-graph-layout", layout_engine_variant.get_type(), layout_engine_variant)
+        dependency_graph_layout_action.connect("change-state", self.do_set_dependency_graph_layout)
+        self.add_action(dependency_graph_layout_action)
+
+        # export dependency graph — (file name, include dataset names) tuple
+        export_dependency_graph_variant_type = GLib.VariantType.new("(sb)")
+        export_dependency_graph_action = Gio.SimpleAction.new("export-dependency-graph",
+                                                              export_dependency_graph_variant_type)
+        export_dependency_graph_action.connect("activate", self.do_export_dependency_graph)
+        self.add_action(export_dependency_graph_action)
+
         # search, select and show first search result subsequently
         row_index_variant = GLib.Variant.new_string("dummy")
         search_select_show_action = Gio.SimpleAction.new("search-select-show", row_index_variant.get_type())
@@ -436,6 +466,12 @@ class MainWindow(Gtk.ApplicationWindow):
         copy_dataset_action.connect("activate", self.do_copy_dataset)
         self.add_action(copy_dataset_action)
 
+        # copy several datasets to the same destination (source_uris, destination_uri)
+        copy_datasets_variant_type = GLib.VariantType.new("(ass)")
+        copy_datasets_action = Gio.SimpleAction.new("copy-datasets", copy_datasets_variant_type)
+        copy_datasets_action.connect("activate", self.do_copy_datasets)
+        self.add_action(copy_datasets_action)
+
         # add local directory as base URI (uri string)
         add_local_dir_variant = GLib.Variant.new_string("dummy")
         add_local_dir_action = Gio.SimpleAction.new("add-local-directory", add_local_dir_variant.get_type())
@@ -443,8 +479,35 @@ class MainWindow(Gtk.ApplicationWindow):
         self.add_action(add_local_dir_action)
 
         self.dependency_graph_widget.search_by_uuid = self._search_by_uuid
-
-        self._copy_manager = CopyManager(self.progress_revealer, self.progress_popover)
+        self.dataset_list_box.request_more_datasets = self._on_dataset_list_edge_reached
+        self.dependency_graph_widget.layout_cache = LayoutCache()
+
+        # bandwidth limit shared by all copies, adjustable from the progress popover and stored in the settings
+        copy_bandwidth_limit = BandwidthLimit()
+        copy_bandwidth_limit_control = self.progress_popover.add_bandwidth_limit_control(
+            'Limit of all copies', copy_bandwidth_limit)
+        settings.settings.bind('copy-bandwidth-limit', copy_bandwidth_limit_control.spin_button, 'value',
+                               Gio.SettingsBindFlags.DEFAULT)
+
+        self._copy_manager = CopyManager(
+            self.progress_revealer, self.progress_popover,
+            max_concurrent_copies=settings.max_concurrent_copies,
+            max_concurrent_copies_per_destination=settings.max_concurrent_copies_per_destination,
+            journal=CopyJournal(),
+            bandwidth_limit=copy_bandwidth_limit,
+            bandwidth_limit_per_copy=settings.copy_bandwidth_limit_per_copy * 1e6)
+
+        # copy settings changed in the settings dialog apply to queued and new copies right away,
+        # item workers and deduplication are read at the start of every copy
+        settings.settings.connect('changed::max-concurrent-copies', self.on_copy_concurrency_changed)
+        settings.settings.connect('changed::max-concurrent-copies-per-destination', self.on_copy_concurrency_changed)
+        settings.settings.connect('changed::copy-bandwidth-limit-per-copy',
+                                  self.on_copy_bandwidth_limit_per_copy_changed)
+
+        # resume copies interrupted in a previous session
+        resume_interrupted_copies_action = Gio.SimpleAction.new("resume-interrupted-copies")
+        resume_interrupted_copies_action.connect("activate", self.do_resume_interrupted_copies)
+        self.add_action(resume_interrupted_copies_action)
 
         _logger.debug(f"Constructed main window for app '{self.application.get_application_id()}'")
 
@@ -509,6 +572,17 @@ class MainWindow(Gtk.ApplicationWindow):
         uri = value.get_string()
         self._build_dependency_graph_by_uri(uri)
 
+    def do_set_dependency_graph_layout(self, action, value):
+        """Lay out the dependency graph with the 'force' or 'layered' engine."""
+        self.dependency_graph_widget.layout_engine = value.get_string()
+        action.set_state(value)
+
+    def do_export_dependency_graph(self, action, value):
+        """Export the dependency graph to an SVG, PDF or PNG file, optionally with dataset names."""
+        filename, labels = value.unpack()
+        self._create_task_with_error_handling(
+            self.dependency_graph_widget.export(filename, labels=labels), "Export dependency graph")
+
     # search actions
     def do_search(self, action, value):
         """Evoke search tas for specific search text."""
@@ -717,6 +791,116 @@ class MainWindow(Gtk.ApplicationWindow):
 
         self._create_task_with_error_handling(_copy(), "Copy dataset")
 
+    def do_resume_interrupted_copies(self, action, value):
+        """Copy again all datasets whose copy is recorded as unfinished in the copy journal.
+
+        The copy resumes the proto dataset left behind at the destination and
+        only transfers items that are not already there."""
+        self._resume_journaled_copies(self._copy_manager.journal.entries)
+
+    def _resume_journaled_copies(self, entries):
+        journal = self._copy_manager.journal
+        for entry in entries:
+            journal.remove(entry['id'])
+            dataset = _journaled_dataset(entry)
+            _logger.info("Resuming copy of %s to %s.", entry['source_uri'], entry['destination'])
+
+            async def _copy(dataset=dataset, destination=entry['destination']):
+                try:
+                    await self._copy_manager.copy(dataset, destination)
+                except Exception as e:
+                    self.show_error(e)
+
+            self._create_task_with_error_handling(_copy(), "Resume copy")
+
+    async def _forget_finished_copies(self):
+        """Remove copies from the journal that are frozen at their destination by now."""
+        journal = self._copy_manager.journal
+        for entry in journal.entries:
+            if entry.get('name') is None or entry.get('uuid') is None:
+                continue
+            try:
+                state = await _journaled_dataset(entry).get_copy_state(entry['destination'])
+            except Exception as exc:
+                _logger.debug("Could not check copy of %s at %s: %s", entry['source_uri'], entry['destination'], exc)
+                continue
+            if state == 'dataset':
+                _logger.info("Copy of %s to %s finished already.", entry['source_uri'], entry['destination'])
+                journal.remove(entry['id'])
+
+    def on_copy_concurrency_changed(self, gsettings, key):
+        self._copy_manager.copy_queue.set_limits(settings.max_concurrent_copies,
+                                                 settings.max_concurrent_copies_per_destination)
+
+    def on_copy_bandwidth_limit_per_copy_changed(self, gsettings, key):
+        self._copy_manager.bandwidth_limit_per_copy = settings.copy_bandwidth_limit_per_copy * 1e6
+
+    def offer_copy_resume(self):
+        """Ask which copies interrupted in a previous session to resume."""
+        async def _offer_copy_resume():
+            await self._forget_finished_copies()
+            entries = self._copy_manager.journal.entries
+            if len(entries) == 0:
+                return
+            self._show_copy_resume_dialog(entries)
+
+        self._create_task_with_error_handling(_offer_copy_resume(), "Offer copy resume")
+
+    def _show_copy_resume_dialog(self, entries):
+        dialog = Gtk.MessageDialog(self, Gtk.DialogFlags.DESTROY_WITH_PARENT, Gtk.MessageType.QUESTION,
+                                   Gtk.ButtonsType.NONE,
+                                   f'{len(entries)} dataset copies did not finish in the previous session.')
+        dialog.format_secondary_text('Resume the selected copies? Items already at the destination are not '
+                                     'copied again. Copies not selected are discarded.')
+        dialog.add_buttons('Ask again later', Gtk.ResponseType.CANCEL, 'Resume selected', Gtk.ResponseType.OK)
+        check_buttons = []
+        for entry in entries:
+            check_button = Gtk.CheckButton(
+                label=f'»{entry["name"] or entry["source_uri"]}« to »{entry["destination"]}«' +
+                      (f' (failed: {entry["error"]})' if entry.get('error') else ''))
+            check_button.set_active(True)
+            dialog.get_message_area().pack_start(check_button, False, False, 0)
+            check_buttons.append((entry, check_button))
+        dialog.get_message_area().show_all()
+
+        def on_response(dialog, response):
+            selected = [entry for entry, check_button in check_buttons if check_button.get_active()]
+            dialog.destroy()
+            if response != Gtk.ResponseType.OK:
+                return
+            for entry, check_button in check_buttons:
+                if entry not in selected:
+                    self._copy_manager.journal.remove(entry['id'])
+            self._resume_journaled_copies(selected)
+
+        # Non-modal, do not block the event loop with dialog.run()
+        dialog.connect('response', on_response)
+        dialog.show()
+
+    def do_copy_datasets(self, action, value):
+        """Copy several datasets to the same destination as one batch.
+
+        Takes a (source_uris, destination_uri) tuple GLib.Variant. Datasets
+        already present at the destination are skipped, the others are copied
+        largest first with progress aggregated in a single status box.
+        """
+        source_uris, destination_uri = value.unpack()
+        datasets_by_uri = {str(dataset): dataset for dataset in self.dataset_list_box.datasets}
+        datasets = [datasets_by_uri[uri] for uri in source_uris if uri in datasets_by_uri]
+        if len(datasets) < len(source_uris):
+            _logger.warning("copy-datasets action: %d of %d URIs not found in dataset list",
+                            len(source_uris) - len(datasets), len(source_uris))
+        if not datasets:
+            return
+
+        async def _copy():
+            try:
+                await self._copy_manager.copy_batch(datasets, destination_uri, plan=plan_batch_copy)
+            except Exception as e:
+                self.show_error(e)
+
+        self._create_task_with_error_handling(_copy(), "Copy datasets")
+
     def do_add_local_directory(self, action, value):
         """Add a local directory as a base URI.
 
@@ -789,12 +973,21 @@ class MainWindow(Gtk.ApplicationWindow):
             self.search_popover.popup_at(widget)
 
     @Gtk.Template.Callback()
-    def on_dataset_selected(self, list_box, row):
+    def on_dataset_selection_changed(self, list_box):
         """Entry on dataset list clicked."""
-        if row is not None:
-            row_index = row.get_index()
+        # Details show a single dataset, they stay as they are but cannot be acted on while several are selected
+        selected_rows = list_box.get_selected_rows()
+        for name in self._single_dataset_actions:
+            self.lookup_action(name).set_enabled(len(selected_rows) <= 1)
+        if len(selected_rows) == 1:
+            row_index = selected_rows[0].get_index()
             _logger.debug(f"Selected row {row_index}.")
             self.activate_action('show-dataset', GLib.Variant.new_uint32(row_index))
+        elif len(selected_rows) > 1:
+            self.show_button.set_sensitive(False)
+            self.add_items_button.set_sensitive(False)
+            self.freeze_button.set_sensitive(False)
+            self.save_metadata_button.set_sensitive(False)
 
     @Gtk.Template.Callback()
     def on_open_local_directory_clicked(self, widget):
@@ -841,6 +1034,39 @@ class MainWindow(Gtk.ApplicationWindow):
             pass
         dialog.destroy()
 
+    @Gtk.Template.Callback()
+    def on_export_dependency_graph_clicked(self, widget):
+        """Export dependency graph button clicked."""
+        dialog = Gtk.FileChooserDialog(
+            title="Export dependency graph",
+            parent=self,
+            action=Gtk.FileChooserAction.SAVE
+        )
+        dialog.add_buttons(
+            Gtk.STOCK_CANCEL,
+            Gtk.ResponseType.CANCEL,
+            Gtk.STOCK_SAVE,
+            Gtk.ResponseType.OK,
+        )
+        dialog.set_current_name("dependency-graph.svg")
+        dialog.set_do_overwrite_confirmation(True)
+        file_filter = Gtk.FileFilter()
+        file_filter.set_name("SVG, PDF or PNG")
+        for fmt in EXPORT_FORMATS:
+            file_filter.add_pattern(f"*.{fmt}")
+        dialog.add_filter(file_filter)
+        labels_check_button = Gtk.CheckButton(label="Include dataset names")
+        dialog.set_extra_widget(labels_check_button)
+
+        # Attention: Avoid run method! See on_open_local_directory_clicked.
+        response = dialog.run()
+        if response == Gtk.ResponseType.OK:
+            filename = dialog.get_filename()
+            labels = labels_check_button.get_active()
+            # Delegate to export-dependency-graph action (testable independently of this dialog)
+            self.activate_action('export-dependency-graph', GLib.Variant("(sb)", (filename, labels)))
+        dialog.destroy()
+
     @Gtk.Template.Callback()
     def on_create_dataset_clicked(self, widget):
         """Dataset creation button clicked."""
@@ -936,6 +1162,9 @@ class MainWindow(Gtk.ApplicationWindow):
     def on_freeze_clicked(self, widget):
         """Freeze dataset button clicked."""
         row = self.dataset_list_box.get_selected_row()
+        if row is None:
+            _logger.warning("No dataset selected")
+            return
         dialog = Gtk.MessageDialog(self, Gtk.DialogFlags.MODAL, Gtk.MessageType.QUESTION, Gtk.ButtonsType.OK_CANCEL,
                                    f'You are about to freeze dataset "{row.dataset.name}". Items can no longer be '
                                    'added, removed or modified after freezing the dataset. (You will still be able to '
@@ -1056,12 +1285,22 @@ class MainWindow(Gtk.ApplicationWindow):
     # go to the main app.
     # @Gtk.Template.Callback(), not in .ui
     def on_copy_clicked(self, widget):
-        """Dataset copy button clicked — delegates to copy-dataset action."""
+        """Dataset copy button clicked — delegates to copy-dataset action, or copy-datasets for several selected."""
+        destination_uri = widget.destination
+        datasets = self.dataset_list_box.get_selected_datasets()
+        if len(datasets) > 1:
+            self.activate_action(
+                'copy-datasets',
+                GLib.Variant.new_tuple(
+                    GLib.Variant.new_strv([str(dataset) for dataset in datasets]),
+                    GLib.Variant.new_string(destination_uri),
+                )
+            )
+            return
         row = self.dataset_list_box.get_selected_row()
         if row is None:
             return
         source_uri = str(row.dataset)
-        destination_uri = widget.destination
         self.activate_action(
             'copy-dataset',
             GLib.Variant.new_tuple(
@@ -1084,19 +1323,13 @@ class MainWindow(Gtk.ApplicationWindow):
         async def _refresh():
             # first, refresh base uri list and its selection
             await self._refresh_base_uri_list_box()
-            self._select_and_load_first_uri()
+            if self.base_uri_list_box.get_selected_row() is None:
+                self._select_and_load_first_uri()
 
             _logger.debug(f"Done refreshing base URIs.")
             # on_base_uri_selected(self, list_box, row) called by selection
-            # above already
-
-            # TODO: following restoration of selected dataset needs to happen
-            # after base URI has been loaded, but on_base_uri_selected
-            # spawns another task, hence above "await" won't wait for the
-            # process to complete. Need a signal instead.
-            # if dataset_uri is not None:
-            #    _logger.debug(f"Select and show '{dataset_uri}'.")
-            #    self._select_and_show_by_uri(dataset_uri)
+            # above already. Reselecting the base URI shown before updates the
+            # dataset list in place, which keeps the selected dataset.
 
         self._create_task_with_error_handling(_refresh(), "Refresh after action")
 
@@ -1140,9 +1373,47 @@ class MainWindow(Gtk.ApplicationWindow):
                                  f"{sizeof_fmt(total_size).strip()} total size of {len(datasets)} datasets on current page, "
                                  f"on page {current_page} of {last_page}")
 
+    async def _get_datasets_page(self, page_number, pagination, sorting):
+        """Retrieve one page of search results from lookup server."""
+        if self.search_state.search_text:
+            if is_valid_query(self.search_state.search_text):
+                _logger.debug("Valid query specified.")
+                return await DatasetModel.get_datasets_by_mongo_query(
+                    query=self.search_state.search_text,
+                    page_number=page_number,
+                    page_size=self.search_state.page_size,
+                    sort_fields=self.search_state.sort_fields,
+                    sort_order=self.search_state.sort_order,
+                    pagination=pagination,
+                    sorting=sorting
+                )
+            else:
+                _logger.debug("Specified search text is not a valid query, just perform free text search.")
+                return await DatasetModel.get_datasets(
+                    free_text=self.search_state.search_text,
+                    page_number=page_number,
+                    page_size=self.search_state.page_size,
+                    sort_fields=self.search_state.sort_fields,
+                    sort_order=self.search_state.sort_order,
+                    pagination=pagination,
+                    sorting=sorting
+                )
+        else:
+            _logger.debug("No keyword specified, list all datasets.")
+            return await DatasetModel.get_datasets(
+                page_number=page_number,
+                page_size=self.search_state.page_size,
+                sort_fields=self.search_state.sort_fields,
+                sort_order=self.search_state.sort_order,
+                pagination=pagination,
+                sorting=sorting
+            )
+
     async def _fetch_search_results(self, on_show=None):
         """Retrieve search results from lookup server."""
 
+        # Pages still being fetched for the results shown before are outdated
+        self.search_state.invalidate_results()
         self.search_state.fetching_results = True
         self._disable_pagination_buttons()
 
@@ -1154,45 +1425,14 @@ class MainWindow(Gtk.ApplicationWindow):
         pagination = {}
         sorting = {}
         try:
-            if self.search_state.search_text:
-                if is_valid_query(self.search_state.search_text):
-                    _logger.debug("Valid query specified.")
-                    datasets = await DatasetModel.get_datasets_by_mongo_query(
-                        query=self.search_state.search_text,
-                        page_number=self.search_state.current_page,
-                        page_size=self.search_state.page_size,
-                        sort_fields=self.search_state.sort_fields,
-                        sort_order=self.search_state.sort_order,
-                        pagination=pagination,
-                        sorting=sorting
-
-                    )
-                else:
-                    _logger.debug("Specified search text is not a valid query, just perform free text search.")
-                    datasets = await DatasetModel.get_datasets(
-                        free_text=self.search_state.search_text,
-                        page_number=self.search_state.current_page,
-                        page_size=self.search_state.page_size,
-                        sort_fields=self.search_state.sort_fields,
-                        sort_order=self.search_state.sort_order,
-                        pagination=pagination,
-                        sorting=sorting
-                    )
-            else:
-                _logger.debug("No keyword specified, list all datasets.")
-                datasets = await DatasetModel.get_datasets(
-                    page_number=self.search_state.current_page,
-                    page_size=self.search_state.page_size,
-                    sort_fields=self.search_state.sort_fields,
-                    sort_order=self.search_state.sort_order,
-                    pagination=pagination,
-                    sorting=sorting
-                )
+            datasets = await self._get_datasets_page(self.search_state.current_page, pagination, sorting)
 
             self.search_state.ingest_pagination_information(pagination)
             self.search_state.ingest_sorting_information(sorting)
 
-            if len(datasets) > self._max_nb_datasets:
+            # With infinite scroll, the search state bounds the pages kept in the dataset list instead.
+            # Cutting off a page would skip the results between its end and the next page.
+            if not settings.infinite_scroll and len(datasets) > self._max_nb_datasets:
                 _logger.warning(
                     f"{len(datasets)} search results exceed allowed displayed maximum of {self._max_nb_datasets}. "
                     f"Only the first {self._max_nb_datasets} results are shown. Narrow down your search."
@@ -1200,6 +1440,7 @@ class MainWindow(Gtk.ApplicationWindow):
                 datasets = datasets[:self._max_nb_datasets]  # Limit number of datasets that are shown
 
             row.search_results = datasets  # Cache datasets
+            self.search_state.reset_loaded_pages(self.search_state.current_page, len(datasets))
 
             self._update_search_summary(datasets)
             self._update_main_statusbar(datasets)
@@ -1207,6 +1448,7 @@ class MainWindow(Gtk.ApplicationWindow):
             if self.base_uri_list_box.get_selected_row() == row:
                 # Only update if the row is still selected
                 self.dataset_list_box.fill(datasets, on_show=on_show)
+                self._dataset_list_base_uri = None
         except RuntimeError as e:
             # TODO: There should probably be a more explicit test on authentication failure.
             self.show_error(e)
@@ -1233,6 +1475,62 @@ class MainWindow(Gtk.ApplicationWindow):
         self._update_pagination_buttons()
         self.search_state.fetching_results = False
 
+    def _on_dataset_list_edge_reached(self, position):
+        """Load the page of search results beyond the end of the dataset list scrolled to."""
+        if not settings.infinite_scroll or self.search_state.fetching_results:
+            return
+        row = self.base_uri_list_box.search_results_row
+        if row is None or self.base_uri_list_box.get_selected_row() != row:
+            return
+
+        if position == Gtk.PositionType.BOTTOM:
+            page, append = self.search_state.next_page_to_load, True
+        else:
+            page, append = self.search_state.previous_page_to_load, False
+        if page is not None:
+            self._create_task_with_error_handling(self._fetch_adjacent_page(page, append), "Fetch search results page")
+
+    async def _fetch_adjacent_page(self, page, append=True):
+        """Append (or prepend) a page of search results to the dataset list, dropping far-away pages."""
+        generation = self.search_state.results_generation
+        self.search_state.fetching_results = True
+        self._disable_pagination_buttons()
+        self.main_spinner.start()
+
+        pagination = {}
+        sorting = {}
+        try:
+            datasets = await self._get_datasets_page(page, pagination, sorting)
+            if self.search_state.results_generation != generation:
+                # A new search started meanwhile, it owns the dataset list and the fetching state now
+                _logger.debug(f"Drop outdated page {page} of search results.")
+                return
+            row = self.base_uri_list_box.search_results_row
+            # The selection might have changed while waiting for the lookup server
+            if row is not None and self.base_uri_list_box.get_selected_row() == row:
+                if append:
+                    nb_added = self.dataset_list_box.append_datasets(datasets)
+                else:
+                    nb_added = self.dataset_list_box.prepend_datasets(datasets)
+                _logger.debug(f"Loaded {nb_added} datasets of page {page}.")
+
+                nb_evicted = self.search_state.add_loaded_page(page, nb_added, append=append)
+                if append:
+                    self.dataset_list_box.remove_first(nb_evicted)
+                else:
+                    self.dataset_list_box.remove_last(nb_evicted)
+
+                row.search_results = self.dataset_list_box.datasets
+                self._update_main_statusbar(row.search_results)
+        except Exception as e:
+            if self.search_state.results_generation != generation:
+                return
+            self.show_error(e)
+
+        self.main_spinner.stop()
+        self._update_pagination_buttons()
+        self.search_state.fetching_results = False
+
     def _search_by_uuid(self, uuid):
         search_text = dump_single_line_query_text({"uuid": uuid})
         self._search_by_search_text(search_text)
@@ -1246,6 +1544,8 @@ class MainWindow(Gtk.ApplicationWindow):
         row = self.dataset_list_box.get_row_at_index(index)
         if row is not None:
             _logger.debug(f"Dataset row {index} selected.")
+            # The list allows multiple selection, replace rather than extend it
+            self.dataset_list_box.unselect_all()
             self.dataset_list_box.select_row(row)
         else:
             _logger.info(f"No dataset row with index {index} available for selection.")
@@ -1438,6 +1738,23 @@ class MainWindow(Gtk.ApplicationWindow):
         # index = self.base_uri_list_box.get_row_index_from_uri(uri)
         # self._select_base_uri_row_by_row_index(index)
 
+    def _show_base_uri_datasets(self, base_uri, datasets, on_show=None):
+        """Show datasets of base URI, updating the dataset list in place if it shows that base URI already."""
+        if self._dataset_list_base_uri != base_uri:
+            self.dataset_list_box.fill(datasets, on_show=on_show)
+            self._dataset_list_base_uri = base_uri
+            return
+
+        selected_datasets = self.dataset_list_box.get_selected_datasets()
+        self.dataset_list_box.update(datasets)
+        selected_row = self.dataset_list_box.get_selected_row()
+        if len(self.dataset_list_box.get_selected_rows()) == 0:
+            if on_show is not None:
+                on_show(datasets)
+        elif selected_row is not None and selected_datasets != [selected_row.dataset]:
+            # The selected dataset changed, e.g. it has been frozen
+            self._show_dataset_details(selected_row.dataset)
+
     def _show_base_uri(self, row, on_show=None):
         """Show datasets in selected base URI."""
         if row is None:
@@ -1463,8 +1780,8 @@ class MainWindow(Gtk.ApplicationWindow):
                     _logger.debug(f"Found {len(datasets)} datasets.")
                     update_base_uri_summary(datasets)
                     if self.base_uri_list_box.get_selected_row() == row:
-                       # Only update if the row is still selected
-                       self.dataset_list_box.fill(datasets, on_show=on_show)
+                        # Only update if the row is still selected
+                        self._show_base_uri_datasets(str(row.base_uri), datasets, on_show=on_show)
                 except asyncio.TimeoutError:
                     timeout = settings.base_uri_listing_timeout
                     _logger.error(
@@ -1481,6 +1798,7 @@ class MainWindow(Gtk.ApplicationWindow):
                 if row.search_results is not None:
                     _logger.debug(f"Fill dataset list with {len(row.search_results)} search results.")
                     self.dataset_list_box.fill(row.search_results, on_show=on_show)
+                    self._dataset_list_base_uri = None
                     self.main_stack.set_visible_child(self.main_paned)
                 else:
                     _logger.debug("No search results cached (likely first activation after app startup).")
@@ -1858,6 +2176,11 @@ class MainWindow(Gtk.ApplicationWindow):
             _logger.debug("Selected dataset is lookup result.")
             self.get_action_group("win").activate_action('build-dependency-graph-by-uri',
                                                          GLib.Variant.new_string(dataset.uri))
+        elif self._get_provenance_index(dataset) is not None:
+            self.dependency_stack.show()
+            _logger.debug("Selected dataset is accessed directly, trace dependencies in local provenance index.")
+            self.get_action_group("win").activate_action('build-dependency-graph-by-uri',
+                                                         GLib.Variant.new_string(dataset.uri))
         else:
             _logger.debug("Selected dataset is accessed directly.")
             self.dependency_stack.hide()
@@ -1871,15 +2194,34 @@ class MainWindow(Gtk.ApplicationWindow):
                 destinations += [str(base_uri)]
         self.copy_button.get_popover().update(destinations, self.on_copy_clicked)
 
+    def _get_provenance_index(self, dataset):
+        """Local provenance index of a directly accessed dataset, None for lookup results."""
+        if dataset.type == 'lookup':
+            return None
+        row = self.base_uri_list_box.get_selected_row()
+        if row is None or not hasattr(row, 'base_uri'):
+            return None
+        provenance_index = row.base_uri.provenance_index
+        if provenance_index is None or dataset.uuid not in provenance_index:
+            return None
+        return provenance_index
+
     async def _compute_dependencies(self, dataset):
         _logger.debug("Compute dependencies for dataset '%s'.", dataset.uuid)
         self.dependency_stack.set_visible_child(self.dependency_spinner)
 
         # Compute dependency graph
         dependency_graph = DependencyGraph()
-        async with ConfigurationBasedLookupClient() as lookup:
-            _logger.debug("Wait for depenedency graph for '%s' queried from lookup server.", dataset.uuid)
-            await dependency_graph.trace_dependencies(lookup, dataset.uuid, dependency_keys=settings.dependency_keys)
+        provenance_index = self._get_provenance_index(dataset)
+        if provenance_index is not None:
+            _logger.debug("Trace dependency graph for '%s' in local provenance index.", dataset.uuid)
+            await dependency_graph.trace_dependencies(provenance_index, dataset.uuid,
+                                                      dependency_keys=settings.dependency_keys)
+        else:
+            async with ConfigurationBasedLookupClient() as lookup:
+                _logger.debug("Wait for depenedency graph for '%s' queried from lookup server.", dataset.uuid)
+                await dependency_graph.trace_dependencies(lookup, dataset.uuid,
+                                                          dependency_keys=settings.dependency_keys)
 
         # Show message if uuids are missing
         missing_uuids = dependency_graph.missing_uuids
@@ -82,6 +82,14 @@ class SettingsDialog(Gtk.Window):
     choose_item_download_target_directory_checkbox = Gtk.Template.Child()
     open_downloaded_item_checkbox = Gtk.Template.Child()
     yaml_linting_switch = Gtk.Template.Child()
+    infinite_scroll_switch = Gtk.Template.Child()
+
+    max_concurrent_copies_spin_button = Gtk.Template.Child()
+    max_concurrent_copies_per_destination_spin_button = Gtk.Template.Child()
+    copy_item_workers_spin_button = Gtk.Template.Child()
+    deduplicate_copies_switch = Gtk.Template.Child()
+    copy_bandwidth_limit_spin_button = Gtk.Template.Child()
+    copy_bandwidth_limit_per_copy_spin_button = Gtk.Template.Child()
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -97,6 +105,28 @@ class SettingsDialog(Gtk.Window):
         settings.settings.bind("yaml-linting-enabled",
                                self.yaml_linting_switch,
                                'active', Gio.SettingsBindFlags.DEFAULT)
+        settings.settings.bind("infinite-scroll",
+                               self.infinite_scroll_switch,
+                               'active', Gio.SettingsBindFlags.DEFAULT)
+
+        settings.settings.bind("max-concurrent-copies",
+                               self.max_concurrent_copies_spin_button,
+                               'value', Gio.SettingsBindFlags.DEFAULT)
+        settings.settings.bind("max-concurrent-copies-per-destination",
+                               self.max_concurrent_copies_per_destination_spin_button,
+                               'value', Gio.SettingsBindFlags.DEFAULT)
+        settings.settings.bind("copy-item-workers",
+                               self.copy_item_workers_spin_button,
+                               'value', Gio.SettingsBindFlags.DEFAULT)
+        settings.settings.bind("deduplicate-copies",
+                               self.deduplicate_copies_switch,
+                               'active', Gio.SettingsBindFlags.DEFAULT)
+        settings.settings.bind("copy-bandwidth-limit",
+                               self.copy_bandwidth_limit_spin_button,
+                               'value', Gio.SettingsBindFlags.DEFAULT)
+        settings.settings.bind("copy-bandwidth-limit-per-copy",
+                               self.copy_bandwidth_limit_per_copy_spin_button,
+                               'value', Gio.SettingsBindFlags.DEFAULT)
 
 
         # register own refresh method as listener for app-central dtool-config-changed signal
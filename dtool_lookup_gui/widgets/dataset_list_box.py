@@ -25,7 +25,7 @@
 
 import logging
 
-from gi.repository import GObject, Gtk
+from gi.repository import Gio, GLib, GObject, Gtk
 
 from .dataset_row import DtoolDatasetRow
 
@@ -33,50 +33,287 @@ from .dataset_row import DtoolDatasetRow
 logger = logging.getLogger(__name__)
 
 
+class DtoolDatasetItem(GObject.Object):
+    """Item of the list model behind DtoolDatasetListBox"""
+    __gtype_name__ = 'DtoolDatasetItem'
+
+    def __init__(self, dataset):
+        super().__init__()
+        self.dataset = dataset
+
+
 class DtoolDatasetListBox(Gtk.ListBox):
+    """List of datasets with rows created on demand.
+
+    The list box is bound to a Gio.ListStore that holds only the first
+    datasets of the list. Further datasets are appended in chunks when
+    scrolling towards the end or when a row further down is requested, so
+    filling the list costs a chunk of rows regardless of its length. Filling
+    it again reuses the existing rows for the new datasets, updating it with a
+    new listing of the same datasets touches only rows that changed.
+
+    Once all rows exist, scrolling to either end calls request_more_datasets
+    with Gtk.PositionType.BOTTOM or TOP, if set, to let the owner append or
+    prepend further datasets."""
     __gtype_name__ = 'DtoolDatasetListBox'
 
+    # number of rows created at once
+    _chunk_size = 100
+    # create more rows when scrolled to within this many pixels of the end
+    _scroll_margin = 200
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._datasets = []
         self._uri_to_row_index_mapping = dict()
+        self._model = Gio.ListStore.new(DtoolDatasetItem)
+        self.bind_model(self._model, self._create_row)
+        self._vadjustment = None
+        self.request_more_datasets = None
+        self.connect('hierarchy-changed', self.on_hierarchy_changed)
+
+    def _create_row(self, item):
+        row = DtoolDatasetRow(item.dataset)
+        row.show_all()
+        return row
+
+    def on_hierarchy_changed(self, widget, previous_toplevel):
+        # watch the scrolled window we are shown in, if any
+        scrolled_window = self.get_ancestor(Gtk.ScrolledWindow)
+        vadjustment = scrolled_window.get_vadjustment() if scrolled_window is not None else None
+        if vadjustment is not self._vadjustment:
+            if self._vadjustment is not None:
+                self._vadjustment.disconnect_by_func(self.on_scroll)
+            self._vadjustment = vadjustment
+            if vadjustment is not None:
+                vadjustment.connect('value-changed', self.on_scroll)
+
+    def on_scroll(self, adjustment):
+        if adjustment.get_value() + adjustment.get_page_size() >= adjustment.get_upper() - self._scroll_margin:
+            if self._model.get_n_items() < len(self._datasets):
+                self._ensure_rows(self._model.get_n_items() + self._chunk_size)
+            elif self.request_more_datasets is not None:
+                self.request_more_datasets(Gtk.PositionType.BOTTOM)
+        elif adjustment.get_value() <= self._scroll_margin and self.request_more_datasets is not None:
+            self.request_more_datasets(Gtk.PositionType.TOP)
+
+    def _keep_scroll_position(self):
+        """Keep the visible rows in place while rows above them are inserted or removed"""
+        adjustment = self._vadjustment
+        if adjustment is None:
+            return
+        value = adjustment.get_value()
+        upper = adjustment.get_upper()
+
+        def restore():
+            adjustment.set_value(value + adjustment.get_upper() - upper)
+            return GLib.SOURCE_REMOVE
+
+        # the new height is known only after the next layout
+        GLib.idle_add(restore)
+
+    def _ensure_rows(self, nb_rows):
+        """Make sure there are rows for the first nb_rows datasets"""
+        nb_existing = self._model.get_n_items()
+        nb_rows = min(nb_rows, len(self._datasets))
+        if nb_rows > nb_existing:
+            logger.debug(f"Create rows {nb_existing} to {nb_rows} of {len(self._datasets)}.")
+            self._model.splice(nb_existing, 0,
+                               [DtoolDatasetItem(dataset) for dataset in self._datasets[nb_existing:nb_rows]])
+
+    @staticmethod
+    def _record_uri(uri_to_row_index_mapping, dataset, row_index):
+        if dataset.uri in uri_to_row_index_mapping:
+            raise ValueError(f"{dataset.uri} already in DtoolDatasetListBox at index "
+                             f"{uri_to_row_index_mapping[dataset.uri]}. This should not happen.")
+        uri_to_row_index_mapping[dataset.uri] = row_index
+
+    def _reindex(self):
+        self._uri_to_row_index_mapping = {dataset.uri: row_index for row_index, dataset in enumerate(self._datasets)}
 
     def fill(self, datasets, on_show=None):
-        for row in self.get_children():
-            row.destroy()
-        self._uri_to_row_index_mapping = dict()
-        for dataset in datasets:
-            self.add(DtoolDatasetRow(dataset))
+        datasets = list(datasets)
+        uri_to_row_index_mapping = dict()
+        for row_index, dataset in enumerate(datasets):
+            self._record_uri(uri_to_row_index_mapping, dataset, row_index)
+        self._uri_to_row_index_mapping = uri_to_row_index_mapping
+        self._datasets = datasets
+
+        # Reuse existing rows, keep as many rows as before but at least one chunk
+        self.unselect_all()
+        nb_existing = self._model.get_n_items()
+        nb_rows = min(len(datasets), max(nb_existing, self._chunk_size))
+        for row_index in range(min(nb_existing, nb_rows)):
+            self._model.get_item(row_index).dataset = datasets[row_index]
+            super().get_row_at_index(row_index).set_dataset(datasets[row_index])
+        if nb_rows < nb_existing:
+            self._model.splice(nb_rows, nb_existing - nb_rows, [])
+        else:
+            self._ensure_rows(nb_rows)
+
         self.show_all()
         if on_show is not None:
             on_show(datasets)
 
+    @staticmethod
+    def _displayed_state(dataset):
+        """Everything a row shows of a dataset"""
+        return (dataset.uuid, dataset.name, dataset.creator, dataset.is_frozen, dataset.date, dataset.size_str)
+
+    def _splice(self, position, nb_removed, datasets):
+        """Replace nb_removed datasets at position, and their rows if there are any"""
+        nb_existing = self._model.get_n_items()
+        self._datasets[position:position + nb_removed] = datasets
+        if position < nb_existing:
+            self._model.splice(position, min(nb_removed, nb_existing - position),
+                               [DtoolDatasetItem(dataset) for dataset in datasets])
+
+    def update(self, datasets, on_show=None):
+        """Reconcile the list with a new listing of datasets by URI.
+
+        Rows of datasets that disappeared are removed, rows for new datasets
+        inserted and rows of datasets that changed refreshed. All other rows,
+        the selection and the scroll position are left alone. Falls back to
+        fill if the listing has nothing in common with the list or the order
+        of the remaining datasets changed."""
+        datasets = list(datasets)
+        uri_to_row_index_mapping = dict()
+        for row_index, dataset in enumerate(datasets):
+            self._record_uri(uri_to_row_index_mapping, dataset, row_index)
+
+        kept_uris = [dataset.uri for dataset in self._datasets if dataset.uri in uri_to_row_index_mapping]
+        if len(kept_uris) == 0 or kept_uris != [dataset.uri for dataset in datasets
+                                                if dataset.uri in self._uri_to_row_index_mapping]:
+            self.fill(datasets, on_show=on_show)
+            return
+
+        # Remove datasets that are gone, back to front to keep indices valid
+        removed_indices = [row_index for row_index, dataset in enumerate(self._datasets)
+                           if dataset.uri not in uri_to_row_index_mapping]
+        nb_removed = len(removed_indices)
+        while len(removed_indices) > 0:
+            stop = removed_indices.pop() + 1
+            start = stop - 1
+            while len(removed_indices) > 0 and removed_indices[-1] == start - 1:
+                start = removed_indices.pop()
+            self._splice(start, stop - start, [])
+
+        # Now the remaining datasets are in the order of the new listing,
+        # insert new datasets in between and refresh changed ones
+        nb_inserted = 0
+        nb_changed = 0
+        row_index = 0
+        while row_index < len(datasets):
+            dataset = datasets[row_index]
+            if dataset.uri in self._uri_to_row_index_mapping:
+                if self._displayed_state(dataset) != self._displayed_state(self._datasets[row_index]):
+                    self._datasets[row_index] = dataset
+                    if row_index < self._model.get_n_items():
+                        self._model.get_item(row_index).dataset = dataset
+                        super().get_row_at_index(row_index).set_dataset(dataset)
+                    nb_changed += 1
+                row_index += 1
+            else:
+                stop = row_index + 1
+                while stop < len(datasets) and datasets[stop].uri not in self._uri_to_row_index_mapping:
+                    stop += 1
+                self._splice(row_index, 0, datasets[row_index:stop])
+                nb_inserted += stop - row_index
+                row_index = stop
+
+        logger.debug(f"Updated dataset list: {nb_removed} removed, {nb_inserted} inserted, "
+                     f"{nb_changed} changed.")
+        self._uri_to_row_index_mapping = uri_to_row_index_mapping
+        self._ensure_rows(self._chunk_size)
+
+        if on_show is not None:
+            on_show(datasets)
+
     def add_dataset(self, dataset):
-        # Create row for new dataset
-        row = DtoolDatasetRow(dataset)
-        self.add(row)
-        # Select new dataset
+        """Add dataset right after the last row that exists and select it.
+
+        Only the row of the new dataset is created, datasets that have no row
+        yet follow it."""
+        row_index = self._model.get_n_items()
+        self._record_uri(self._uri_to_row_index_mapping, dataset, row_index)
+        self._datasets.insert(row_index, dataset)
+        for index in range(row_index + 1, len(self._datasets)):
+            self._uri_to_row_index_mapping[self._datasets[index].uri] = index
+        self._model.append(DtoolDatasetItem(dataset))
+        row = super().get_row_at_index(row_index)
+        logger.debug(f"Inserted {dataset.uri} at {row.get_index()}.")
+        # Select new dataset only
+        self.unselect_all()
         self.select_row(row)
 
-    def add(self, row):
-        """Keep uri -> row index mapping up-to-date."""
-        if row.dataset.uri in self._uri_to_row_index_mapping:
-            row_index  = self.get_row_index_from_uri(row.dataset.uri)
-            raise ValueError(f"{row.dataset.uri} already in DtoolDatasetListBox at index {row_index}. This should not happen.")
+    def append_datasets(self, datasets):
+        """Append datasets not in the list yet, return number of datasets appended."""
+        datasets = [dataset for dataset in datasets if dataset.uri not in self._uri_to_row_index_mapping]
+        for dataset in datasets:
+            self._record_uri(self._uri_to_row_index_mapping, dataset, len(self._datasets))
+            self._datasets.append(dataset)
+        # all rows exist when we were scrolled to the end, hence create rows for the new datasets right away
+        if self._model.get_n_items() == len(self._datasets) - len(datasets):
+            self._ensure_rows(len(self._datasets))
+        return len(datasets)
 
-        super().add(row)
+    def prepend_datasets(self, datasets):
+        """Prepend datasets not in the list yet, return number of datasets prepended."""
+        uri_to_row_index_mapping = dict()
+        datasets = [dataset for dataset in datasets if dataset.uri not in self._uri_to_row_index_mapping]
+        for row_index, dataset in enumerate(datasets):
+            self._record_uri(uri_to_row_index_mapping, dataset, row_index)
+        if len(datasets) == 0:
+            return 0
+        self._datasets = datasets + self._datasets
+        self._reindex()
+        self._keep_scroll_position()
+        # rows exist for a leading part of the list only, hence the new datasets need rows right away
+        self._model.splice(0, 0, [DtoolDatasetItem(dataset) for dataset in datasets])
+        return len(datasets)
 
-        row_index = row.get_index()
-        logger.debug(f"Inserted {row.dataset.uri} at {row_index}.")
-        self._uri_to_row_index_mapping[row.dataset.uri] = row_index
+    def remove_first(self, nb_datasets):
+        """Remove the first nb_datasets datasets from the list."""
+        nb_datasets = min(nb_datasets, len(self._datasets))
+        if nb_datasets <= 0:
+            return
+        self._datasets = self._datasets[nb_datasets:]
+        self._reindex()
+        self._keep_scroll_position()
+        self._model.splice(0, min(nb_datasets, self._model.get_n_items()), [])
 
-    def remove(self, row):
-        """Keep uri -> row index mapping up-to-date."""
-        if row.dataset.uri not in self._uri_to_row_index_mapping:
-            raise ValueError(f"{row.dataset.uri} not recorded in DtoolDatasetListBox uri -> row index mapping. This should not happen.")
-        else:
-            del self._uri_to_row_index_mapping[row.dataset.uri]
+    def remove_last(self, nb_datasets):
+        """Remove the last nb_datasets datasets from the list."""
+        nb_datasets = min(nb_datasets, len(self._datasets))
+        if nb_datasets <= 0:
+            return
+        self._datasets = self._datasets[:len(self._datasets) - nb_datasets]
+        self._reindex()
+        nb_existing = self._model.get_n_items()
+        if nb_existing > len(self._datasets):
+            self._model.splice(len(self._datasets), nb_existing - len(self._datasets), [])
+
+    @property
+    def datasets(self):
+        """All datasets in the list, including those without a row yet."""
+        return list(self._datasets)
+
+    def get_row_at_index(self, index):
+        """Row at index, created if not there yet."""
+        if index is not None and index >= 0:
+            self._ensure_rows(index + 1)
+        return super().get_row_at_index(index)
+
+    def get_selected_row(self):
+        """The selected row if exactly one row is selected, None otherwise.
+
+        Gtk.ListBox returns the row selected last while several are selected."""
+        selected_rows = self.get_selected_rows()
+        return selected_rows[0] if len(selected_rows) == 1 else None
 
-        super().remove(row)
+    def get_selected_datasets(self):
+        """Datasets of all selected rows, in list order."""
+        return [row.dataset for row in sorted(self.get_selected_rows(), key=lambda row: row.get_index())]
 
     def get_row_index_from_uri(self, uri):
         if uri in self._uri_to_row_index_mapping:
@@ -86,4 +323,5 @@ class DtoolDatasetListBox(Gtk.ListBox):
             return None
 
 
+GObject.type_register(DtoolDatasetItem)
 GObject.type_register(DtoolDatasetListBox)
@@ -73,6 +73,11 @@ class DtoolDatasetRow(Gtk.ListBoxRow):
     def dataset(self):
         return self._dataset
 
+    def set_dataset(self, dataset):
+        """Show another dataset in this row"""
+        self._dataset = dataset
+        self._refresh()
+
     def freeze(self):
         self._dataset.freeze()
         self._refresh()
\ No newline at end of file
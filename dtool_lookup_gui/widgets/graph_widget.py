@@ -23,16 +23,20 @@
 # SOFTWARE.
 #
 
+import asyncio
 import logging
+import os
 
-from math import pi, sqrt
+from math import ceil, pi, sqrt
 _sqrt3 = sqrt(3)
 
+import cairo
 import numpy as np
 
 from gi.repository import GLib, GObject, Gdk, Gtk
 
-from ..models.simple_graph import GraphLayout
+from ..models.simple_graph import GraphLayout, LayeredGraphLayout, UniformGrid
+from ..utils.layout_worker import GraphLayoutWorker
 from ..utils.query import dump_single_line_query_text
 
 from .graph_popover import DtoolGraphPopover
@@ -43,8 +47,40 @@ logger = logging.getLogger(__name__)
 # with a timeout of 10 microseconds, GUI freezes regularly on my machine (Ubuntu 20.04)
 TIMEOUT = 50
 
+# number of layout iterations carried out as fast as possible after a graph has been set
+INIT_ITER = 100
+
+# vertices are highlighted if the pointer is closer than this to their center
+HOVER_RADIUS = 0.5
+
+# available graph layout engines, 'force' relaxes a force field iteratively,
+# 'layered' arranges the (acyclic) dependency graph in layers right away
+LAYOUT_ENGINES = ['force', 'layered']
+
+# file formats of graph exports, determined from the file name extension
+EXPORT_FORMATS = ['svg', 'pdf', 'png']
+
+# size of a unit length of the layout in exported graphs, in points (1/72 inch)
+EXPORT_SCALE = 36
+
+# maximum edge length of exported raster images in pixels (cairo's limit)
+EXPORT_MAX_IMAGE_SIZE = 32767
+
+# give up relaxing the layout of a graph for export after this many iterations
+EXPORT_MAX_ITER = 10000
+
+# font size of vertex labels in unit lengths of the layout
+LABEL_FONT_SIZE = 0.3
+
+# parse colors once, not on every frame
+ROOT_COLOR = Gdk.color_parse('lightgreen').to_floats()
+DOES_NOT_EXIST_COLOR = Gdk.color_parse('red').to_floats()
+DEPENDENCY_COLOR = Gdk.color_parse('lightblue').to_floats()
+
 
 def circle(context, x, y):
+    # Start a new sub-path, otherwise arc connects to the previous shape
+    context.new_sub_path()
     context.arc(x, y, 0.5, 0, 2 * pi)
     context.close_path()
 
@@ -61,6 +97,157 @@ def triangle(context, x, y):
     context.close_path()
 
 
+def arrow_geometry(positions, i_n, j_n):
+    """
+    Compute the geometry of all edge arrows i -> j at once.
+
+    Returns line start and end points and the three corners of the arrow
+    heads, each as an array of shape (nb_edges, 2). Edges between vertices at
+    identical positions have no direction and are omitted.
+    """
+    i_pos_nc = positions[i_n]
+    j_pos_nc = positions[j_n]
+    ij_nc = i_pos_nc - j_pos_nc
+    abs_ij_n = np.sqrt(np.sum(ij_nc ** 2, axis=1))
+    m = abs_ij_n > 0
+    normal_nc = ij_nc[m] / abs_ij_n[m].reshape(-1, 1)
+    perpendicular_nc = np.column_stack([normal_nc[:, 1], -normal_nc[:, 0]])
+    # Adjust to radius of circle
+    tip_nc = i_pos_nc[m] - 0.5 * normal_nc
+    end_nc = j_pos_nc[m] + 0.5 * normal_nc
+    line_start_nc = tip_nc - 0.05 * normal_nc
+    line_end_nc = end_nc + 0.1 * normal_nc
+    head_left_nc = tip_nc - 0.2 * normal_nc - 0.2 * perpendicular_nc
+    head_right_nc = tip_nc - 0.2 * normal_nc + 0.2 * perpendicular_nc
+    return line_start_nc, line_end_nc, tip_nc, head_left_nc, head_right_nc
+
+
+def _set_label_font(context):
+    context.select_font_face('Sans', cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+    context.set_font_size(LABEL_FONT_SIZE)
+
+
+def render_graph(context, positions, vertex_kind, edge_i, edge_j, state=None, labels=None):
+    """
+    Draw graph in user coordinates of the layout onto a cairo context.
+
+    Vertices are drawn as squares (root), triangles (missing datasets) or
+    circles (all others), with an outline if their `state` is set. Edges are
+    arrows. If given, `labels` are written below their vertices.
+    """
+    # Draw vertices, one path and fill per kind
+    is_root = vertex_kind == 'root'
+    is_missing = vertex_kind == 'does-not-exist'
+    is_dependency = np.logical_not(np.logical_or(is_root, is_missing))
+    shapes = [(is_root, square, ROOT_COLOR),
+              (is_missing, triangle, DOES_NOT_EXIST_COLOR),
+              (is_dependency, circle, DEPENDENCY_COLOR)]
+    for mask, shape, color in shapes:
+        if np.any(mask):
+            context.set_source_rgb(*color)
+            for x, y in positions[mask].tolist():
+                shape(context, x, y)
+            context.fill()
+
+    # Outline highlighted vertices
+    context.set_source_rgb(0, 0, 0)
+    context.set_line_width(0.1)
+    if state is not None and np.any(state):
+        for mask, shape, color in shapes:
+            for x, y in positions[np.logical_and(mask, state)].tolist():
+                shape(context, x, y)
+        context.stroke()
+
+    # Draw edges, one stroke for all lines and one fill for all arrow heads
+    if len(edge_i) > 0:
+        line_start_nc, line_end_nc, tip_nc, head_left_nc, head_right_nc = \
+            arrow_geometry(positions, edge_i, edge_j)
+        for (x0, y0), (x1, y1) in zip(line_start_nc.tolist(), line_end_nc.tolist()):
+            context.move_to(x0, y0)
+            context.line_to(x1, y1)
+        context.stroke()
+        for (x0, y0), (x1, y1), (x2, y2) in zip(tip_nc.tolist(), head_left_nc.tolist(),
+                                                head_right_nc.tolist()):
+            context.move_to(x0, y0)
+            context.line_to(x1, y1)
+            context.line_to(x2, y2)
+            context.close_path()
+        context.fill()
+
+    # Write labels centered below vertices
+    if labels is not None:
+        _set_label_font(context)
+        for (x, y), label in zip(positions.tolist(), labels):
+            extents = context.text_extents(label)
+            context.move_to(x - extents.x_bearing - extents.width / 2, y + 0.5 + LABEL_FONT_SIZE)
+            context.show_text(label)
+
+
+def relax_layout(graph, positions=None, cutoff=None, max_iterations=EXPORT_MAX_ITER):
+    """Relax force-directed layout of graph until converged, return layout."""
+    layout = GraphLayout(graph, init_iter=0, positions=positions, cutoff=cutoff)
+    nb_iterations = 0
+    while not layout.converged and nb_iterations < max_iterations:
+        layout.iterate()
+        nb_iterations += 1
+    if not layout.converged:
+        logger.warning("Graph layout did not converge within %d iterations.", max_iterations)
+    return layout
+
+
+def export_graph(filename, positions, vertex_kind, edge_i, edge_j, labels=None, scale=EXPORT_SCALE):
+    """
+    Render graph to an SVG, PDF or PNG file on an offscreen surface.
+
+    The format is determined from the extension of `filename`. `scale` is
+    the size of a unit length of the layout in points (SVG, PDF) or pixels
+    (PNG); raster images are scaled down to cairo's maximum image size.
+    """
+    fmt = os.path.splitext(filename)[1][1:].lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Cannot export graph to '{filename}', file name extension "
+                         f"must be one of {EXPORT_FORMATS}.")
+
+    # Bounding box of the vertices, wide and high enough for the labels
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+    if len(positions) > 0:
+        min_x, min_y = np.min(positions, axis=0) - 1
+        max_x, max_y = np.max(positions, axis=0) + 1
+    else:
+        min_x, min_y, max_x, max_y = -1, -1, 1, 1
+    if labels is not None and len(labels) > 0:
+        measure_context = cairo.Context(cairo.ImageSurface(cairo.FORMAT_ARGB32, 1, 1))
+        _set_label_font(measure_context)
+        half_widths = np.array([measure_context.text_extents(label).width / 2 for label in labels])
+        min_x = min(min_x, np.min(positions[:, 0] - half_widths))
+        max_x = max(max_x, np.max(positions[:, 0] + half_widths))
+        max_y += LABEL_FONT_SIZE
+
+    if fmt == 'png':
+        scale = min(scale, EXPORT_MAX_IMAGE_SIZE / max(max_x - min_x, max_y - min_y))
+    width = ceil((max_x - min_x) * scale)
+    height = ceil((max_y - min_y) * scale)
+
+    if fmt == 'svg':
+        surface = cairo.SVGSurface(filename, width, height)
+    elif fmt == 'pdf':
+        surface = cairo.PDFSurface(filename, width, height)
+    else:
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+
+    context = cairo.Context(surface)
+    context.set_source_rgb(1, 1, 1)
+    context.paint()
+    context.scale(scale, scale)
+    context.translate(-min_x, -min_y)
+    render_graph(context, positions, vertex_kind, edge_i, edge_j, labels=labels)
+
+    if fmt == 'png':
+        surface.write_to_png(filename)
+    surface.finish()
+    logger.debug("Exported graph with %d vertices to '%s'.", len(positions), filename)
+
+
 class DtoolGraphWidget(Gtk.DrawingArea):
     __gtype_name__ = 'DtoolGraphWidget'
 
@@ -69,6 +256,23 @@ class DtoolGraphWidget(Gtk.DrawingArea):
         self._timer = None
         self._graph = None
         self._layout = None
+        self._layout_worker = None
+        self._restart_timer = None
+        self._positions = None
+        self._drawn_generation = None
+        self._layout_cache = None
+        self._layout_engine = 'force'
+        self._vertex_kind = None
+        self._edge_i = None
+        self._edge_j = None
+        self._vertex_uuids = None
+        self._vertex_names = None
+        # hover state of all vertices, mirrors the per-vertex 'state' property for drawing
+        self._vertex_state = None
+        self._active_vertex = None
+        self._current_uuid = None
+        self._spatial_index = None
+        self._transformation_cache = None
 
         self._search_by_uuid = None
 
@@ -76,9 +280,12 @@ class DtoolGraphWidget(Gtk.DrawingArea):
         self._popover.set_relative_to(self)
 
         self.connect('realize', self.on_realize)
+        self.connect('map', self.on_map)
+        self.connect('unmap', self.on_unmap)
         self.connect('draw', self.on_draw)
         self.connect('motion-notify-event', self.on_motion_notify)
-        self.set_events(Gdk.EventMask.POINTER_MOTION_MASK)
+        self.connect('button-press-event', self.on_button_press)
+        self.set_events(Gdk.EventMask.POINTER_MOTION_MASK | Gdk.EventMask.BUTTON_PRESS_MASK)
 
     @property
     def search_by_uuid(self):
@@ -88,39 +295,194 @@ class DtoolGraphWidget(Gtk.DrawingArea):
     def search_by_uuid(self, func):
         self._search_by_uuid = func
 
+    @property
+    def layout_cache(self):
+        return self._layout_cache
+
+    @layout_cache.setter
+    def layout_cache(self, layout_cache):
+        self._layout_cache = layout_cache
+
+    @property
+    def layout_engine(self):
+        return self._layout_engine
+
+    @layout_engine.setter
+    def layout_engine(self, layout_engine):
+        if layout_engine not in LAYOUT_ENGINES:
+            raise ValueError(f"Unknown graph layout engine '{layout_engine}', "
+                             f"must be one of {LAYOUT_ENGINES}.")
+        if layout_engine == self._layout_engine:
+            return
+        self._layout_engine = layout_engine
+        # Lay out the current graph anew with the selected engine
+        if self._graph is not None:
+            self.graph = self._graph
+
     @property
     def graph(self):
         return self._graph
 
     @graph.setter
     def graph(self, graph):
+        self._cancel_layout_worker()
         self._graph = graph
-        self._graph.set_vertex_properties('state', np.zeros(self._graph.nb_vertices, dtype=bool))
-        self._layout = GraphLayout(self._graph)
+        self._vertex_state = np.zeros(self._graph.nb_vertices, dtype=bool)
+        self._graph.set_vertex_properties('state', self._vertex_state.tolist())
+        # Vertex kinds and edges are fixed per graph, convert them to arrays once
+        self._vertex_kind = np.array(self._graph.get_vertex_properties('kind'), dtype=object)
+        self._edge_i = np.array(self._graph.vertex1, dtype=int)
+        self._edge_j = np.array(self._graph.vertex2, dtype=int)
+        self._vertex_uuids = self._graph.get_vertex_properties('uuid')
+        self._vertex_names = self._graph.get_vertex_properties('name')
+        self._active_vertex = None
+        if self._layout_engine == 'layered':
+            # Deterministic and final right away, nothing to cache
+            self._layout = LayeredGraphLayout(self._graph)
+        else:
+            # Start from previously converged positions, if available
+            positions = None
+            if self._layout_cache is not None:
+                positions = self._layout_cache.lookup(self._graph)
+            self._layout = GraphLayout(self._graph, init_iter=0, positions=positions)
+        # Layout relaxation runs in a worker thread, the widget only draws its snapshots
+        self._layout_worker = GraphLayoutWorker(self._layout, nb_fast_iterations=INIT_ITER,
+                                                interval=TIMEOUT / 1000)
+        self._positions = self._layout_worker.positions
+        self._drawn_generation = None
+        self._layout_worker.start()
+        self._start_timer()
+
+    async def export(self, filename, labels=False):
+        """
+        Export the current graph to an SVG, PDF or PNG file.
+
+        A force-directed layout that has not converged yet is relaxed to
+        convergence first. Relaxation and rendering run in a worker thread,
+        hence large graphs do not block the user interface. Dataset names are
+        written below the vertices if `labels` is set.
+        """
+        if self._graph is None:
+            raise ValueError("No dependency graph to export.")
+
+        # Capture the current graph, it may be replaced while exporting
+        graph = self._graph
+        vertex_kind, edge_i, edge_j = self._vertex_kind, self._edge_i, self._edge_j
+        names = self._vertex_names if labels else None
+        layout = self._layout
+        positions = self._positions
+
+        loop = asyncio.get_running_loop()
+        if isinstance(layout, GraphLayout) and not layout.converged:
+            logger.debug("Relax graph layout to convergence for export.")
+            # Relax a copy, the displayed layout continues independently
+            relaxed_layout = await loop.run_in_executor(
+                None, relax_layout, graph, positions, layout.cutoff)
+            positions = relaxed_layout.positions
+            if self._layout_cache is not None and relaxed_layout.converged:
+                self._layout_cache.store(graph, positions)
+        await loop.run_in_executor(None, export_graph, filename, positions,
+                                   vertex_kind, edge_i, edge_j, names)
+
+    def __del__(self):
+        self._cancel_layout_worker()
+        self._stop_timer()
+
+    def _start_timer(self):
         if self._timer is None:
             self._timer = GLib.timeout_add(TIMEOUT, self.on_timeout, self)
 
-    def __del__(self):
+    def _stop_timer(self):
         if self._timer is not None:
             GObject.source_remove(self._timer)
-
-    def _cairo_scale(self, area, context):
+            self._timer = None
+
+    def _stop_restart_timer(self):
+        if self._restart_timer is not None:
+            GObject.source_remove(self._restart_timer)
+            self._restart_timer = None
+
+    def _cancel_layout_worker(self):
+        self._stop_restart_timer()
+        if self._layout_worker is not None:
+            self._layout_worker.cancel()
+            self._layout_worker = None
+
+    def pause_layout(self):
+        """Stop relaxing the layout and redrawing periodically."""
+        self._stop_restart_timer()
+        if self._layout_worker is not None:
+            self._layout_worker.cancel()
+        self._stop_timer()
+
+    def resume_layout(self):
+        """Continue relaxing the current layout, e.g. after it has been paused."""
+        if self._layout is None:
+            return
+        worker = self._layout_worker
+        if worker is None or not worker.is_running or worker.is_cancelled:
+            if worker is not None and worker.is_running:
+                # Never let two workers iterate the same layout concurrently. Do not wait
+                # for the cancelled worker here, but start the new one once it has stopped.
+                if self._restart_timer is None:
+                    self._restart_timer = GLib.timeout_add(TIMEOUT, self.on_restart_timeout, worker)
+                return
+            self._start_layout_worker()
+        self._start_timer()
+
+    def _start_layout_worker(self):
+        self._layout_worker = GraphLayoutWorker(self._layout, nb_fast_iterations=0,
+                                                interval=TIMEOUT / 1000)
+        self._drawn_generation = None
+        self._layout_worker.start()
+
+    def _transformation(self, area):
+        """Scale and translation that fit the current positions into the widget."""
         w, h = area.get_allocated_width(), area.get_allocated_height()
-        positions = self._layout.positions
+        positions = self._positions
+        if self._transformation_cache is not None:
+            cached_positions, cached_w, cached_h, transformation = self._transformation_cache
+            if cached_positions is positions and cached_w == w and cached_h == h:
+                return transformation
         min_x = np.min(positions[:, 0]) - 1
         max_x = np.max(positions[:, 0]) + 1
         min_y = np.min(positions[:, 1]) - 1
         max_y = np.max(positions[:, 1]) + 1
         s = min(w / (max_x - min_x), h / (max_y - min_y))
+        transformation = (s, (w / s - min_x - max_x) / 2, (h / s - min_y - max_y) / 2)
+        self._transformation_cache = (positions, w, h, transformation)
+        return transformation
+
+    def _cairo_scale(self, area, context):
+        s, tx, ty = self._transformation(area)
         context.scale(s, s)
-        context.translate((w / s - min_x - max_x) / 2,
-                          (h / s - min_y - max_y) / 2)
+        context.translate(tx, ty)
+
+    def _get_spatial_index(self):
+        """Spatial index over the positions currently drawn, rebuilt when they move."""
+        if self._spatial_index is None or self._spatial_index.positions is not self._positions:
+            self._spatial_index = UniformGrid(self._positions, cell_size=2 * HOVER_RADIUS)
+        return self._spatial_index
+
+    def _set_vertex_state(self, i, state):
+        self._graph.vertex_properties[i]['state'] = state
+        self._vertex_state[i] = state
 
     def on_realize(self, area):
         pass
 
+    def on_map(self, area):
+        self.resume_layout()
+
+    def on_unmap(self, area):
+        self.pause_layout()
+
+    def on_button_press(self, area, event):
+        # Any click into the graph lets the layout relax further
+        self.resume_layout()
+
     def on_draw(self, area, context):
-        if self._graph is None or self._layout is None:
+        if self._graph is None or self._positions is None:
             return
 
         context.set_source_rgb(1, 1, 1)
@@ -129,89 +491,41 @@ class DtoolGraphWidget(Gtk.DrawingArea):
         # Set scale transformation
         self._cairo_scale(area, context)
 
-        # Get positions from layouter
-        positions = self._layout.positions
-        kind = self._graph.get_vertex_properties('kind')
-        state = self._graph.get_vertex_properties('state')
-
-        # Draw vertices
-        root_color = Gdk.color_parse('lightgreen')
-        does_not_exist_color = Gdk.color_parse('red')
-        dependency_color = Gdk.color_parse('lightblue')
-        for i, ((x, y), k, s) in enumerate(zip(positions, kind, state)):
-            if k == 'root':
-                context.set_source_rgb(*root_color.to_floats())
-                square(context, x, y)
-            elif k == 'does-not-exist':
-                context.set_source_rgb(*does_not_exist_color.to_floats())
-                triangle(context, x, y)
-            else:
-                context.set_source_rgb(*dependency_color.to_floats())
-                circle(context, x, y)
-            if s:
-                context.fill_preserve()
-                context.set_source_rgb(0, 0, 0)
-                context.set_line_width(0.1)
-                context.stroke()
-            else:
-                context.fill()
-
-        # Draw edges
-        context.set_source_rgb(0, 0, 0)
-        context.set_line_width(0.1)
-        for i, j in self._graph.edges:
-            # Start and end position of arrow
-            i_pos = positions[i].copy()
-            j_pos = positions[j].copy()
-            # Adjust to radius of circle
-            ij = i_pos - j_pos
-            normal = ij / np.linalg.norm(ij)
-            perpendicular = np.array([normal[1], -normal[0]])
-            i_pos -= 0.5 * normal
-            j_pos += 0.5 * normal
-            # Draw line
-            context.move_to(*(i_pos - 0.05 * normal))
-            context.line_to(*(j_pos + 0.1 * normal))
-            context.stroke()
-            # Draw arrow head
-            context.move_to(*i_pos)
-            context.line_to(*(i_pos - 0.2 * normal - 0.2 * perpendicular))
-            context.line_to(*(i_pos - 0.2 * normal + 0.2 * perpendicular))
-            context.fill()
-            context.close_path()
+        # Draw latest positions published by the layout worker
+        render_graph(context, self._positions, self._vertex_kind, self._edge_i, self._edge_j,
+                     state=self._vertex_state)
 
     def on_motion_notify(self, area, event):
-        context = area.get_window().cairo_create()
-        self._cairo_scale(area, context)
-
-        positions = self._layout.positions
-        state = np.array(self._graph.get_vertex_properties('state'))
-        uuids = np.array(self._graph.get_vertex_properties('uuid'))
-        names = np.array(self._graph.get_vertex_properties('name'))
+        if self._graph is None or self._positions is None:
+            return
 
-        cursor_pos = np.array(context.device_to_user(event.x, event.y))
-        dist_sq = np.sum((positions - cursor_pos) ** 2, axis=1)
+        # Device to user coordinates, inverse of the transformation in _cairo_scale
+        s, tx, ty = self._transformation(area)
+        cursor_x = event.x / s - tx
+        cursor_y = event.y / s - ty
 
-        new_state = dist_sq < 0.25
-        if np.any(new_state != state):
-            state = new_state
-            self._graph.set_vertex_properties('state', state)
+        active_vertex = self._get_spatial_index().closest(cursor_x, cursor_y, HOVER_RADIUS)
+        if active_vertex != self._active_vertex:
+            if self._active_vertex is not None:
+                self._set_vertex_state(self._active_vertex, False)
+            if active_vertex is not None:
+                self._set_vertex_state(active_vertex, True)
+            self._active_vertex = active_vertex
 
             self.queue_draw()
 
-            if np.any(state):
+            if active_vertex is not None:
                 # Show popover
-                positions = self._layout.positions
-                x, y = positions[state][0]
+                x, y = self._positions[active_vertex]
                 rect = Gdk.Rectangle()
-                rect.x, rect.y = context.user_to_device(x, y + 0.5)
+                rect.x, rect.y = int(s * (x + tx)), int(s * (y + 0.5 + ty))
                 self._popover.set_pointing_to(rect)
-                self._current_uuid = uuids[state][0]
+                self._current_uuid = self._vertex_uuids[active_vertex]
                 self._popover.uuid = self._current_uuid
-                self._popover.name = names[state][0]
+                self._popover.name = self._vertex_names[active_vertex]
                 self._popover.show()
 
-        if not np.any(state):
+        if active_vertex is None:
             # Hide popover if no node is active
             self._popover.hide()
 
@@ -221,12 +535,37 @@ class DtoolGraphWidget(Gtk.DrawingArea):
         search_text = dump_single_line_query_text({"uuid": self._current_uuid})
         self.get_action_group("win").activate_action('search-select-show', GLib.Variant.new_string(search_text))
 
+    def on_restart_timeout(self, worker):
+        if worker.is_running:
+            # Cancelled worker still finishing its relaxation step
+            return True
+        self._restart_timer = None
+        if self._layout_worker is worker:
+            self._start_layout_worker()
+            self._start_timer()
+        return False
+
     def on_timeout(self, user_data):
-        try:
-            self._layout.iterate()
-        except Exception as e:
-            logger.error(str(e))
-        self.queue_draw()
+        worker = self._layout_worker
+        if worker is None:
+            self._timer = None
+            return False
+        # Check before picking up the snapshot, such that the final snapshot
+        # of a worker that stops in between is not missed
+        is_running = worker.is_running
+        # Pick up the latest snapshot and redraw only if the worker published a new one
+        if worker.generation != self._drawn_generation:
+            self._positions = worker.positions
+            self._drawn_generation = worker.generation
+            self.queue_draw()
+        if not is_running:
+            # Layout converged (or worker stopped), no need to wake up again
+            logger.debug("Graph layout worker stopped, pause redraw timer.")
+            if self._layout_cache is not None and isinstance(worker.layout, GraphLayout) \
+                    and worker.layout.converged:
+                self._layout_cache.store(self._graph, self._positions)
+            self._timer = None
+            return False
         return True
 
 
@@ -28,6 +28,8 @@ from math import pi
 
 from gi.repository import GObject, Gdk, Gtk
 
+from ..utils.progressbar import format_throughput
+
 _log = logging.getLogger(__name__)
 
 
@@ -53,6 +55,11 @@ class DtoolProgressChart(Gtk.DrawingArea):
         self._fraction = value
         self.queue_draw()
 
+    def set_throughput(self, rate, eta):
+        """Show aggregated rate in bytes per second and remaining time as tooltip"""
+        text = format_throughput(rate, eta)
+        self.set_tooltip_text(f'{self._fraction:.0%} ({text})' if text else None)
+
     def _cairo_scale(self, area, context):
         w, h = area.get_allocated_width(), area.get_allocated_height()
         s = min(w, h)
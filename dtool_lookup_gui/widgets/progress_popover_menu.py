@@ -23,7 +23,32 @@
 # SOFTWARE.
 #
 
-from gi.repository import GObject, Gtk
+from gi.repository import GLib, GObject, Gtk
+
+from ..utils.progressbar import ThroughputEstimator, format_throughput
+
+
+class DtoolBandwidthLimitControl(Gtk.Box):
+    """Spin button adjusting a BandwidthLimit in MB/s, 0 means unlimited."""
+    __gtype_name__ = 'DtoolBandwidthLimitControl'
+
+    _spacing = 6
+    _bytes_per_unit = 1e6
+
+    def __init__(self, label, bandwidth_limit, *args, **kwargs):
+        super().__init__(*args, orientation=Gtk.Orientation.HORIZONTAL, spacing=self._spacing, **kwargs)
+        self._bandwidth_limit = bandwidth_limit
+        self.spin_button = Gtk.SpinButton.new_with_range(0, 10000, 1)
+        self.spin_button.set_digits(1)
+        self.spin_button.set_value(bandwidth_limit.rate / self._bytes_per_unit)
+        self.spin_button.set_tooltip_text('Maximum transfer rate, 0 for unlimited')
+        self.spin_button.connect('value-changed', self.on_value_changed)
+        self.pack_start(Gtk.Label(label, xalign=0), True, True, 0)
+        self.pack_start(self.spin_button, False, False, 0)
+        self.pack_start(Gtk.Label('MB/s'), False, False, 0)
+
+    def on_value_changed(self, spin_button):
+        self._bandwidth_limit.rate = spin_button.get_value() * self._bytes_per_unit
 
 
 class DtoolProgressStatusBox(Gtk.Box):
@@ -31,15 +56,29 @@ class DtoolProgressStatusBox(Gtk.Box):
 
     _margin = 12
     _pb_margin = 3
+    _max_details_height = 300
+    # widgets are redrawn at most every this many milliseconds
+    _redraw_interval = 100
 
-    def __init__(self, update_notification, label, on_cancel, *args, **kwargs):
+    def __init__(self, update_notification, label, on_cancel, *args, on_prioritize=None, bandwidth_limit=None,
+                 **kwargs):
         super().__init__(*args, orientation=Gtk.Orientation.HORIZONTAL, **kwargs)
         self._step = 0
         self._length = 1
+        self._transferred = 0
         self._text = None
         self._done = False
+        self._running = on_prioritize is None
+        self._prioritize_button = None
+        self._cancel_button = None
+        self._bandwidth_limit_control = None
+        self._throughput = ThroughputEstimator()
+        self._redraw_source = None
+        self._details = None
 
+        # called with the change of step, length and bytes transferred on every progress report
         self._update_notification = update_notification
+        self.connect('destroy', lambda widget: self._cancel_redraw())
 
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, margin_top=self._margin, margin_bottom=self._margin,
                        margin_start=self._margin, margin_end=self._margin)
@@ -48,19 +87,91 @@ class DtoolProgressStatusBox(Gtk.Box):
         vbox.pack_start(self._progress_bar, False, False, 0)
         self._progress_label = Gtk.Label(xalign=0)
         vbox.pack_start(self._progress_label, True, False, 0)
+        if bandwidth_limit is not None:
+            self._bandwidth_limit_control = DtoolBandwidthLimitControl('Limit', bandwidth_limit,
+                                                                       margin_top=self._pb_margin)
+            vbox.pack_start(self._bandwidth_limit_control, False, False, 0)
+        self._vbox = vbox
         self.pack_start(vbox, False, False, 0)
         if on_cancel is not None:
-            button = Gtk.Button(image=Gtk.Image.new_from_icon_name('window-close-symbolic', Gtk.IconSize.BUTTON))
-            button.get_style_context().add_class('circular')
-            button.connect('clicked', on_cancel)
-            self.pack_end(button, False, False, 0)
+            self._cancel_button = Gtk.Button(
+                image=Gtk.Image.new_from_icon_name('window-close-symbolic', Gtk.IconSize.BUTTON),
+                tooltip_text='Cancel')
+            self._cancel_button.get_style_context().add_class('circular')
+            self._cancel_button.connect('clicked', on_cancel)
+            self.pack_end(self._cancel_button, False, False, 0)
+        if on_prioritize is not None:
+            self._prioritize_button = Gtk.Button(
+                image=Gtk.Image.new_from_icon_name('go-top-symbolic', Gtk.IconSize.BUTTON),
+                tooltip_text='Move to front of queue')
+            self._prioritize_button.get_style_context().add_class('circular')
+            self._prioritize_button.connect('clicked', on_prioritize)
+            self.pack_end(self._prioritize_button, False, False, 0)
+            self._progress_label.set_text('Queued')
+
+    def add_child_status_box(self, label):
+        """Add a status box for a part of this operation, shown in an expandable details list.
 
-    def set_step(self, step, length):
+        Progress of all child status boxes adds up to the progress of this box."""
+        if self._details is None:
+            self._details = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+            scrolled_window = Gtk.ScrolledWindow(hscrollbar_policy=Gtk.PolicyType.NEVER,
+                                                 max_content_height=self._max_details_height,
+                                                 propagate_natural_height=True)
+            scrolled_window.add(self._details)
+            expander = Gtk.Expander(label='Details')
+            expander.add(scrolled_window)
+            self._vbox.pack_start(expander, False, False, 0)
+            expander.show_all()
+        child = DtoolProgressStatusBox(self._on_child_progress, label, None)
+        self._details.pack_start(child, False, False, 0)
+        child.show_all()
+        self.set_step(self._step, self._length + len(child), self._transferred)
+        return child
+
+    @property
+    def child_status_boxes(self):
+        if self._details is None:
+            return []
+        return self._details.get_children()
+
+    def _on_child_progress(self, step_delta, length_delta, transferred_delta):
+        self.set_step(self._step + step_delta, self._length + length_delta, self._transferred + transferred_delta)
+
+    def set_step(self, step, length, transferred=None):
+        """Set progress to step of length.
+
+        The throughput refers to transferred, the bytes actually transferred
+        so far, which defaults to step. Progress without transfer, e.g.
+        hashing of a copy at freeze, is not sampled for the throughput."""
+        if transferred is None:
+            transferred = step
+        step_delta = step - self._step
+        length_delta = length - self._length
+        transferred_delta = transferred - self._transferred
         self._step = step
         self._length = length
+        self._transferred = transferred
+        if transferred_delta != 0 or step_delta == 0:
+            self._throughput.update(transferred)
+        if self._redraw_source is None:
+            self._redraw_source = GLib.timeout_add(self._redraw_interval, self._redraw)
+        self._update_notification(step_delta, length_delta, transferred_delta)
+
+    def _redraw(self):
+        self._redraw_source = None
         self._progress_bar.set_fraction(self.fraction)
-        self._progress_label.set_text(f'{step} / {length}')
-        self._update_notification()
+        text = f'{self.fraction:.0%}'
+        throughput = format_throughput(self.rate, self.eta)
+        if throughput:
+            text += f' ({throughput})'
+        self._progress_label.set_text(text)
+        return GLib.SOURCE_REMOVE
+
+    def _cancel_redraw(self):
+        if self._redraw_source is not None:
+            GLib.source_remove(self._redraw_source)
+            self._redraw_source = None
 
     def set_text(self, value):
         self._text = value
@@ -72,6 +183,10 @@ class DtoolProgressStatusBox(Gtk.Box):
     def step(self):
         return self._step
 
+    @property
+    def transferred(self):
+        return self._transferred
+
     @property
     def fraction(self):
         if self._length > 0:
@@ -79,12 +194,59 @@ class DtoolProgressStatusBox(Gtk.Box):
         else:
             return 1.
 
+    @property
+    def rate(self):
+        """Smoothed progress rate in steps (bytes) per second, None if unknown"""
+        if self._done:
+            return None
+        return self._throughput.rate
+
+    @property
+    def eta(self):
+        """Estimated seconds until done, None if unknown"""
+        if self._done:
+            return None
+        return self._throughput.eta(self._length - self._step)
+
+    @property
+    def is_running(self):
+        return self._running
+
     @property
     def is_done(self):
         return self._done
 
-    def set_done(self, error=None):
+    def set_queued(self, position=None):
+        if position is None:
+            self._progress_label.set_text('Queued')
+        else:
+            self._progress_label.set_text(f'Queued (position {position})')
+
+    def set_running(self):
+        self._running = True
+        if self._prioritize_button is not None:
+            self._prioritize_button.hide()
+        self._progress_label.set_text('Starting...')
+
+    def _finish(self):
+        self._cancel_redraw()
+        self._running = False
         self._done = True
+        for widget in (self._prioritize_button, self._cancel_button, self._bandwidth_limit_control):
+            if widget is not None:
+                widget.hide()
+
+    def set_cancelled(self):
+        self._finish()
+        self._progress_label.set_text('Copy cancelled. Copying again to the same destination resumes it.')
+
+    def set_skipped(self, reason):
+        self._finish()
+        self._progress_bar.set_fraction(1.)
+        self._progress_label.set_text(f'Skipped: {reason}')
+
+    def set_done(self, error=None):
+        self._finish()
         if error is not None:
             self._progress_bar.set_fraction(0.)
             self._progress_label.set_text(f'Copy failed: {error}')
@@ -96,18 +258,36 @@ class DtoolProgressStatusBox(Gtk.Box):
 class DtoolProgressPopoverMenu(Gtk.PopoverMenu):
     __gtype_name__ = 'DtoolProgressPopoverMenu'
 
+    _margin = 12
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         self.hbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.add(self.hbox)
-        self.hbox.show_all()
+        self._vbox.pack_start(self.hbox, False, False, 0)
+        self.add(self._vbox)
+        self._vbox.show_all()
+
+    def add_bandwidth_limit_control(self, label, bandwidth_limit):
+        """Add a control for a BandwidthLimit that applies to all operations below the status boxes."""
+        control = DtoolBandwidthLimitControl(label, bandwidth_limit, margin_top=self._margin,
+                                             margin_bottom=self._margin, margin_start=self._margin,
+                                             margin_end=self._margin)
+        self._vbox.pack_end(control, False, False, 0)
+        self._vbox.pack_end(Gtk.Separator(), False, False, 0)
+        self._vbox.show_all()
+        return control
 
     def clear(self):
         for child in self.hbox.get_children():
             child.destroy()
 
-    def add_status_box(self, update_notification, label, on_cancel=None):
-        status_box = DtoolProgressStatusBox(update_notification, label, on_cancel)
+    def add_status_box(self, update_notification, label, on_cancel=None, on_prioritize=None, bandwidth_limit=None):
+        """Add a status box. Passing on_prioritize marks the operation as queued.
+
+        Passing a BandwidthLimit adds a control to adjust it while the operation runs."""
+        status_box = DtoolProgressStatusBox(update_notification, label, on_cancel, on_prioritize=on_prioritize,
+                                            bandwidth_limit=bandwidth_limit)
         self.hbox.pack_end(status_box, False, False, 0)
         status_box.show_all()
         return status_box
@@ -116,5 +296,6 @@ class DtoolProgressPopoverMenu(Gtk.PopoverMenu):
     def status_boxes(self):
         return self.hbox.get_children()
 
+GObject.type_register(DtoolBandwidthLimitControl)
 GObject.type_register(DtoolProgressStatusBox)
 GObject.type_register(DtoolProgressPopoverMenu)
@@ -48,6 +48,15 @@ os.environ["DBUS_SESSION_BUS_ADDRESS"] = "/dev/null"
 # fully isolated, working settings.
 os.environ["GSETTINGS_BACKEND"] = "memory"
 
+# Keep caches written by the app (e.g. dependency graph layouts) out of the
+# developer's real cache directory. GLib reads this once, before first use.
+import tempfile
+os.environ["XDG_CACHE_HOME"] = os.path.join(
+    tempfile.gettempdir(), "dtool-lookup-gui-test-cache-{}".format(os.getpid()))
+# Same for user data such as the journal of unfinished copies.
+os.environ["XDG_DATA_HOME"] = os.path.join(
+    tempfile.gettempdir(), "dtool-lookup-gui-test-data-{}".format(os.getpid()))
+
 import gi
 gi.require_version('Gtk', '3.0')
 gi.require_version('GtkSource', '4')
@@ -0,0 +1,131 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Unit tests for the journal of unfinished copies (utils.copy_journal)."""
+import json
+
+import pytest
+
+from dtool_lookup_gui.utils.copy_journal import CopyJournal, JournaledProgress, FAILED, PENDING, RUNNING
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / 'journal' / 'copy-journal.json')
+
+
+def test_entries_survive_restart(journal_path):
+    journal = CopyJournal(journal_path)
+    first = journal.add('file:///src/a', 's3://bucket', name='a')
+    journal.add('file:///src/b', 's3://bucket', name='b')
+    journal.set_running(first)
+
+    entries = CopyJournal(journal_path).entries
+    assert [entry['source_uri'] for entry in entries] == ['file:///src/a', 'file:///src/b']
+    assert [entry['state'] for entry in entries] == [RUNNING, PENDING]
+    assert entries[0]['destination'] == 's3://bucket'
+    assert entries[0]['name'] == 'a'
+
+
+def test_remove_and_clear(journal_path):
+    journal = CopyJournal(journal_path)
+    first = journal.add('file:///src/a', 's3://bucket')
+    journal.add('file:///src/b', 's3://bucket')
+    journal.remove(first)
+    journal.remove(first)  # removing twice is harmless
+    assert [entry['source_uri'] for entry in CopyJournal(journal_path).entries] == ['file:///src/b']
+    journal.clear()
+    assert CopyJournal(journal_path).entries == []
+
+
+def test_failed_copy_is_kept_with_error(journal_path):
+    journal = CopyJournal(journal_path)
+    entry_id = journal.add('file:///src/a', 's3://bucket')
+    assert journal.entries[0]['error'] is None
+    journal.set_failed(entry_id, 'network unreachable')
+    entry, = CopyJournal(journal_path).entries
+    assert entry['state'] == FAILED
+    assert entry['error'] == 'network unreachable'
+
+
+def test_progress_writes_are_throttled(journal_path):
+    clock = _Clock()
+    journal = CopyJournal(journal_path, min_write_interval=10., clock=clock)
+    entry_id = journal.add('file:///src/a', 's3://bucket')
+
+    clock.now = 1.
+    journal.set_progress(entry_id, 100)
+    assert journal.entries[0]['bytes_done'] == 100
+    assert CopyJournal(journal_path).entries[0]['bytes_done'] == 0
+
+    clock.now = 11.
+    journal.set_progress(entry_id, 200)
+    entry, = CopyJournal(journal_path).entries
+    assert entry['bytes_done'] == 200
+
+
+def test_unreadable_journal_is_ignored(journal_path, tmp_path):
+    (tmp_path / 'journal').mkdir()
+    with open(journal_path, 'w') as f:
+        f.write('{"copies": [')
+    journal = CopyJournal(journal_path)
+    assert journal.entries == []
+    journal.add('file:///src/a', 's3://bucket')
+    with open(journal_path) as f:
+        assert len(json.load(f)['copies']) == 1
+
+
+def test_journaled_progress_forwards_to_tracker(journal_path):
+    class Tracker:
+        def __init__(self):
+            self.steps = []
+            self.transferred = 0
+
+        def set_step(self, step, length, transferred=None):
+            self.steps.append((step, length))
+            self.transferred = step if transferred is None else transferred
+
+        def set_text(self, text):
+            self.text = text
+
+    journal = CopyJournal(journal_path, min_write_interval=0.)
+    entry_id = journal.add('file:///src/a', 's3://bucket')
+    tracker = Tracker()
+    progress = JournaledProgress(tracker, journal, entry_id)
+    progress.set_step(5, 10)
+    progress.set_text('item')
+    assert tracker.steps == [(5, 10)]
+    assert tracker.text == 'item'
+    assert not hasattr(progress, 'set_fraction')
+    assert CopyJournal(journal_path).entries[0]['bytes_done'] == 5
+    # hashing after the transfer advances the step but not the bytes done
+    progress.set_step(15, 20, transferred=10)
+    assert CopyJournal(journal_path).entries[0]['bytes_done'] == 10
@@ -35,7 +35,8 @@ import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk
 
-from dtool_lookup_gui.utils.copy_manager import CopyManager
+from dtool_lookup_gui.utils.copy_manager import CopyManager, CopyQueue, QUEUED, RUNNING, DONE, destination_key
+from dtool_lookup_gui.widgets.progress_chart import DtoolProgressChart
 from dtool_lookup_gui.widgets.progress_popover_menu import (
     DtoolProgressPopoverMenu, DtoolProgressStatusBox
 )
@@ -59,8 +60,16 @@ def copy_manager(progress_widgets):
     manager = CopyManager.__new__(CopyManager)
     manager._margin = CopyManager._margin
     manager._progress_revealer = revealer
-    manager._progress_chart = Gtk.ProgressBar()
+    manager._progress_chart = DtoolProgressChart()
     manager._progress_popover = popover
+    manager._copy_queue = CopyQueue(on_change=manager.queue_update)
+    manager._trackers = {}
+    manager._total_step = 0
+    manager._total_length = 0
+    manager._chart_update_source = None
+    manager._journal = None
+    manager._bandwidth_limit = None
+    manager._bandwidth_limit_per_copy = 0.
     return manager
 
 
@@ -140,3 +149,404 @@ async def test_copy_success_shows_success_in_tracker(progress_widgets):
     assert "succeeded" in label_text.lower(), \
         f"Expected success text in label, got: {label_text!r}"
     assert tracker._progress_bar.get_fraction() == 1.0
+
+
+def test_destination_key_ignores_path():
+    assert destination_key('s3://bucket/a') == destination_key('s3://bucket/b')
+    assert destination_key('s3://bucket/a') != destination_key('s3://other/a')
+    assert destination_key('file:///tmp/a') == destination_key('file:///home/b')
+
+
+def test_copy_queue_global_limit():
+    queue = CopyQueue(max_concurrent=2, max_concurrent_per_destination=None)
+    jobs = [queue.submit(f's3://bucket{i}') for i in range(3)]
+    assert [job.state for job in jobs] == [RUNNING, RUNNING, QUEUED]
+    queue.finish(jobs[0])
+    assert [job.state for job in jobs] == [DONE, RUNNING, RUNNING]
+
+
+def test_copy_queue_per_destination_limit_does_not_block_other_destinations():
+    queue = CopyQueue(max_concurrent=3, max_concurrent_per_destination=1)
+    first = queue.submit('s3://bucket/a')
+    second = queue.submit('s3://bucket/b')
+    other = queue.submit('smb://server/c')
+    assert (first.state, second.state, other.state) == (RUNNING, QUEUED, RUNNING)
+    queue.finish(first)
+    assert second.state == RUNNING
+
+
+def test_copy_queue_priorities():
+    queue = CopyQueue(max_concurrent=1, max_concurrent_per_destination=None)
+    running = queue.submit('s3://bucket')
+    low = queue.submit('s3://bucket', priority=0)
+    high = queue.submit('s3://bucket', priority=1)
+    last = queue.submit('s3://bucket', priority=0)
+    assert queue.queued == [high, low, last]
+    queue.prioritize(last)
+    assert queue.queued == [last, high, low]
+    queue.finish(running)
+    assert last.state == RUNNING
+
+
+def test_copy_queue_changed_limits_apply_to_queued_jobs():
+    queue = CopyQueue(max_concurrent=1, max_concurrent_per_destination=1)
+    jobs = [queue.submit('s3://bucket') for _ in range(3)]
+    assert [job.state for job in jobs] == [RUNNING, QUEUED, QUEUED]
+    queue.set_limits(2, 0)
+    assert [job.state for job in jobs] == [RUNNING, RUNNING, QUEUED]
+    # running jobs beyond a lowered limit finish, queued ones wait
+    queue.set_limits(1, 1)
+    queue.finish(jobs[0])
+    assert [job.state for job in jobs] == [DONE, RUNNING, QUEUED]
+
+
+def test_copy_queue_withdraw_queued_job():
+    queue = CopyQueue(max_concurrent=1)
+    running = queue.submit('s3://bucket')
+    queued = queue.submit('s3://bucket')
+    queue.finish(queued)
+    assert queued.state == DONE
+    assert queue.queued == []
+    assert queue.running == [running]
+
+
+@pytest.mark.asyncio
+async def test_copies_to_same_destination_run_one_at_a_time(copy_manager):
+    active = 0
+    max_active = 0
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    datasets = []
+    for i in range(4):
+        dataset = MagicMock()
+        dataset.__str__ = MagicMock(return_value=f"test-dataset-{i}")
+        dataset.copy = copy
+        datasets.append(dataset)
+
+    await asyncio.gather(*[copy_manager.copy(dataset, 's3://bucket/dest') for dataset in datasets])
+
+    assert max_active == 1
+    assert copy_manager._copy_queue.queued == []
+    assert copy_manager._copy_queue.running == []
+
+
+def test_status_box_queued_and_running_states(progress_widgets):
+    _, popover = progress_widgets
+    tracker = popover.add_status_box(lambda: None, "Copying", on_prioritize=lambda button: None)
+    assert not tracker.is_running
+    tracker.set_queued(3)
+    assert '3' in tracker._progress_label.get_text()
+    tracker.set_running()
+    assert tracker.is_running
+    tracker.set_done()
+    assert tracker.is_done and not tracker.is_running
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_copy(copy_manager, progress_widgets):
+    revealer, popover = progress_widgets
+    started = asyncio.Event()
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        started.set()
+        await asyncio.sleep(60)
+
+    dataset = MagicMock()
+    dataset.__str__ = MagicMock(return_value="test-dataset")
+    dataset.copy = copy
+
+    copy_task = asyncio.ensure_future(copy_manager.copy(dataset, 's3://bucket/dest'))
+    await asyncio.wait_for(started.wait(), 10)
+    tracker, = popover.status_boxes
+    tracker._cancel_button.clicked()
+    await asyncio.wait_for(copy_task, 10)
+
+    assert tracker.is_done
+    assert 'cancelled' in tracker._progress_label.get_text().lower()
+    assert copy_manager._copy_queue.running == []
+    assert not revealer.get_reveal_child()
+
+
+def test_progress_update_aggregates_throughput(copy_manager, progress_widgets):
+    _, popover = progress_widgets
+    first = popover.add_status_box(copy_manager.progress_update, "first")
+    second = popover.add_status_box(copy_manager.progress_update, "second")
+    copy_manager._total_length = len(first) + len(second)
+    first.set_step(0, 8_000_000)
+    second.set_step(0, 8_000_000)
+    # 16 MB remaining at 4 MB/s
+    first._throughput._rate = 1e6
+    second._throughput._rate = 3e6
+    copy_manager._update_chart()
+    assert copy_manager._progress_chart.get_tooltip_text() == '0% (4.0 MB/s, 4s left)'
+
+
+def test_status_box_throughput_ignores_progress_without_transfer(progress_widgets):
+    from dtool_lookup_gui.utils.progressbar import ThroughputEstimator
+    _, popover = progress_widgets
+    now = [0.]
+    tracker = popover.add_status_box(lambda *args: None, "copy")
+    tracker._throughput = ThroughputEstimator(clock=lambda: now[0])
+    tracker.set_step(0, 200, transferred=0)
+    now[0] = 1.
+    tracker.set_step(100, 200, transferred=100)
+    assert tracker.rate == 100
+    # hashing at freeze advances the progress, but transfers nothing
+    now[0] = 2.
+    tracker.set_step(150, 200, transferred=100)
+    assert tracker.rate == 100
+    assert (tracker.step, tracker.transferred) == (150, 100)
+
+
+def test_progress_reports_keep_running_totals_and_coalesce_redraws(copy_manager, progress_widgets):
+    _, popover = progress_widgets
+    tracker = popover.add_status_box(copy_manager.progress_update, "copy")
+    copy_manager._total_length = len(tracker)
+    for step in range(1, 101):
+        tracker.set_step(step, 1000)
+    assert (copy_manager._total_step, copy_manager._total_length) == (100, 1000)
+    # widgets and chart are refreshed once per frame, not once per report
+    assert tracker._redraw_source is not None
+    assert tracker._progress_bar.get_fraction() == 0.
+    tracker._redraw()
+    assert tracker._progress_bar.get_fraction() == 0.1
+    copy_manager._update_chart()
+    assert copy_manager._progress_chart.fraction == 0.1
+    tracker.set_done()
+    assert tracker._redraw_source is None
+
+
+def _mock_dataset(name, copy, copy_state=None):
+    dataset = MagicMock()
+    dataset.__str__ = MagicMock(return_value=name)
+    dataset.copy = copy
+    dataset.get_copy_state = AsyncMock(return_value=copy_state)
+    return dataset
+
+
+@pytest.mark.asyncio
+async def test_copy_batch_aggregates_datasets_in_one_status_box(copy_manager, progress_widgets):
+    revealer, popover = progress_widgets
+    copied = []
+    status_boxes = []
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        status_boxes.append(len(popover.status_boxes))
+        progressbar.set_step(0, 100)
+        progressbar.set_step(100, 100)
+        copied.append(destination)
+
+    datasets = [_mock_dataset(f"dataset-{i}", copy) for i in range(3)]
+    existing = _mock_dataset("existing", copy)
+
+    def plan(datasets, destination):
+        return datasets[:3], datasets[3:]
+
+    await copy_manager.copy_batch(datasets + [existing], 's3://bucket/dest', plan=plan)
+
+    assert len(copied) == 3
+    assert status_boxes == [1, 1, 1]
+    assert copy_manager._copy_queue.running == []
+    assert not revealer.get_reveal_child()
+
+
+@pytest.mark.asyncio
+async def test_copy_batch_reports_failures_and_continues(copy_manager, progress_widgets):
+    _, popover = progress_widgets
+    copied = []
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        copied.append(destination)
+
+    async def fail(destination, progressbar=None, bandwidth_limits=()):
+        raise RuntimeError("missing storage plugin")
+
+    # keep the batch box alive to inspect it after completion
+    keep_alive = popover.add_status_box(lambda *args: None, "other")
+    datasets = [_mock_dataset("bad", fail), _mock_dataset("good", copy)]
+    await copy_manager.copy_batch(datasets, 's3://bucket/dest')
+
+    batch, = [box for box in popover.status_boxes if box is not keep_alive]
+    assert batch.is_done
+    assert "1 of 2" in batch._progress_label.get_text()
+    assert [child.is_done for child in batch.child_status_boxes] == [True, True]
+    assert copied == ['s3://bucket/dest']
+
+
+@pytest.mark.asyncio
+async def test_copy_failing_before_it_got_a_slot_is_finished(copy_manager, progress_widgets):
+    revealer, popover = progress_widgets
+    dataset = _mock_dataset("dataset", AsyncMock(return_value=None))
+    keep_alive = popover.add_status_box(lambda *args: None, "other")
+
+    with patch.object(copy_manager._copy_queue, "slot", side_effect=RuntimeError("queue broken")):
+        await copy_manager.copy(dataset, 's3://bucket/dest')
+
+    tracker, = [box for box in popover.status_boxes if box is not keep_alive]
+    assert tracker.is_done
+    assert "queue broken" in tracker._progress_label.get_text()
+    dataset.copy.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_copy_batch_failing_to_plan_is_finished(copy_manager, progress_widgets):
+    revealer, popover = progress_widgets
+
+    def plan(datasets, destination):
+        raise OSError("destination unreachable")
+
+    await copy_manager.copy_batch([_mock_dataset("dataset", AsyncMock())], 's3://bucket/dest', plan=plan)
+    assert not revealer.get_reveal_child()
+
+
+@pytest.mark.asyncio
+async def test_copy_is_journaled_until_finished(copy_manager, tmp_path):
+    from dtool_lookup_gui.utils.copy_journal import CopyJournal, RUNNING
+    journal_path = str(tmp_path / 'copy-journal.json')
+    copy_manager._journal = CopyJournal(journal_path, min_write_interval=0.)
+    started = asyncio.Event()
+    proceed = asyncio.Event()
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        progressbar.set_step(10, 100)
+        started.set()
+        await proceed.wait()
+
+    dataset = MagicMock()
+    dataset.__str__ = MagicMock(return_value="file:///src/test-dataset")
+    dataset.name = "test-dataset"
+    dataset.uuid = "1234-uuid"
+    dataset.copy = copy
+
+    copy_task = asyncio.ensure_future(copy_manager.copy(dataset, 's3://bucket/dest'))
+    await asyncio.wait_for(started.wait(), 10)
+    entry, = CopyJournal(journal_path).entries
+    assert entry['source_uri'] == "file:///src/test-dataset"
+    assert entry['name'] == "test-dataset"
+    assert entry['uuid'] == "1234-uuid"
+    assert entry['state'] == RUNNING
+    assert entry['bytes_done'] == 10
+
+    proceed.set()
+    await asyncio.wait_for(copy_task, 10)
+    assert CopyJournal(journal_path).entries == []
+
+
+@pytest.mark.asyncio
+async def test_failed_copy_stays_journaled_with_error(copy_manager, tmp_path):
+    from dtool_lookup_gui.utils.copy_journal import CopyJournal, FAILED
+    journal_path = str(tmp_path / 'copy-journal.json')
+    copy_manager._journal = CopyJournal(journal_path)
+
+    async def fail(destination, progressbar=None, bandwidth_limits=()):
+        raise ChildProcessError("network unreachable")
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        pass
+
+    await copy_manager.copy(_mock_dataset("file:///src/lost", fail, 'protodataset'), 's3://bucket/dest')
+    await copy_manager.copy_batch([_mock_dataset("file:///src/batch-lost", fail, 'protodataset'),
+                                   _mock_dataset("file:///src/batch-done", copy)], 's3://bucket/dest')
+
+    entries = CopyJournal(journal_path).entries
+    assert [entry['source_uri'] for entry in entries] == ["file:///src/lost", "file:///src/batch-lost"]
+    assert [entry['state'] for entry in entries] == [FAILED, FAILED]
+    assert "network unreachable" in entries[0]['error']
+
+
+@pytest.mark.asyncio
+async def test_only_resumable_failed_copies_stay_journaled(copy_manager, tmp_path):
+    from dtool_lookup_gui.utils.copy_journal import CopyJournal
+    journal_path = str(tmp_path / 'copy-journal.json')
+    copy_manager._journal = CopyJournal(journal_path)
+
+    async def exists(destination, progressbar=None, bandwidth_limits=()):
+        raise ChildProcessError("dtoolcore.DtoolCoreTypeError: s3://bucket/dest/a is not a ProtoDataSet")
+
+    async def disconnect(destination, progressbar=None, bandwidth_limits=()):
+        raise ConnectionError("connection reset")
+
+    unreachable = _mock_dataset("file:///src/unreachable", exists)
+    unreachable.get_copy_state.side_effect = OSError("network unreachable")
+    await copy_manager.copy_batch([_mock_dataset("file:///src/frozen", exists, 'dataset'),
+                                   _mock_dataset("file:///src/nothing-written", exists),
+                                   _mock_dataset("file:///src/disconnected", disconnect),
+                                   unreachable], 's3://bucket/dest')
+
+    assert [entry['source_uri'] for entry in CopyJournal(journal_path).entries] == \
+        ["file:///src/disconnected", "file:///src/unreachable"]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_copy_stays_journaled(copy_manager, tmp_path):
+    from dtool_lookup_gui.utils.copy_journal import CopyJournal
+    journal_path = str(tmp_path / 'copy-journal.json')
+    copy_manager._journal = CopyJournal(journal_path)
+    started = asyncio.Event()
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        started.set()
+        await asyncio.sleep(60)
+
+    dataset = MagicMock()
+    dataset.__str__ = MagicMock(return_value="file:///src/test-dataset")
+    dataset.copy = copy
+
+    # Cancelling from outside, as on application shutdown, is not a user cancel
+    copy_task = asyncio.ensure_future(copy_manager.copy(dataset, 's3://bucket/dest'))
+    await asyncio.wait_for(started.wait(), 10)
+    copy_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await copy_task
+    assert [entry['destination'] for entry in CopyJournal(journal_path).entries] == ['s3://bucket/dest']
+
+
+@pytest.mark.asyncio
+async def test_copy_obeys_global_and_own_bandwidth_limit(copy_manager, progress_widgets):
+    from dtool_lookup_gui.utils.bandwidth import BandwidthLimit
+    _, popover = progress_widgets
+    copy_manager._bandwidth_limit = BandwidthLimit(5e6)
+    copy_manager._bandwidth_limit_per_copy = 1e6
+    started = asyncio.Event()
+    proceed = asyncio.Event()
+    received = []
+
+    async def copy(destination, progressbar=None, bandwidth_limits=()):
+        received.extend(bandwidth_limits)
+        started.set()
+        await proceed.wait()
+
+    dataset = MagicMock()
+    dataset.__str__ = MagicMock(return_value="test-dataset")
+    dataset.copy = copy
+
+    copy_task = asyncio.ensure_future(copy_manager.copy(dataset, 's3://bucket/dest'))
+    await asyncio.wait_for(started.wait(), 10)
+    global_limit, own_limit = received
+    assert global_limit is copy_manager._bandwidth_limit
+    assert own_limit.rate == 1e6
+
+    # adjusting the limit in the status box applies to the running copy
+    tracker, = popover.status_boxes
+    tracker._bandwidth_limit_control.spin_button.set_value(2.5)
+    assert own_limit.rate == 2.5e6
+
+    proceed.set()
+    await asyncio.wait_for(copy_task, 10)
+
+
+def test_popover_bandwidth_limit_control(progress_widgets):
+    from dtool_lookup_gui.utils.bandwidth import BandwidthLimit
+    _, popover = progress_widgets
+    limit = BandwidthLimit()
+    control = popover.add_bandwidth_limit_control('Limit of all copies', limit)
+    control.spin_button.set_value(10)
+    assert limit.rate == 10e6
+    # the control is not a status box
+    assert popover.status_boxes == []
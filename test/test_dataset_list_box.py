@@ -0,0 +1,245 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Unit tests for the model-backed dataset list box (widgets.dataset_list_box).
+
+Rows are created in chunks on demand; the tests use lightweight stand-in
+datasets and a small chunk size.
+"""
+import pytest
+
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk
+
+from dtool_lookup_gui.widgets.dataset_list_box import DtoolDatasetListBox
+
+
+class FakeDataset:
+    def __init__(self, index):
+        self.uri = f"file:///data/dataset-{index}"
+        self.uuid = f"uuid-{index}"
+        self.name = f"dataset {index}"
+        self.creator = "alice"
+        self.is_frozen = True
+        self.date = "2023-05-11"
+        self.size_str = " 1.2 kB "
+
+    def __str__(self):
+        return self.uri
+
+
+def _datasets(nb, offset=0):
+    return [FakeDataset(offset + i) for i in range(nb)]
+
+
+@pytest.fixture
+def list_box():
+    box = DtoolDatasetListBox()
+    box._chunk_size = 10
+    return box
+
+
+def test_fill_creates_first_chunk_of_rows_only(list_box):
+    datasets = _datasets(1000)
+    shown = []
+    list_box.fill(datasets, on_show=shown.append)
+    assert len(list_box.get_children()) == 10
+    assert [row.dataset for row in list_box.get_children()] == datasets[:10]
+    assert list_box.datasets == datasets
+    assert shown == [datasets]
+    assert list_box.get_row_index_from_uri(datasets[500].uri) == 500
+
+
+def test_get_row_at_index_creates_missing_rows(list_box):
+    datasets = _datasets(1000)
+    list_box.fill(datasets)
+    row = list_box.get_row_at_index(500)
+    assert row.dataset is datasets[500]
+    assert row.get_index() == 500
+    assert list_box.get_row_at_index(1000) is None
+
+
+def test_fill_reuses_rows(list_box):
+    list_box.fill(_datasets(25))
+    list_box.get_row_at_index(14)
+    rows = list_box.get_children()
+    list_box.select_row(rows[3])
+
+    datasets = _datasets(100, offset=1000)
+    list_box.fill(datasets)
+    # as many rows as before, showing the new datasets, nothing selected
+    assert list_box.get_children() == rows
+    assert [row.dataset for row in rows] == datasets[:15]
+    assert "uuid-1000" in rows[0].uuid_label.get_label()
+    assert list_box.get_selected_rows() == []
+    assert list_box.get_row_index_from_uri(datasets[0].uri) == 0
+
+    list_box.fill(_datasets(3))
+    assert len(list_box.get_children()) == 3
+
+
+def test_scrolling_to_the_end_creates_next_chunk(list_box):
+    list_box.fill(_datasets(25))
+    adjustment = Gtk.Adjustment(value=0, lower=0, upper=2000, page_size=500)
+    list_box.on_scroll(adjustment)
+    assert len(list_box.get_children()) == 10
+    adjustment.set_value(1400)
+    list_box.on_scroll(adjustment)
+    assert len(list_box.get_children()) == 20
+    list_box.on_scroll(adjustment)
+    assert len(list_box.get_children()) == 25
+
+
+def test_add_dataset_creates_and_selects_only_its_row(list_box):
+    list_box.set_selection_mode(Gtk.SelectionMode.MULTIPLE)
+    datasets = _datasets(50)
+    list_box.fill(datasets)
+    list_box.select_row(list_box.get_row_at_index(3))
+    dataset = FakeDataset(50)
+    list_box.add_dataset(dataset)
+    # the new dataset follows the rows that exist, no rows are created for the datasets in between
+    assert len(list_box.get_children()) == 11
+    row, = list_box.get_selected_rows()
+    assert row.dataset is dataset
+    assert row.get_index() == 10
+    assert list_box.datasets == datasets[:10] + [dataset] + datasets[10:]
+    assert list_box.get_row_index_from_uri(dataset.uri) == 10
+    assert list_box.get_row_index_from_uri(datasets[10].uri) == 11
+    assert list_box.get_row_index_from_uri(datasets[49].uri) == 50
+    with pytest.raises(ValueError):
+        list_box.add_dataset(FakeDataset(3))
+
+
+def test_selected_row_only_while_a_single_row_is_selected(list_box):
+    list_box.set_selection_mode(Gtk.SelectionMode.MULTIPLE)
+    datasets = _datasets(5)
+    list_box.fill(datasets)
+    assert list_box.get_selected_row() is None
+    list_box.select_row(list_box.get_row_at_index(1))
+    assert list_box.get_selected_row().dataset is datasets[1]
+    list_box.select_row(list_box.get_row_at_index(3))
+    assert list_box.get_selected_row() is None
+    assert list_box.get_selected_datasets() == [datasets[1], datasets[3]]
+
+
+def test_add_dataset_to_fully_shown_list_appends(list_box):
+    datasets = _datasets(5)
+    list_box.fill(datasets)
+    dataset = FakeDataset(5)
+    list_box.add_dataset(dataset)
+    assert list_box.datasets == datasets + [dataset]
+    assert list_box.get_selected_rows()[0].get_index() == 5
+
+
+def test_fill_rejects_duplicate_uris(list_box):
+    with pytest.raises(ValueError):
+        list_box.fill([FakeDataset(1), FakeDataset(1)])
+
+
+def test_scrolling_past_all_rows_requests_more_datasets(list_box):
+    requests = []
+    list_box.request_more_datasets = requests.append
+    list_box.fill(_datasets(15))
+    adjustment = Gtk.Adjustment(value=1400, lower=0, upper=2000, page_size=500)
+    list_box.on_scroll(adjustment)
+    assert requests == []
+    list_box.on_scroll(adjustment)
+    assert requests == [Gtk.PositionType.BOTTOM]
+    adjustment.set_value(0)
+    list_box.on_scroll(adjustment)
+    assert requests == [Gtk.PositionType.BOTTOM, Gtk.PositionType.TOP]
+
+
+def test_append_and_prepend_skip_known_datasets(list_box):
+    datasets = _datasets(10, offset=10)
+    list_box.fill(datasets)
+    assert list_box.append_datasets(_datasets(10, offset=15)) == 5
+    # all rows existed before, hence the appended datasets have rows
+    assert len(list_box.get_children()) == 15
+    assert list_box.prepend_datasets(_datasets(12)) == 10
+    assert [dataset.uri for dataset in list_box.datasets] == [dataset.uri for dataset in _datasets(25)]
+    assert [row.dataset for row in list_box.get_children()] == list_box.datasets
+    assert list_box.get_row_index_from_uri(datasets[0].uri) == 10
+
+
+def test_remove_first_and_last(list_box):
+    list_box.fill(_datasets(30))
+    list_box.get_row_at_index(19)
+    list_box.remove_first(5)
+    assert list_box.datasets[0].uri == _datasets(1, offset=5)[0].uri
+    assert len(list_box.get_children()) == 15
+    assert list_box.get_row_index_from_uri(list_box.datasets[0].uri) == 0
+    list_box.remove_last(12)
+    assert len(list_box.datasets) == 13
+    assert len(list_box.get_children()) == 13
+    assert list_box.get_row_index_from_uri(_datasets(1, offset=29)[0].uri) is None
+
+
+def test_update_touches_only_changed_rows(list_box):
+    datasets = _datasets(30)
+    list_box.fill(datasets)
+    list_box.get_row_at_index(19)
+    rows = list_box.get_children()
+    list_box.select_row(rows[7])
+
+    listing = _datasets(31)  # fresh objects for the same datasets, plus one new
+    del listing[2]
+    listing[4].name = "renamed"
+    listing[11].is_frozen = False
+    shown = []
+    list_box.update(listing, on_show=shown.append)
+
+    assert [dataset.uri for dataset in list_box.datasets] == [dataset.uri for dataset in listing]
+    # unchanged datasets keep their rows and objects, selection survives
+    children = list_box.get_children()
+    assert len(children) == 19
+    assert children[:2] == rows[:2] and children[6:] == rows[7:]
+    assert children[0].dataset is datasets[0]
+    assert children[4] is rows[5] and children[4].dataset is listing[4]
+    assert "renamed" in children[4].name_label.get_label()
+    assert children[5].dataset is datasets[6]
+    assert children[11] is rows[12] and children[11].dataset is listing[11]
+    assert list_box.get_selected_rows() == [rows[7]]
+    assert list_box.get_row_index_from_uri(listing[-1].uri) == 29
+    assert list_box.get_row_index_from_uri(datasets[2].uri) is None
+    assert shown == [listing]
+
+
+def test_update_inserts_rows_in_order(list_box):
+    list_box.fill(_datasets(5, offset=1))
+    rows = list_box.get_children()
+    listing = _datasets(8)
+    list_box.update(listing)
+    assert [row.dataset.uri for row in list_box.get_children()] == [dataset.uri for dataset in listing]
+    assert list_box.get_children()[1:6] == rows
+    assert list_box.get_row_index_from_uri(listing[3].uri) == 3
+
+
+def test_update_falls_back_to_fill_when_reordered(list_box):
+    list_box.fill(_datasets(5))
+    listing = list(reversed(_datasets(5)))
+    list_box.update(listing)
+    assert [row.dataset for row in list_box.get_children()] == listing
+    list_box.update(_datasets(3, offset=100))
+    assert [row.dataset.uri for row in list_box.get_children()] == [d.uri for d in _datasets(3, offset=100)]
@@ -24,22 +24,31 @@
 """Unit tests for the dependency-graph drawing widget (widgets.graph_widget).
 
 The shape helpers and the on_draw render path are exercised against an
-in-memory cairo surface (no realized window). The motion-notify and
-show-clicked handlers need a realized window / window action group and are out
-of scope here. Relevant to issue #182.
+in-memory cairo surface (no realized window). Hover hit-testing only needs the
+widget allocation, which is mocked. The show-clicked handler needs a window
+action group and is out of scope here. Relevant to issue #182.
 """
+import os
+
 import cairo
+import numpy as np
 import pytest
 
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
 from gi.repository import GLib
 
 from dtool_lookup_gui.widgets.graph_widget import (
     DtoolGraphWidget,
+    arrow_geometry,
     circle,
+    export_graph,
     square,
     triangle,
 )
-from dtool_lookup_gui.models.simple_graph import SimpleGraph
+from dtool_lookup_gui.models.simple_graph import GraphLayout, LayeredGraphLayout, SimpleGraph
+from dtool_lookup_gui.utils.layout_cache import LayoutCache
 
 
 def _surface_context():
@@ -61,8 +70,9 @@ def _graph_with_all_kinds():
 def widget():
     w = DtoolGraphWidget()
     yield w
-    # The graph setter installs a GLib timeout; remove it so it does not leak
-    # into the shared default main context used by other tests.
+    # The graph setter installs a GLib timeout and starts a layout worker
+    # thread; remove both so they do not leak into other tests.
+    w._cancel_layout_worker()
     if w._timer is not None:
         GLib.source_remove(w._timer)
         w._timer = None
@@ -79,6 +89,42 @@ def test_shape_helpers_emit_paths():
     assert context.copy_path() is not None
 
 
+def test_consecutive_circles_are_separate_sub_paths():
+    context = _surface_context()
+    circle(context, 0.0, 0.0)
+    circle(context, 5.0, 5.0)
+    # Each circle starts with its own MOVE_TO, no line connects them.
+    path_types = [path_type for path_type, _ in context.copy_path()]
+    assert path_types.count(cairo.PATH_MOVE_TO) == 2
+    assert cairo.PATH_LINE_TO not in path_types
+
+
+def test_arrow_geometry_matches_per_edge_computation():
+    positions = np.array([[0.0, 0.0], [3.0, 4.0], [-2.0, 1.0]])
+    i_n = np.array([1, 2])
+    j_n = np.array([0, 0])
+    line_start, line_end, tip, head_left, head_right = arrow_geometry(positions, i_n, j_n)
+
+    for n, (i, j) in enumerate(zip(i_n, j_n)):
+        ij = positions[i] - positions[j]
+        normal = ij / np.linalg.norm(ij)
+        perpendicular = np.array([normal[1], -normal[0]])
+        i_pos = positions[i] - 0.5 * normal
+        j_pos = positions[j] + 0.5 * normal
+        np.testing.assert_allclose(line_start[n], i_pos - 0.05 * normal)
+        np.testing.assert_allclose(line_end[n], j_pos + 0.1 * normal)
+        np.testing.assert_allclose(tip[n], i_pos)
+        np.testing.assert_allclose(head_left[n], i_pos - 0.2 * normal - 0.2 * perpendicular)
+        np.testing.assert_allclose(head_right[n], i_pos - 0.2 * normal + 0.2 * perpendicular)
+
+
+def test_arrow_geometry_skips_degenerate_edges():
+    positions = np.array([[1.0, 1.0], [1.0, 1.0], [2.0, 1.0]])
+    line_start, _, _, _, _ = arrow_geometry(positions, np.array([0, 2]), np.array([1, 0]))
+    assert line_start.shape == (1, 2)
+    assert np.all(np.isfinite(line_start))
+
+
 # --- properties ------------------------------------------------------------
 
 def test_search_by_uuid_round_trip(widget):
@@ -113,32 +159,248 @@ def test_on_draw_renders_all_vertex_kinds_and_edges(widget):
     widget.on_draw(widget, _surface_context())
 
 
+def test_on_draw_renders_graph_without_edges(widget):
+    graph = SimpleGraph()
+    graph.add_vertex(uuid="u-root", name="root", kind="root")
+    widget.graph = graph
+    widget.on_draw(widget, _surface_context())
+
+
 def test_on_draw_renders_highlighted_vertex(widget):
     graph = _graph_with_all_kinds()
     widget.graph = graph
     # Mark one vertex active to exercise the highlighted (stroked) branch.
-    graph.set_vertex_properties("state", [True, False, False])
+    widget._set_vertex_state(0, True)
     widget.on_draw(widget, _surface_context())
 
 
+# --- hover -----------------------------------------------------------------
+
+def _hover(widget, x, y):
+    """Move the pointer to user coordinates (x, y) of the graph."""
+    area = MagicMock()
+    area.get_allocated_width.return_value = 200
+    area.get_allocated_height.return_value = 100
+    s, tx, ty = widget._transformation(area)
+    widget.on_motion_notify(area, SimpleNamespace(x=s * (x + tx), y=s * (y + ty)))
+
+
+def test_hover_highlights_vertex_under_pointer(widget):
+    graph = _graph_with_all_kinds()
+    widget.graph = graph
+    widget.pause_layout()
+    widget._popover = MagicMock()
+
+    x, y = widget._positions[2]
+    _hover(widget, x + 0.1, y - 0.1)
+    assert graph.get_vertex_properties("state") == [False, False, True]
+    assert widget._vertex_state.tolist() == [False, False, True]
+    assert widget._current_uuid == "u-missing"
+    widget._popover.show.assert_called_once()
+    assert widget._popover.name == "missing"
+
+    # Moving away from all vertices clears the highlight and hides the popover.
+    _hover(widget, x + 100, y + 100)
+    assert not any(graph.get_vertex_properties("state"))
+    widget._popover.hide.assert_called()
+
+
+def test_spatial_index_follows_layout_snapshots(widget):
+    widget.graph = _graph_with_all_kinds()
+    widget.pause_layout()
+    index = widget._get_spatial_index()
+    assert widget._get_spatial_index() is index
+    widget._positions = widget._positions + 1.0
+    assert widget._get_spatial_index() is not index
+
+
+# --- export ----------------------------------------------------------------
+
+@pytest.mark.parametrize("fmt, magic", [("svg", b"<?xml"), ("pdf", b"%PDF"), ("png", b"\x89PNG")])
+def test_export_graph_writes_format_of_extension(tmp_path, fmt, magic):
+    filename = str(tmp_path / f"graph.{fmt}")
+    positions = np.array([[0.0, 0.0], [2.0, 0.0], [0.0, 2.0]])
+    kind = np.array(["root", "dependent", "does-not-exist"], dtype=object)
+    export_graph(filename, positions, kind, np.array([1, 2]), np.array([0, 0]),
+                 labels=["root", "dep", "missing"])
+    with open(filename, "rb") as f:
+        assert f.read(len(magic)) == magic
+
+
+def test_export_graph_png_size_follows_scale_and_labels(tmp_path):
+    positions = np.array([[0.0, 0.0], [4.0, 0.0]])
+    kind = np.array(["root", "dependent"], dtype=object)
+    edges = np.array([1]), np.array([0])
+    export_graph(str(tmp_path / "plain.png"), positions, kind, *edges, scale=10)
+    plain = cairo.ImageSurface.create_from_png(str(tmp_path / "plain.png"))
+    assert (plain.get_width(), plain.get_height()) == (60, 20)
+
+    export_graph(str(tmp_path / "labels.png"), positions, kind, *edges, scale=10,
+                 labels=["a rather long dataset name", "b"])
+    labelled = cairo.ImageSurface.create_from_png(str(tmp_path / "labels.png"))
+    assert labelled.get_width() > plain.get_width()
+    assert labelled.get_height() > plain.get_height()
+
+
+def test_export_graph_rejects_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        export_graph(str(tmp_path / "graph.jpg"), np.zeros((1, 2)),
+                     np.array(["root"], dtype=object), np.array([], dtype=int), np.array([], dtype=int))
+
+
+@pytest.mark.asyncio
+async def test_widget_export_relaxes_layout_and_caches_it(widget, tmp_path):
+    widget.layout_cache = LayoutCache(directory=str(tmp_path))
+    graph = _graph_with_all_kinds()
+    widget.graph = graph
+    widget.pause_layout()
+    # Small graphs converge quickly, start over from an unrelaxed layout
+    widget._layout = GraphLayout(graph, init_iter=0)
+
+    filename = str(tmp_path / "graph.svg")
+    await widget.export(filename, labels=True)
+    assert os.path.getsize(filename) > 0
+    # The export relaxed the layout to convergence, showing the graph again reuses it
+    assert widget.layout_cache.lookup(graph) is not None
+
+
+@pytest.mark.asyncio
+async def test_widget_export_without_graph_raises(widget, tmp_path):
+    with pytest.raises(ValueError):
+        await widget.export(str(tmp_path / "graph.svg"))
+
+
 # --- misc handlers ---------------------------------------------------------
 
 def test_on_realize_is_noop(widget):
     widget.on_realize(widget)
 
 
-def test_on_timeout_iterates_layout_and_reschedules(widget):
+def test_on_timeout_picks_up_worker_snapshot_and_reschedules(widget):
     widget.graph = _graph_with_all_kinds()
+    worker = widget._layout_worker
+    worker.join(timeout=0.5)  # let the worker publish a few snapshots
     # Returns True so the GLib timeout keeps firing.
     assert widget.on_timeout(widget) is True
+    assert widget._drawn_generation == worker.generation
+    assert widget._positions.shape == (3, 2)
 
 
-def test_on_timeout_swallows_layout_errors(widget):
-    class BadLayout:
-        def iterate(self):
-            raise RuntimeError("boom")
+def test_on_timeout_without_graph_stops_timer(widget):
+    assert widget.on_timeout(widget) is False
+    assert widget._timer is None
 
-    widget._layout = BadLayout()
-    # Errors during a layout step are logged, not raised, and the timeout
-    # keeps rescheduling.
-    assert widget.on_timeout(widget) is True
+
+def test_on_timeout_stops_timer_once_layout_converged(widget):
+    widget.graph = _graph_with_all_kinds()
+    worker = widget._layout_worker
+    worker.join(timeout=10)  # small graphs converge quickly
+    assert not worker.is_running
+    assert widget._layout.converged
+    # The last snapshot is drawn, then the timer removes itself.
+    assert widget.on_timeout(widget) is False
+    assert widget._timer is None
+    assert widget._drawn_generation == worker.generation
+
+
+def test_converged_layout_is_cached_and_reused(widget, tmp_path):
+    widget.layout_cache = LayoutCache(directory=str(tmp_path))
+    widget.graph = _graph_with_all_kinds()
+    widget._layout_worker.join(timeout=10)
+    assert widget.on_timeout(widget) is False
+    converged_positions = widget._positions
+
+    # Showing the same graph again starts from the converged positions.
+    widget.graph = _graph_with_all_kinds()
+    np.testing.assert_array_equal(widget._positions, converged_positions)
+
+
+def test_layered_layout_engine_is_final_and_not_cached(widget, tmp_path):
+    widget.layout_cache = LayoutCache(directory=str(tmp_path))
+    widget.layout_engine = 'layered'
+    widget.graph = _graph_with_all_kinds()
+    assert isinstance(widget._layout, LayeredGraphLayout)
+    # Positions are available right away, parents are placed above children
+    assert widget._positions[0, 1] < widget._positions[1, 1]
+    widget._layout_worker.join(timeout=10)
+    assert widget.on_timeout(widget) is False
+    assert widget.layout_cache.lookup(widget.graph) is None
+
+
+def test_switching_layout_engine_lays_out_current_graph_anew(widget):
+    widget.graph = _graph_with_all_kinds()
+    assert isinstance(widget._layout, GraphLayout)
+    old_worker = widget._layout_worker
+    widget.layout_engine = 'layered'
+    assert isinstance(widget._layout, LayeredGraphLayout)
+    assert widget._layout_worker is not old_worker
+    with pytest.raises(ValueError):
+        widget.layout_engine = 'circular'
+    assert widget.layout_engine == 'layered'
+
+
+def test_pause_and_resume_layout(widget):
+    widget.graph = _graph_with_all_kinds()
+    widget.pause_layout()
+    assert widget._timer is None
+    assert widget._layout_worker.is_cancelled
+
+    old_worker = widget._layout_worker
+    old_worker.join(timeout=5)
+    widget.resume_layout()
+    assert widget._timer is not None
+    assert widget._layout_worker is not old_worker
+    assert widget._layout_worker.layout is widget._layout
+
+
+class _StoppingWorker:
+    """Cancelled worker that is still finishing its relaxation step"""
+    is_cancelled = True
+    is_running = True
+
+    def cancel(self):
+        pass
+
+
+def test_resume_layout_waits_for_cancelled_worker_without_blocking(widget):
+    widget.graph = _graph_with_all_kinds()
+    widget.pause_layout()
+    widget._layout_worker.join(timeout=5)
+    stopping_worker = _StoppingWorker()
+    widget._layout_worker = stopping_worker
+
+    widget.resume_layout()
+    # no new worker while the old one still runs, but a check for it to stop
+    assert widget._layout_worker is stopping_worker
+    assert widget._restart_timer is not None
+    assert widget.on_restart_timeout(stopping_worker) is True
+
+    stopping_worker.is_running = False
+    assert widget.on_restart_timeout(stopping_worker) is False
+    assert widget._restart_timer is None
+    assert widget._layout_worker is not stopping_worker
+    assert widget._layout_worker.layout is widget._layout
+    assert widget._timer is not None
+
+
+def test_unmap_pauses_and_map_resumes_layout(widget):
+    widget.graph = _graph_with_all_kinds()
+    widget.on_unmap(widget)
+    assert widget._timer is None
+    widget.on_map(widget)
+    assert widget._timer is not None
+
+
+def test_resume_layout_without_graph_is_noop(widget):
+    widget.resume_layout()
+    assert widget._timer is None
+    assert widget._layout_worker is None
+
+
+def test_setting_new_graph_cancels_previous_layout_worker(widget):
+    widget.graph = _graph_with_all_kinds()
+    old_worker = widget._layout_worker
+    widget.graph = _graph_with_all_kinds()
+    old_worker.join(timeout=5)
+    assert not old_worker.is_running
+    assert widget._layout_worker is not old_worker
@@ -0,0 +1,142 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Unit tests for the destination hash index (models.hash_index) and
+deduplicating dataset copies.
+
+Datasets are created on disk in temporary directories; the index is
+persisted as JSON in a separate temporary directory.
+"""
+import os
+import shutil
+
+import pytest
+
+import dtoolcore
+from dtoolcore import ProtoDataSet, generate_admin_metadata
+from dtoolcore.storagebroker import DiskStorageBroker
+from dtoolcore.utils import generous_parse_uri
+
+from dtool_lookup_gui.models.datasets import parallel_copy
+from dtool_lookup_gui.models.hash_index import HashIndex
+
+
+def _create_dataset(base_uri, name, contents):
+    """Create frozen dataset with items relpath -> text content."""
+    admin_metadata = generate_admin_metadata(name)
+    uri = DiskStorageBroker.generate_uri(name=name, uuid=admin_metadata["uuid"], base_uri=str(base_uri))
+    proto_dataset = ProtoDataSet(uri=uri, admin_metadata=admin_metadata, config_path=None)
+    proto_dataset.create()
+    proto_dataset.put_readme("")
+    staging = os.path.join(str(base_uri), f'.staging-{name}')
+    os.makedirs(staging)
+    for relpath, content in contents.items():
+        fpath = os.path.join(staging, relpath)
+        with open(fpath, 'w') as f:
+            f.write(content)
+        proto_dataset.put_item(fpath, relpath)
+    proto_dataset.freeze()
+    return uri
+
+
+@pytest.fixture
+def index_directory(tmp_path):
+    return str(tmp_path / "index")
+
+
+def test_update_indexes_hashes_of_all_datasets(tmp_path, index_directory):
+    uri = _create_dataset(tmp_path, "a", {"x.txt": "x", "y.txt": "y"})
+    index = HashIndex(str(tmp_path), directory=index_directory)
+    index.update()
+    dataset = dtoolcore.DataSet.from_uri(uri)
+    hash_function = dataset._manifest["hash_function"]
+    for identifier in dataset.identifiers:
+        item_hash = dataset.item_properties(identifier)["hash"]
+        assert index.lookup(hash_function, item_hash) == (dataset.uri, identifier)
+    assert index.lookup("other-hash-function", item_hash) is None
+    assert len(index) == 2
+
+
+def test_index_persists_and_forgets_removed_datasets(tmp_path, index_directory):
+    _create_dataset(tmp_path, "a", {"x.txt": "x"})
+    HashIndex(str(tmp_path), directory=index_directory).update()
+
+    index = HashIndex(str(tmp_path), directory=index_directory)
+    index.load()
+    assert len(index) == 1
+
+    dataset, = dtoolcore.iter_datasets_in_base_uri(str(tmp_path))
+    shutil.rmtree(generous_parse_uri(dataset.uri).path)
+    index.update()
+    assert len(index) == 0
+
+
+def test_update_reads_datasets_with_given_configuration(tmp_path, index_directory, monkeypatch):
+    _create_dataset(tmp_path, "a", {"x.txt": "x"})
+    config_paths = []
+    from_uri = dtoolcore.DataSet.from_uri
+
+    def tracking_from_uri(uri, config_path=None):
+        config_paths.append(config_path)
+        return from_uri(uri, config_path=config_path)
+
+    monkeypatch.setattr(dtoolcore.DataSet, "from_uri", tracking_from_uri)
+    config_path = str(tmp_path / "dtool.json")
+    HashIndex(str(tmp_path), directory=index_directory).update(config_path)
+    assert config_paths == [config_path]
+
+
+def test_save_leaves_no_temporary_files(tmp_path, index_directory):
+    _create_dataset(tmp_path, "a", {"x.txt": "x"})
+    index = HashIndex(str(tmp_path), directory=index_directory)
+    index.update()
+    index.save()
+    assert os.listdir(index_directory) == [os.path.basename(index.path)]
+
+
+def test_deduplicating_copy_takes_items_from_destination(tmp_path, index_directory, monkeypatch):
+    src_base = tmp_path / "src"
+    dest_base = tmp_path / "dest"
+    src_base.mkdir()
+    dest_base.mkdir()
+    _create_dataset(dest_base, "old", {"same.txt": "unchanged content"})
+    src_uri = _create_dataset(src_base, "new", {"same.txt": "unchanged content", "new.txt": "new content"})
+
+    monkeypatch.setattr("dtool_lookup_gui.models.hash_index._default_cache_directory", lambda: index_directory)
+    transferred = []
+    item_content_abspath = dtoolcore.DataSet.item_content_abspath
+
+    def tracking_item_content_abspath(self, identifier):
+        if self.uri == src_uri:
+            transferred.append(self.item_properties(identifier)["relpath"])
+        return item_content_abspath(self, identifier)
+
+    monkeypatch.setattr(dtoolcore.DataSet, "item_content_abspath", tracking_item_content_abspath)
+
+    dest_uri = parallel_copy(src_uri, str(dest_base), max_workers=2, deduplicate=True)
+
+    assert transferred == ["new.txt"]
+    src = dtoolcore.DataSet.from_uri(src_uri)
+    dest = dtoolcore.DataSet.from_uri(dest_uri)
+    for identifier in src.identifiers:
+        assert dest.item_properties(identifier)["hash"] == src.item_properties(identifier)["hash"]
@@ -0,0 +1,143 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Unit tests for the dependency graph layout cache (utils.layout_cache).
+
+Layouts are keyed by the vertex UUIDs and edges of a graph and persisted as
+JSON in a temporary directory.
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+from dtool_lookup_gui.models.simple_graph import SimpleGraph
+from dtool_lookup_gui.utils.layout_cache import LayoutCache, graph_key, place_new_vertices
+
+
+def _provenance_graph(nb_children, root="root"):
+    g = SimpleGraph()
+    g.add_vertex(uuid=root, name=root, kind="root")
+    for i in range(nb_children):
+        v = g.add_vertex(uuid=f"child-{i}", name=f"child {i}", kind="dependent")
+        g.add_edge(v, 0)
+    return g
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LayoutCache(directory=str(tmp_path))
+
+
+def test_graph_key_ignores_vertex_order():
+    a = SimpleGraph()
+    a.add_vertex(uuid="x")
+    a.add_vertex(uuid="y")
+    a.add_edge(1, 0)
+    b = SimpleGraph()
+    b.add_vertex(uuid="y")
+    b.add_vertex(uuid="x")
+    b.add_edge(0, 1)
+    assert graph_key(a) == graph_key(b)
+
+
+def test_graph_key_depends_on_edges():
+    a = _provenance_graph(2)
+    b = _provenance_graph(2)
+    b.add_edge(2, 1)
+    assert graph_key(a) != graph_key(b)
+
+
+def test_graph_key_requires_uuids():
+    g = SimpleGraph()
+    g.add_vertex(name="anonymous")
+    assert graph_key(g) is None
+
+
+def test_lookup_of_unknown_graph_returns_none(cache):
+    assert cache.lookup(_provenance_graph(3)) is None
+
+
+def test_stored_layout_is_returned_as_is(cache):
+    g = _provenance_graph(3)
+    positions = np.array([[0., 0.], [2., 0.], [0., 2.], [-2., 0.]])
+    cache.store(g, positions)
+    np.testing.assert_array_equal(cache.lookup(_provenance_graph(3)), positions)
+
+
+def test_stored_layout_persists_on_disk(tmp_path):
+    g = _provenance_graph(3)
+    positions = np.array([[0., 0.], [2., 0.], [0., 2.], [-2., 0.]])
+    LayoutCache(directory=str(tmp_path)).store(g, positions)
+    np.testing.assert_array_equal(LayoutCache(directory=str(tmp_path)).lookup(g), positions)
+
+
+def test_corrupt_cache_file_is_ignored(tmp_path):
+    g = _provenance_graph(1)
+    (tmp_path / f"{graph_key(g)}.json").write_text("{not json")
+    assert LayoutCache(directory=str(tmp_path)).lookup(g) is None
+
+
+def test_layout_of_grown_graph_is_seeded_from_root(cache):
+    positions = np.array([[0., 0.], [2., 0.], [0., 2.]])
+    cache.store(_provenance_graph(2), positions)
+
+    grown = _provenance_graph(3)
+    seeded = cache.lookup(grown)
+    assert seeded.shape == (4, 2)
+    np.testing.assert_array_equal(seeded[:3], positions)
+    # The new child is placed at equilibrium distance from its parent.
+    assert np.linalg.norm(seeded[3] - seeded[0]) == pytest.approx(2.0)
+
+
+def test_place_new_vertices_without_placed_neighbors():
+    g = SimpleGraph()
+    for i in range(3):
+        g.add_vertex(uuid=str(i))
+    positions = place_new_vertices(g, np.full((3, 2), np.nan))
+    assert np.all(np.isfinite(positions))
+    assert len(np.unique(positions, axis=0)) == 3
+
+
+def test_cache_keeps_the_most_recently_used_layouts(tmp_path):
+    cache = LayoutCache(directory=str(tmp_path), max_layouts=2)
+    graphs = [_provenance_graph(1, root=f"root-{i}") for i in range(3)]
+    for graph in graphs:
+        # without a root vertex, only the layout of the exact graph is stored
+        graph.vertex_properties[0]["kind"] = "dependent"
+    positions = np.array([[0., 0.], [2., 0.]])
+    cache.store(graphs[0], positions)
+    cache.store(graphs[1], positions)
+    # make the files distinguishable by their modification time
+    now = time.time()
+    os.utime(tmp_path / f"{graph_key(graphs[0])}.json", (now - 20, now - 20))
+    os.utime(tmp_path / f"{graph_key(graphs[1])}.json", (now - 10, now - 10))
+
+    # using the first layout keeps it, the second one is dropped for the third
+    assert cache.lookup(graphs[0]) is not None
+    cache.store(graphs[2], positions)
+
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{graph_key(graph)}.json" for graph in (graphs[0], graphs[2]))
+    assert cache.lookup(graphs[1]) is None
+    assert LayoutCache(directory=str(tmp_path)).lookup(graphs[0]) is not None
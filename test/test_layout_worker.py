@@ -0,0 +1,102 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Unit tests for the background layout relaxation (utils.layout_worker).
+
+The worker iterates a GraphLayout in a daemon thread and publishes position
+snapshots. No GTK is involved.
+"""
+import numpy as np
+
+from dtool_lookup_gui.models.simple_graph import SimpleGraph, GraphLayout
+from dtool_lookup_gui.utils.layout_worker import GraphLayoutWorker
+
+
+def _chain_layout(nb_vertices=10):
+    g = SimpleGraph()
+    for i in range(nb_vertices):
+        g.add_vertex(uuid=f"u{i}")
+    for i in range(nb_vertices - 1):
+        g.add_edge(i + 1, i)
+    return GraphLayout(g, init_iter=0)
+
+
+def test_worker_publishes_snapshots_until_cancelled():
+    layout = _chain_layout()
+    layout.fmax = layout.etol = 0  # never converge
+    worker = GraphLayoutWorker(layout, nb_fast_iterations=20, interval=0.01)
+    assert worker.generation == 0
+    initial = worker.positions.copy()
+
+    worker.start()
+    worker.join(timeout=0.2)
+    assert worker.is_running
+
+    worker.cancel()
+    worker.join(timeout=5)
+    assert not worker.is_running
+    assert worker.nb_iterations >= 20
+    assert worker.generation == worker.nb_iterations
+    assert worker.positions.shape == initial.shape
+    assert not np.allclose(worker.positions, initial)
+
+
+def test_snapshots_are_independent_of_layout_positions():
+    layout = _chain_layout()
+    layout.fmax = layout.etol = 0  # never converge
+    worker = GraphLayoutWorker(layout, nb_fast_iterations=5, interval=10)
+    worker.start()
+    worker.join(timeout=0.5)  # worker now idles in its paced phase
+    snapshot = worker.positions
+    assert snapshot is not layout.positions
+    np.testing.assert_array_equal(snapshot, layout.positions)
+    worker.cancel()
+    worker.join(timeout=5)
+    assert not worker.is_running
+
+
+def test_worker_stops_once_layout_converged():
+    layout = _chain_layout(3)
+    worker = GraphLayoutWorker(layout, nb_fast_iterations=1000)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_running
+    assert not worker.is_cancelled
+    assert layout.converged
+    np.testing.assert_array_equal(worker.positions, layout.positions)
+
+
+def test_worker_stops_on_layout_error():
+    class BadLayout:
+        positions = np.zeros((2, 2))
+        graph = SimpleGraph()
+
+        def iterate(self):
+            raise RuntimeError("boom")
+
+    worker = GraphLayoutWorker(BadLayout())
+    worker.start()
+    worker.join(timeout=5)
+    # Errors are logged, not raised, and no snapshot is published.
+    assert not worker.is_running
+    assert worker.generation == 0
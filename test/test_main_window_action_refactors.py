@@ -198,6 +198,86 @@ async def test_do_copy_dataset_no_selection_does_nothing(running_app):
     await asyncio.sleep(0.1)
 
 
+@pytest.mark.asyncio
+async def test_do_copy_datasets_calls_copy_batch(populated_app_with_local_dataset_data, local_dataset_uri):
+    """copy-datasets action must hand all listed datasets to CopyManager.copy_batch()."""
+    windows = populated_app_with_local_dataset_data.get_windows()
+    main_window = [w for w in windows if isinstance(w, MainWindow)][0]
+
+    main_window.activate_action('refresh-view')
+    start = time.time()
+    while time.time() - start < 10:
+        if len(main_window.dataset_list_box.get_children()) > 0:
+            break
+        await asyncio.sleep(0.1)
+
+    rows = main_window.dataset_list_box.get_children()
+    assert rows
+    source_uris = [str(row.dataset) for row in rows]
+    destination_uri = "file:///tmp/copy-test-dest"
+
+    batch_calls = []
+
+    async def mock_copy_batch(datasets, destination, plan=None):
+        batch_calls.append(([str(dataset) for dataset in datasets], destination))
+
+    with patch.object(main_window._copy_manager, 'copy_batch', side_effect=mock_copy_batch):
+        main_window.activate_action(
+            'copy-datasets',
+            GLib.Variant.new_tuple(
+                GLib.Variant.new_strv(source_uris + ["file:///nonexistent"]),
+                GLib.Variant.new_string(destination_uri),
+            )
+        )
+        await asyncio.sleep(0.5)
+
+    assert batch_calls == [(source_uris, destination_uri)]
+
+
+@pytest.mark.asyncio
+async def test_do_resume_interrupted_copies(running_app):
+    """resume-interrupted-copies action must copy every journaled dataset again."""
+    windows = running_app.get_windows()
+    main_window = [w for w in windows if isinstance(w, MainWindow)][0]
+
+    journal = main_window._copy_manager.journal
+    journal.add("file:///src/a", "file:///tmp/copy-test-dest", name="a")
+
+    copy_calls = []
+
+    async def mock_copy(dataset, destination):
+        copy_calls.append((str(dataset), dataset.name, destination))
+
+    with patch.object(main_window._copy_manager, 'copy', side_effect=mock_copy):
+        main_window.activate_action('resume-interrupted-copies')
+        await asyncio.sleep(0.5)
+
+    assert copy_calls == [("file:///src/a", "a", "file:///tmp/copy-test-dest")]
+    assert journal.entries == []
+
+
+@pytest.mark.asyncio
+async def test_copies_frozen_at_destination_are_not_offered_for_resume(running_app):
+    """Journaled copies whose destination holds the frozen dataset by now are dropped."""
+    windows = running_app.get_windows()
+    main_window = [w for w in windows if isinstance(w, MainWindow)][0]
+
+    journal = main_window._copy_manager.journal
+    journal.clear()
+    journal.add("file:///src/a", "file:///tmp/copy-test-dest", name="a", dataset_uuid="uuid-a")
+    journal.add("file:///src/b", "file:///tmp/copy-test-dest", name="b", dataset_uuid="uuid-b")
+    journal.add("file:///src/c", "file:///tmp/copy-test-dest", name="c")
+
+    async def get_copy_state(self, target_base_uri):
+        return 'dataset' if self.name == 'a' else 'protodataset'
+
+    with patch.object(DatasetModel, 'get_copy_state', get_copy_state):
+        await main_window._forget_finished_copies()
+
+    assert [entry['name'] for entry in journal.entries] == ['b', 'c']
+    journal.clear()
+
+
 # ---------------------------------------------------------------------------
 # add-local-directory action
 # ---------------------------------------------------------------------------
@@ -29,6 +29,7 @@ delegate to. Assertions are grouped per handler family to limit the number of
 (slow) app activations. The modal file-chooser handlers (open-local-directory,
 add-items) use Gtk dialog.run() and are out of scope.
 """
+import asyncio
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -79,14 +80,20 @@ async def test_selection_and_search_handlers_activate_actions(running_app):
 
         dataset_row = MagicMock()
         dataset_row.get_index.return_value = 5
-        main_window.on_dataset_selected(None, dataset_row)
+        dataset_list_box = MagicMock()
+        dataset_list_box.get_selected_rows.return_value = [dataset_row]
+        main_window.on_dataset_selection_changed(dataset_list_box)
 
         main_window.search_entry.set_text("toluene")
         main_window.on_search_activate(None)
 
-        # The None-row branches must be no-ops (no extra action activations).
+        # The None-row and empty selection branches must be no-ops (no extra action activations).
         main_window.on_base_uri_selected(None, None)
-        main_window.on_dataset_selected(None, None)
+        dataset_list_box.get_selected_rows.return_value = []
+        main_window.on_dataset_selection_changed(dataset_list_box)
+        # Several selected datasets do not replace the details either
+        dataset_list_box.get_selected_rows.return_value = [dataset_row, MagicMock()]
+        main_window.on_dataset_selection_changed(dataset_list_box)
 
     activated = [call.args[0] for call in activate.call_args_list]
     assert activated == ["show-base-uri", "show-dataset", "search-select-show"]
@@ -96,6 +103,23 @@ async def test_selection_and_search_handlers_activate_actions(running_app):
     assert search_call.args[1].get_string() == "toluene"
 
 
+@pytest.mark.asyncio
+async def test_single_dataset_actions_are_disabled_while_several_datasets_are_selected(running_app):
+    main_window = _main_window(running_app)
+    dataset_list_box = MagicMock()
+    with patch.object(main_window, "activate_action"):
+        dataset_list_box.get_selected_rows.return_value = [MagicMock(), MagicMock()]
+        main_window.on_dataset_selection_changed(dataset_list_box)
+        assert not any(main_window.lookup_action(name).get_enabled()
+                       for name in MainWindow._single_dataset_actions)
+        assert not main_window.freeze_button.get_sensitive()
+        assert not main_window.add_items_button.get_sensitive()
+
+        dataset_list_box.get_selected_rows.return_value = [MagicMock()]
+        main_window.on_dataset_selection_changed(dataset_list_box)
+    assert all(main_window.lookup_action(name).get_enabled() for name in MainWindow._single_dataset_actions)
+
+
 @pytest.mark.asyncio
 async def test_refresh_dropdown_and_show_handlers(running_app):
     main_window = _main_window(running_app)
@@ -292,3 +316,114 @@ async def test_on_copy_clicked_activates_copy_dataset(running_app):
         source, destination = activate.call_args.args[1].unpack()
         assert source == "file:///src"
         assert destination == "s3://dest"
+
+
+@pytest.mark.asyncio
+async def test_dataset_list_edge_loads_adjacent_page(running_app):
+    main_window = _main_window(running_app)
+    main_window.search_state.last_page = 3
+    main_window.search_state.reset_loaded_pages(2, 10)
+    search_results_row = main_window.base_uri_list_box.search_results_row
+
+    with patch.object(main_window.base_uri_list_box, "get_selected_row",
+                      return_value=search_results_row), \
+            patch.object(main_window, "_fetch_adjacent_page", MagicMock()) as fetch, \
+            patch.object(main_window, "_create_task_with_error_handling") as create_task, \
+            patch("dtool_lookup_gui.views.main_window.settings") as mock_settings:
+        mock_settings.infinite_scroll = False
+        main_window._on_dataset_list_edge_reached(Gtk.PositionType.BOTTOM)
+        create_task.assert_not_called()
+
+        mock_settings.infinite_scroll = True
+        main_window._on_dataset_list_edge_reached(Gtk.PositionType.BOTTOM)
+        main_window._on_dataset_list_edge_reached(Gtk.PositionType.TOP)
+        assert [c.args for c in fetch.call_args_list] == [(3, True), (1, False)]
+        assert create_task.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_show_base_uri_datasets_updates_list_of_same_base_uri(running_app):
+    main_window = _main_window(running_app)
+    on_show = MagicMock()
+    with patch.object(main_window.dataset_list_box, "fill") as fill, \
+            patch.object(main_window.dataset_list_box, "update") as update, \
+            patch.object(main_window.dataset_list_box, "get_selected_row", return_value=None):
+        main_window._show_base_uri_datasets("file:///data", ["a"], on_show=on_show)
+        fill.assert_called_once_with(["a"], on_show=on_show)
+        update.assert_not_called()
+
+        # the same base URI again is reconciled in place
+        main_window._show_base_uri_datasets("file:///data", ["a", "b"], on_show=on_show)
+        update.assert_called_once_with(["a", "b"])
+        fill.assert_called_once()
+        # nothing selected any more, hence on_show runs
+        on_show.assert_called_once_with(["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_selecting_dataset_row_replaces_selection(running_app):
+    main_window = _main_window(running_app)
+    row = MagicMock()
+    list_box = MagicMock()
+    list_box.get_row_at_index.return_value = row
+    with patch.object(main_window, "dataset_list_box", list_box):
+        main_window._select_dataset_row_by_row_index(4)
+    assert [call[0] for call in list_box.method_calls] == ["get_row_at_index", "unselect_all", "select_row"]
+    list_box.select_row.assert_called_once_with(row)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("infinite_scroll, nb_shown", [(False, 100), (True, 150)])
+async def test_search_results_are_capped_without_infinite_scroll(running_app, infinite_scroll, nb_shown):
+    main_window = _main_window(running_app)
+    search_results_row = main_window.base_uri_list_box.search_results_row
+    datasets = [MagicMock() for _ in range(150)]
+
+    async def get_datasets_page(page_number, pagination, sorting):
+        return datasets
+
+    with patch.object(main_window.base_uri_list_box, "get_selected_row",
+                      return_value=search_results_row), \
+            patch.object(main_window, "_get_datasets_page", side_effect=get_datasets_page), \
+            patch.object(main_window, "_update_search_summary"), \
+            patch.object(main_window, "_update_main_statusbar"), \
+            patch.object(main_window.dataset_list_box, "fill") as fill, \
+            patch("dtool_lookup_gui.views.main_window.settings") as mock_settings:
+        mock_settings.infinite_scroll = infinite_scroll
+        await main_window._fetch_search_results()
+
+    assert fill.call_args.args[0] == datasets[:nb_shown]
+    assert main_window.search_state.loaded_pages == [main_window.search_state.current_page]
+
+
+@pytest.mark.asyncio
+async def test_adjacent_page_of_outdated_search_is_dropped(running_app):
+    main_window = _main_window(running_app)
+    main_window.search_state.last_page = 3
+    main_window.search_state.reset_loaded_pages(1, 10)
+    search_results_row = main_window.base_uri_list_box.search_results_row
+    page_requested = asyncio.Event()
+    release_page = asyncio.Event()
+
+    async def get_datasets_page(page_number, pagination, sorting):
+        page_requested.set()
+        await release_page.wait()
+        return [MagicMock()]
+
+    with patch.object(main_window.base_uri_list_box, "get_selected_row",
+                      return_value=search_results_row), \
+            patch.object(main_window, "_get_datasets_page", side_effect=get_datasets_page), \
+            patch.object(main_window.dataset_list_box, "append_datasets") as append_datasets:
+        fetch = asyncio.ensure_future(main_window._fetch_adjacent_page(2))
+        await asyncio.wait_for(page_requested.wait(), 10)
+
+        # a new search starts while the page of the previous one is still on its way
+        main_window.search_state.invalidate_results()
+        main_window.search_state.fetching_results = True
+        release_page.set()
+        await asyncio.wait_for(fetch, 10)
+
+    append_datasets.assert_not_called()
+    assert main_window.search_state.loaded_pages == [1]
+    assert main_window.search_state.fetching_results is True
+    main_window.search_state.fetching_results = False
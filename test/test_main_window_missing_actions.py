@@ -28,6 +28,7 @@ Covers:
   - select-base-uri / show-base-uri
   - select-dataset-by-uri / show-dataset / show-dataset-by-uri
   - build-dependency-graph / build-dependency-graph-by-uri
+  - dependency-graph-layout / export-dependency-graph
   - create-dataset / freeze-dataset / add-item
   - delete-tag / delete-annotation
   - copy-dataset
@@ -201,6 +202,27 @@ async def test_build_dependency_graph_by_uri_action_trigger(populated_app_with_m
     mock.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_dependency_graph_layout_action_switches_engine(populated_app_with_mock_data):
+    """'dependency-graph-layout' selects the layout engine of the graph widget."""
+    mw = _get_main_window(populated_app_with_mock_data)
+    assert mw.get_action_state('dependency-graph-layout').get_string() == 'force'
+    mw.change_action_state('dependency-graph-layout', GLib.Variant.new_string('layered'))
+    assert mw.dependency_graph_widget.layout_engine == 'layered'
+    assert mw.get_action_state('dependency-graph-layout').get_string() == 'layered'
+
+
+@pytest.mark.asyncio
+async def test_export_dependency_graph_action_dispatches_to_widget(populated_app_with_mock_data, tmp_path):
+    """'export-dependency-graph' exports the graph widget's graph to the given file."""
+    mw = _get_main_window(populated_app_with_mock_data)
+    filename = str(tmp_path / "graph.pdf")
+    with patch.object(mw.dependency_graph_widget, 'export', new_callable=AsyncMock) as mock:
+        mw.activate_action('export-dependency-graph', GLib.Variant("(sb)", (filename, True)))
+        await asyncio.sleep(0.1)
+    mock.assert_awaited_once_with(filename, labels=True)
+
+
 # ===========================================================================
 # create-dataset
 # ===========================================================================
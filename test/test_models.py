@@ -30,10 +30,13 @@ the cached code paths are tested directly and the one remote helper is
 monkeypatched.
 """
 import os
+import shutil
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
 import dtoolcore
+from dtoolcore.storagebroker import DiskStorageBroker
 from dtoolcore.utils import generous_parse_uri, write_config_value_to_file
 
 from dtool_lookup_gui.models.settings import settings
@@ -45,6 +48,7 @@ from dtool_lookup_gui.models.base_uris import (
     LookupBaseURIModel,
 )
 from dtool_lookup_gui.models.datasets import (
+    CopyFuncWrapper,
     DatasetModel,
     _info,
     _load_dataset,
@@ -52,7 +56,15 @@ from dtool_lookup_gui.models.datasets import (
     _list_proto_datasets,
     _mangle_lookup_manifest,
     _lookup_info,
+    _ThreadLocalDatasets,
+    parallel_copy,
+    parallel_copy_resume,
+    ItemSizeProgressBar,
+    TransferProgress,
+    plan_batch_copy,
+    plan_copy,
 )
+from dtool_lookup_gui.utils.bandwidth import BandwidthLimit
 
 
 @pytest.fixture
@@ -414,3 +426,226 @@ async def test_get_item_unknown_uuid_raises(local_dataset_uri):
     m = DatasetModel.from_uri(local_dataset_uri)
     with pytest.raises(ValueError):
         await m.get_item("nonexistent-uuid")
+
+
+# --- parallel copy ----------------------------------------------------------
+
+class _CountingProgressBar:
+    def __init__(self):
+        self.steps = 0
+        self.label = None
+        self.item_show_func = None
+
+    def update(self, step):
+        self.steps += step
+
+
+def test_parallel_copy_matches_source(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    src = _load_dataset(local_dataset_uri)
+    src.put_tag("copied")
+    src.put_annotation("project", "test")
+    pb = _CountingProgressBar()
+
+    dest_uri = parallel_copy(local_dataset_uri, str(dest_base), progressbar=pb, max_workers=2)
+
+    dest = dtoolcore.DataSet.from_uri(dest_uri)
+    assert dest.uuid == src.uuid
+    assert dest.identifiers == src.identifiers
+    for identifier in src.identifiers:
+        assert dest.item_properties(identifier)["hash"] == src.item_properties(identifier)["hash"]
+    assert dest.list_tags() == ["copied"]
+    assert dest.get_annotation("project") == "test"
+    assert dest._admin_metadata["frozen_at"] == src._admin_metadata["frozen_at"]
+    # one step per transferred item and one per item hashed during freeze
+    assert pb.steps == 2 * len(list(src.identifiers))
+
+
+def test_parallel_copy_resume_completes_proto_dataset(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    src = _load_dataset(local_dataset_uri)
+    proto = dtoolcore._copy_create_proto_dataset(src, str(dest_base))
+    first = sorted(src.identifiers)[0]
+    proto.put_item(src.item_content_abspath(first), src.item_properties(first)["relpath"])
+
+    dest_uri = parallel_copy_resume(local_dataset_uri, str(dest_base), max_workers=2)
+
+    dest = dtoolcore.DataSet.from_uri(dest_uri)
+    assert dest.identifiers == _load_dataset(local_dataset_uri).identifiers
+
+
+def test_item_size_progress_bar_reports_bytes():
+    pb = _CountingProgressBar()
+    item_size_pb = ItemSizeProgressBar(pb, {"a": 10, "b": 1000})
+    item_size_pb.item_show_func = lambda x: "b"
+    item_size_pb.update(1)
+    assert pb.steps == 1000
+    item_size_pb.item_show_func = lambda x: "unknown"
+    item_size_pb.update(1)
+    assert pb.steps == 1505
+
+
+def test_item_size_progress_bar_counts_skipped_items_with_their_size(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    src = _load_dataset(local_dataset_uri)
+    proto = dtoolcore._copy_create_proto_dataset(src, str(dest_base))
+    first = next(iter(src.identifiers))
+    proto.put_item(src.item_content_abspath(first), src.item_properties(first)["relpath"])
+    plan = plan_copy(local_dataset_uri, str(dest_base))
+    pb = _CountingProgressBar()
+
+    # the serial resume of dtoolcore reports the skipped item without item_show_func
+    dtoolcore.copy_resume(local_dataset_uri, str(dest_base), progressbar=ItemSizeProgressBar(pb, plan.item_sizes))
+
+    # every byte is counted once when transferred (or skipped) and once when hashed
+    assert pb.steps == 2 * plan.num_bytes
+
+
+def test_transfer_progress_does_not_count_hashing_as_transfer():
+    progressbar = MagicMock()
+    transfer_progress = TransferProgress(progressbar, 100)
+    transfer_progress.set_step(60, 200)
+    transfer_progress.set_step(150, 200)
+    assert progressbar.set_step.call_args_list == [call(60, 200, transferred=60), call(150, 200, transferred=100)]
+
+
+def test_plan_batch_copy_skips_existing_and_orders_by_size(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    existing = DatasetModel.from_uri(local_dataset_uri)
+    parallel_copy(local_dataset_uri, str(dest_base), max_workers=1)
+
+    small = DatasetModel(dataset_info={"name": "small", "uuid": "00000000-0000-0000-0000-000000000001",
+                                       "size_int": 10})
+    large = DatasetModel(dataset_info={"name": "large", "uuid": "00000000-0000-0000-0000-000000000002",
+                                       "size_int": 1000})
+    to_copy, skipped = plan_batch_copy([small, existing, large], str(dest_base))
+
+    assert to_copy == [large, small]
+    assert skipped == [existing]
+
+
+@pytest.mark.asyncio
+async def test_get_copy_state_tells_frozen_from_unfinished_copies(local_dataset_uri, tmp_path):
+    dataset = DatasetModel.from_uri(local_dataset_uri)
+    (tmp_path / "frozen").mkdir()
+    (tmp_path / "proto").mkdir()
+    (tmp_path / "empty").mkdir()
+    parallel_copy(local_dataset_uri, str(tmp_path / "frozen"), max_workers=1)
+    dtoolcore._copy_create_proto_dataset(_load_dataset(local_dataset_uri), str(tmp_path / "proto"))
+
+    assert await dataset.get_copy_state(str(tmp_path / "frozen")) == 'dataset'
+    assert await dataset.get_copy_state(str(tmp_path / "proto")) == 'protodataset'
+    assert await dataset.get_copy_state(str(tmp_path / "empty")) is None
+
+
+@pytest.mark.asyncio
+async def test_copy_without_bandwidth_rate_uses_serial_engine(local_dataset_uri, tmp_path):
+    copy_funcs = []
+
+    def record_copy_func(copy_func):
+        copy_funcs.append(copy_func)
+        return CopyFuncWrapper(copy_func)
+
+    dataset = DatasetModel.from_uri(local_dataset_uri)
+    (tmp_path / "unlimited").mkdir()
+    (tmp_path / "limited").mkdir()
+    with patch("dtool_lookup_gui.models.datasets.CopyFuncWrapper", side_effect=record_copy_func):
+        await dataset.copy(str(tmp_path / "unlimited"), max_workers=1, deduplicate=False,
+                           bandwidth_limits=(BandwidthLimit(0.),))
+        await dataset.copy(str(tmp_path / "limited"), max_workers=1, deduplicate=False,
+                           bandwidth_limits=(BandwidthLimit(0.), BandwidthLimit(1e12)))
+
+    assert copy_funcs[0] is dtoolcore.copy
+    assert copy_funcs[1].func is parallel_copy
+    assert len(copy_funcs[1].keywords['bandwidth_limits']) == 1
+
+
+def test_plan_copy_reads_manifest_once(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    src = _load_dataset(local_dataset_uri)
+
+    real_get_manifest = DiskStorageBroker.get_manifest
+    real_get_admin_metadata = DiskStorageBroker.get_admin_metadata
+    with patch.object(DiskStorageBroker, "get_manifest", autospec=True,
+                      side_effect=real_get_manifest) as get_manifest, \
+            patch.object(DiskStorageBroker, "get_admin_metadata", autospec=True,
+                         side_effect=real_get_admin_metadata) as get_admin_metadata:
+        plan = plan_copy(local_dataset_uri, str(dest_base))
+        dest_uri = parallel_copy(plan.src_uri, plan.target_base_uri, max_workers=2, manifest=plan.manifest,
+                                 admin_metadata=plan.admin_metadata)
+    assert get_manifest.call_count == 1
+    # the source admin metadata is read once as well, further reads are of the destination
+    src_abspath = generous_parse_uri(local_dataset_uri).path
+    assert len([call for call in get_admin_metadata.call_args_list
+                if os.path.samefile(call.args[0]._abspath, src_abspath)]) == 1
+
+    assert not plan.resume
+    assert plan.num_items == len(list(src.identifiers))
+    assert plan.num_bytes == sum(src.item_properties(i)["size_in_bytes"] for i in src.identifiers)
+    assert plan.free_bytes > 0
+    assert dtoolcore.DataSet.from_uri(dest_uri).identifiers == src.identifiers
+
+
+def test_thread_local_datasets_are_set_up_in_the_thread_using_them(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    src = _load_dataset(local_dataset_uri)
+    proto_dataset = dtoolcore._copy_create_proto_dataset(src, str(dest_base))
+    manifest = src._manifest
+    identifier = next(iter(src.identifiers))
+    item_abspath = src.item_content_abspath(identifier)
+    with patch.object(dtoolcore.DataSet, "from_uri") as from_uri, \
+            patch.object(DiskStorageBroker, "get_manifest") as get_manifest:
+        thread_datasets = _ThreadLocalDatasets(local_dataset_uri, proto_dataset.uri, None,
+                                               manifest, src._admin_metadata)
+        from_uri.assert_not_called()
+        src_dataset = thread_datasets.src_dataset
+        assert thread_datasets.src_dataset is src_dataset
+        assert src_dataset.item_content_abspath(identifier) == item_abspath
+    from_uri.assert_not_called()
+    get_manifest.assert_not_called()
+    assert thread_datasets.dest_proto_dataset.uri == proto_dataset.uri
+
+
+def test_plan_copy_resumes_or_refuses_existing(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    src = _load_dataset(local_dataset_uri)
+    dtoolcore._copy_create_proto_dataset(src, str(dest_base))
+
+    assert plan_copy(local_dataset_uri, str(dest_base)).resume
+    with pytest.raises(FileExistsError):
+        plan_copy(local_dataset_uri, str(dest_base), auto_resume=False)
+
+
+def test_plan_copy_checks_free_space(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+
+    with patch("shutil.disk_usage", return_value=shutil._ntuple_diskusage(100, 100, 0)):
+        with pytest.raises(OSError, match="Not enough space"):
+            plan_copy(local_dataset_uri, str(dest_base))
+
+
+def test_parallel_copy_obeys_bandwidth_limit(local_dataset_uri, tmp_path):
+    dest_base = tmp_path / "dest"
+    dest_base.mkdir()
+    src = _load_dataset(local_dataset_uri)
+    sizes = [src.item_properties(i)["size_in_bytes"] for i in src.identifiers]
+    now = [0.]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    rate = 1000.
+    limit = BandwidthLimit(rate, clock=lambda: now[0], sleep=sleep)
+    dest_uri = parallel_copy(local_dataset_uri, str(dest_base), max_workers=1, bandwidth_limits=(limit,))
+
+    assert dtoolcore.DataSet.from_uri(dest_uri).identifiers == src.identifiers
+    # every item but the last one delays the transfers after it
+    assert now[0] >= (sum(sizes) - max(sizes)) / rate
@@ -29,7 +29,7 @@ GTK widget tree is needed.
 """
 from unittest.mock import MagicMock
 
-from dtool_lookup_gui.utils.progressbar import ProgressBar
+from dtool_lookup_gui.utils.progressbar import ProgressBar, ThroughputEstimator, format_duration, format_throughput
 
 
 # --- no-widget (logging-only) behaviour ------------------------------------
@@ -101,3 +101,58 @@ def test_without_label_hides_widget_text():
     with ProgressBar(length=10, pb=widget):
         pass
     widget.set_show_text.assert_called_with(False)
+
+
+def test_zero_length_update_reports_completion():
+    widget = MagicMock()
+    bar = ProgressBar(length=0, pb=widget)
+    bar.update(0)
+    widget.set_fraction.assert_called_with(1.)
+
+
+# --- throughput ---------------------------------------------------------------
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+def test_throughput_estimator_constant_rate():
+    clock = _Clock()
+    estimator = ThroughputEstimator(clock=clock)
+    assert estimator.rate is None
+    for step in range(0, 10_000_000, 1_000_000):
+        estimator.update(step)
+        clock.now += 0.5
+    assert estimator.rate == 2_000_000
+    assert estimator.eta(4_000_000) == 2.
+
+
+def test_throughput_estimator_smooths_bursts():
+    clock = _Clock()
+    estimator = ThroughputEstimator(time_constant=5., clock=clock)
+    estimator.update(0)
+    clock.now = 1.
+    estimator.update(1_000_000)
+    clock.now = 1.1
+    estimator.update(11_000_000)  # a burst of 100 MB/s for 0.1 s
+    assert 1_000_000 < estimator.rate < 100_000_000 / 10
+
+
+def test_throughput_estimator_without_rate_has_no_eta():
+    assert ThroughputEstimator().eta(100) is None
+
+
+def test_format_duration():
+    assert format_duration(12.4) == '12s'
+    assert format_duration(185) == '3m 05s'
+    assert format_duration(3 * 3600 + 120) == '3h 02m'
+
+
+def test_format_throughput():
+    assert format_throughput(None, None) == ''
+    assert format_throughput(2.5e6, None) == '2.5 MB/s'
+    assert format_throughput(2.5e6, 65) == '2.5 MB/s, 1m 05s left'
@@ -0,0 +1,91 @@
+#
+# Copyright 2026 Johannes Laurin Hörmann
+#
+# ### MIT license
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""Tests for the local provenance index of directly accessed base URIs."""
+import pytest
+
+from dtool_lookup_gui.models.provenance_index import ProvenanceIndex, _values_at
+from dtool_lookup_gui.utils.dependency_graph import DependencyGraph
+
+ROOT = "11111111-1111-1111-1111-111111111111"
+CHILD = "22222222-2222-2222-2222-222222222222"
+GRANDCHILD = "33333333-3333-3333-3333-333333333333"
+UNRELATED = "44444444-4444-4444-4444-444444444444"
+MISSING = "55555555-5555-5555-5555-555555555555"
+
+
+def _info(uuid, readme_content='', annotations=None):
+    return {'uuid': uuid, 'name': f'dataset-{uuid[0]}', 'uri': f'file:///data/{uuid}',
+            'readme_content': readme_content, 'annotations': annotations or {}}
+
+
+def _index():
+    return ProvenanceIndex.from_datasets([
+        _info(ROOT),
+        _info(CHILD, f"derived_from:\n  - uuid: {ROOT}\n"),
+        _info(GRANDCHILD, f"derived_from:\n  - uuid: {CHILD}\n  - uuid: {MISSING}\n"),
+        _info(UNRELATED, "description: [not, a, mapping"),
+    ])
+
+
+def test_values_at_descends_into_lists():
+    document = {'readme': {'derived_from': [{'uuid': 'a'}, {'name': 'x'}, {'uuid': ['b', 'c']}]}}
+    assert _values_at(document, 'readme.derived_from.uuid') == ['a', 'b', 'c']
+    assert _values_at(document, 'readme.missing.uuid') == []
+
+
+def test_parents_from_readme_and_annotations():
+    index = _index()
+    index.add(_info(UNRELATED, annotations={'source_dataset_uuid': ROOT}))
+    assert len(index) == 4
+    assert index.parents(CHILD) == [ROOT]
+    assert index.parents(GRANDCHILD) == [CHILD, MISSING]
+    assert index.parents(UNRELATED) == [ROOT]
+    assert index.parents(ROOT) == []
+    # Only the given dependency keys are followed
+    assert index.parents(UNRELATED, ['readme.derived_from.uuid']) == []
+
+
+@pytest.mark.asyncio
+async def test_get_graph_by_uuid_returns_connected_datasets():
+    index = _index()
+    pagination = {}
+    datasets = await index.get_graph_by_uuid(uuid=GRANDCHILD, pagination=pagination)
+    assert {d['uuid'] for d in datasets} == {ROOT, CHILD, GRANDCHILD}
+    assert pagination['last_page'] == 1
+    assert await index.get_graph_by_uuid(uuid=UNRELATED) == [
+        {'uuid': UNRELATED, 'name': 'dataset-4', 'uri': f'file:///data/{UNRELATED}', 'derived_from': []}]
+    assert await index.get_graph_by_uuid(uuid=MISSING) == []
+
+
+@pytest.mark.asyncio
+async def test_dependency_graph_traces_local_index():
+    dependency_graph = DependencyGraph()
+    await dependency_graph.trace_dependencies(_index(), ROOT)
+    graph = dependency_graph.graph
+    assert graph.nb_vertices == 4
+    assert graph.nb_edges == 3
+    assert dependency_graph.missing_uuids == [MISSING]
+    kinds = dict(zip(graph.get_vertex_properties('uuid'), graph.get_vertex_properties('kind')))
+    assert kinds[ROOT] == 'root'
+    assert kinds[MISSING] == 'does-not-exist'
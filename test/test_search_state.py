@@ -196,3 +196,49 @@ def test_previous_page_floors_at_first_page(state):
     state.last_page = 5
     state.current_page = 1
     assert state.previous_page == 1
+
+
+# --- pages loaded while scrolling ------------------------------------------
+
+def test_reset_pagination_forgets_loaded_pages(state):
+    state.reset_loaded_pages(1, 10)
+    state.reset_pagination()
+    assert state.loaded_pages == []
+    assert state.next_page_to_load is None
+    assert state.previous_page_to_load is None
+
+
+def test_pages_to_load_around_loaded_pages(state):
+    state.last_page = 5
+    state.reset_loaded_pages(3, 10)
+    assert state.previous_page_to_load == 2
+    assert state.next_page_to_load == 4
+    state.add_loaded_page(4, 10)
+    state.add_loaded_page(5, 7)
+    assert state.loaded_pages == [3, 4, 5]
+    assert state.current_page == 5
+    assert state.next_page_to_load is None
+    state.add_loaded_page(2, 10, append=False)
+    state.add_loaded_page(1, 10, append=False)
+    assert state.loaded_pages == [1, 2, 3, 4, 5]
+    assert state.previous_page_to_load is None
+
+
+def test_add_loaded_page_evicts_pages_at_opposite_end(state):
+    state._max_loaded_pages = 3
+    state.last_page = 9
+    state.reset_loaded_pages(1, 10)
+    assert state.add_loaded_page(2, 10) == 0
+    assert state.add_loaded_page(3, 10) == 0
+    assert state.add_loaded_page(4, 10) == 10
+    assert state.loaded_pages == [2, 3, 4]
+    assert state.previous_page_to_load == 1
+    assert state.add_loaded_page(1, 10, append=False) == 10
+    assert state.loaded_pages == [1, 2, 3]
+    assert state.current_page == 1
+
+
+def test_invalidate_results_changes_generation(state):
+    generation = state.results_generation
+    state.invalidate_results()
+    assert state.results_generation != generation
@@ -68,6 +68,27 @@ def test_get_base_uri_unknown_key_returns_none():
 # SettingsDialog signal handlers
 # ===========================================================================
 
+@pytest.mark.asyncio
+async def test_copy_settings_apply_to_running_copy_manager(running_app):
+    main_window = [w for w in running_app.get_windows() if isinstance(w, MainWindow)][0]
+    dialog = _settings_dialog(running_app)
+    try:
+        dialog.max_concurrent_copies_spin_button.set_value(5)
+        dialog.max_concurrent_copies_per_destination_spin_button.set_value(3)
+        dialog.copy_bandwidth_limit_per_copy_spin_button.set_value(2.5)
+        dialog.deduplicate_copies_switch.set_active(True)
+
+        assert settings.max_concurrent_copies == 5
+        assert settings.deduplicate_copies is True
+        copy_queue = main_window._copy_manager.copy_queue
+        assert (copy_queue.max_concurrent, copy_queue.max_concurrent_per_destination) == (5, 3)
+        assert main_window._copy_manager.bandwidth_limit_per_copy == 2.5e6
+    finally:
+        for key in ('max-concurrent-copies', 'max-concurrent-copies-per-destination',
+                    'copy-bandwidth-limit-per-copy', 'deduplicate-copies'):
+            settings.settings.reset(key)
+
+
 @pytest.mark.asyncio
 async def test_yaml_linting_switch_updates_settings(running_app):
     dialog = _settings_dialog(running_app)
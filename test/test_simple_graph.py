@@ -28,10 +28,14 @@ force optimization over it. Both are pure NumPy/SciPy with no GTK dependency.
 Layout positions are deterministic (grid initialization, no randomness), so the
 results are reproducible. Relevant to issue #182.
 """
+import tracemalloc
+
 import numpy as np
 import pytest
 
-from dtool_lookup_gui.models.simple_graph import SimpleGraph, GraphLayout
+from dtool_lookup_gui.models.simple_graph import (
+    SimpleGraph, GraphLayout, LayeredGraphLayout, UniformGrid, _cell_list_neighbors
+)
 
 
 def _make_graph(nb_vertices, edges=()):
@@ -136,3 +140,236 @@ def test_layout_relaxes_connected_pair_towards_equilibrium():
     layout = GraphLayout(g, equilibrium_distance=2.0, init_iter=300)
     distance = np.linalg.norm(layout.positions[0] - layout.positions[1])
     assert distance == pytest.approx(2.0, abs=0.5)
+
+
+def test_layout_reports_convergence():
+    g = _make_graph(2, [(0, 1)])
+    layout = GraphLayout(g, init_iter=0)
+    assert not layout.converged
+    for _ in range(500):
+        layout.iterate()
+        if layout.converged:
+            break
+    assert layout.converged
+    assert layout.max_force < 1
+
+
+def test_layout_convergence_thresholds():
+    g = _make_graph(4, [(0, 1), (1, 2), (2, 3)])
+    layout = GraphLayout(g, init_iter=5, fmax=0, etol=0)
+    # Vanishing thresholds are never met by a layout that still moves.
+    assert not layout.converged
+    layout = GraphLayout(g, init_iter=5, fmax=np.inf)
+    assert layout.converged
+
+
+# ===========================================================================
+# Cell-list cutoff for the Coulomb repulsion
+# ===========================================================================
+
+def _random_positions(nb_vertices, extent, seed=0):
+    return np.random.default_rng(seed).uniform(0, extent, size=(nb_vertices, 2))
+
+
+def test_cell_list_finds_exactly_the_pairs_within_cutoff():
+    pos = _random_positions(200, 20.0)
+    cutoff = 2.5
+    i_n, j_n = _cell_list_neighbors(pos, cutoff)
+
+    dist = np.linalg.norm(pos[:, None, :] - pos[None, :, :], axis=2)
+    i_ref, j_ref = np.nonzero((dist < cutoff) & ~np.eye(len(pos), dtype=bool))
+
+    assert sorted(zip(i_n, j_n)) == sorted(zip(i_ref, j_ref))
+
+
+def test_coulomb_cutoff_covering_layout_matches_exact():
+    # With a cutoff beyond the layout extent, every pair is within range. The
+    # forces are then identical to the exact sum and the energy differs only
+    # by the constant shift, i.e. energy differences (which FIRE relies on)
+    # agree.
+    g = _make_graph(30)
+    exact = GraphLayout(g, init_iter=0)
+    cut = GraphLayout(g, init_iter=0, cutoff=100.0)
+
+    pos_a = _random_positions(30, 10.0, seed=1)
+    pos_b = _random_positions(30, 10.0, seed=2)
+
+    e_exact_a, f_exact_a = exact._compute_coulomb_energy_and_forces(pos_a)
+    e_cut_a, f_cut_a = cut._compute_coulomb_energy_and_forces(pos_a)
+    e_exact_b, _ = exact._compute_coulomb_energy_and_forces(pos_b)
+    e_cut_b, _ = cut._compute_coulomb_energy_and_forces(pos_b)
+
+    np.testing.assert_allclose(f_cut_a, f_exact_a, rtol=1e-12, atol=1e-12)
+    assert e_cut_b - e_cut_a == pytest.approx(e_exact_b - e_exact_a, rel=1e-10)
+
+
+def test_coulomb_cutoff_conserves_energy():
+    # The shifted, truncated potential is conservative: the work done by the
+    # forces along a path equals the energy change. Pair energies enter the
+    # total twice (once per ordered pair), hence forces are -1/2 dE/dx.
+    g = _make_graph(40)
+    layout = GraphLayout(g, init_iter=0, cutoff=3.0)
+    pos = _random_positions(40, 12.0, seed=3)
+    displacement = 1e-3 * _random_positions(40, 1.0, seed=4)
+
+    nb_steps = 100
+    e_start, _ = layout._compute_coulomb_energy_and_forces(pos)
+    work = 0
+    for k in range(nb_steps):
+        midpoint = pos + (k + 0.5) / nb_steps * displacement
+        _, f = layout._compute_coulomb_energy_and_forces(midpoint)
+        work += np.sum(f * displacement) / nb_steps
+    e_end, _ = layout._compute_coulomb_energy_and_forces(pos + displacement)
+
+    assert -0.5 * (e_end - e_start) == pytest.approx(work, rel=1e-4)
+
+
+def test_layout_with_cutoff_relaxes_like_exact_layout():
+    edges = [(i, i + 1) for i in range(19)]
+    g = _make_graph(20, edges)
+    exact = GraphLayout(g, init_iter=200)
+    cut = GraphLayout(g, init_iter=200, cutoff=8.0)
+    assert np.all(np.isfinite(cut.positions))
+    # Neighboring vertices end up near the spring equilibrium in both cases.
+    for layout in (exact, cut):
+        bond_lengths = np.linalg.norm(np.diff(layout.positions, axis=0), axis=1)
+        assert np.all(bond_lengths < 2 * layout.equilibrium_distance)
+
+
+# ===========================================================================
+# UniformGrid spatial index
+# ===========================================================================
+
+def test_uniform_grid_closest_matches_brute_force():
+    pos = _random_positions(500, 30.0, seed=5)
+    grid = UniformGrid(pos, cell_size=1.0)
+    rng = np.random.default_rng(6)
+    for x, y in rng.uniform(-2, 32, size=(300, 2)):
+        dist_sq = np.sum((pos - [x, y]) ** 2, axis=1)
+        k = np.argmin(dist_sq)
+        expected = k if dist_sq[k] < 0.25 else None
+        assert grid.closest(x, y, 0.5) == expected
+
+
+def test_uniform_grid_empty_and_far_away_queries():
+    assert UniformGrid(np.zeros((0, 2))).closest(0, 0, 0.5) is None
+    grid = UniformGrid(np.array([[0.0, 0.0]]))
+    assert grid.closest(0.1, 0.1, 0.5) == 0
+    assert grid.closest(1e6, -1e6, 0.5) is None
+
+
+def test_uniform_grid_rejects_radius_beyond_cell_size():
+    grid = UniformGrid(np.array([[0.0, 0.0]]), cell_size=1.0)
+    with pytest.raises(ValueError):
+        grid.closest(0, 0, 2.0)
+
+
+# ===========================================================================
+# LayeredGraphLayout
+# ===========================================================================
+
+def _random_dag(nb_vertices, seed=0):
+    """Chain-like DAG, each vertex derived from one or two recent vertices."""
+    rng = np.random.default_rng(seed)
+    graph = SimpleGraph()
+    for i in range(nb_vertices):
+        graph.add_vertex(uuid=str(i))
+    for i in range(1, nb_vertices):
+        for j in set(rng.integers(max(0, i - 10), i, size=rng.integers(1, 3))):
+            graph.add_edge(i, int(j))
+    return graph
+
+
+def test_layered_layout_places_parents_above_children():
+    graph = _random_dag(200)
+    layout = LayeredGraphLayout(graph, layer_distance=2, vertex_distance=2)
+    pos = layout.positions
+    assert pos.shape == (200, 2)
+    for i, j in graph.edges:
+        assert pos[i, 1] >= pos[j, 1] + 2
+    # Vertices within the same layer keep the minimum distance
+    for y in np.unique(pos[:, 1]):
+        x = np.sort(pos[pos[:, 1] == y, 0])
+        assert np.all(np.diff(x) >= 2 - 1e-9)
+
+
+def test_layered_layout_is_deterministic_and_converged():
+    layout = LayeredGraphLayout(_random_dag(100, seed=3))
+    positions = layout.positions.copy()
+    assert layout.converged
+    layout.iterate()
+    np.testing.assert_array_equal(layout.positions, positions)
+    np.testing.assert_array_equal(LayeredGraphLayout(_random_dag(100, seed=3)).positions, positions)
+
+
+def test_layered_layout_straightens_chain():
+    graph = SimpleGraph()
+    for i in range(5):
+        graph.add_vertex()
+    for i in range(1, 5):
+        graph.add_edge(i, i - 1)
+    pos = LayeredGraphLayout(graph).positions
+    np.testing.assert_array_equal(pos[:, 0], 0)
+    np.testing.assert_array_equal(pos[:, 1], [0, 2, 4, 6, 8])
+
+
+def test_layered_layout_tolerates_cycles_and_empty_graphs():
+    graph = SimpleGraph()
+    for i in range(3):
+        graph.add_vertex()
+    graph.add_edge(0, 1)
+    graph.add_edge(1, 2)
+    graph.add_edge(2, 0)
+    pos = LayeredGraphLayout(graph).positions
+    assert pos.shape == (3, 2)
+    assert len(set(map(tuple, pos))) == 3
+    assert LayeredGraphLayout(SimpleGraph()).positions.shape == (0, 2)
+
+
+def test_coincident_vertices_yield_finite_energy_and_forces():
+    graph = SimpleGraph()
+    for i in range(3):
+        graph.add_vertex()
+    graph.add_edge(0, 1)
+    for cutoff in [None, 5.0]:
+        layout = GraphLayout(graph, init_iter=0, cutoff=cutoff)
+        pos = np.array([[0.0, 0.0], [0.0, 0.0], [3.0, 0.0]])
+        e_spring, f_spring = layout._compute_spring_energy_and_forces(pos)
+        e_coulomb, f_coulomb = layout._compute_coulomb_energy_and_forces(pos)
+        assert np.isfinite(e_spring) and np.isfinite(e_coulomb)
+        assert np.all(np.isfinite(f_spring)) and np.all(np.isfinite(f_coulomb))
+
+
+# ===========================================================================
+# Buffer reuse in FIRE iterations
+# ===========================================================================
+
+def _random_graph(nb_vertices, nb_edges, seed=0):
+    rng = np.random.default_rng(seed)
+    edges = {tuple(e) for e in rng.integers(0, nb_vertices, size=(nb_edges, 2)) if e[0] != e[1]}
+    return _make_graph(nb_vertices, edges)
+
+
+def test_iterate_reuses_buffers():
+    graph = _random_graph(200, 300, seed=7)
+    layout = GraphLayout(graph, init_iter=2)
+    positions, forces = layout.positions, layout._forces
+    # Per-pair temporaries live in scratch buffers; an iteration must not
+    # allocate anything that scales with the 200 * 199 vertex pairs
+    nb_pairs = 200 * 199
+    tracemalloc.start()
+    layout.iterate()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < nb_pairs * 8
+    assert layout.positions is positions
+    assert layout._forces is forces
+
+
+def test_single_precision_layout_relaxes():
+    graph = _random_graph(30, 40, seed=8)
+    exact = GraphLayout(graph, init_iter=50)
+    single = GraphLayout(graph, init_iter=50, dtype=np.float32)
+    assert single.positions.dtype == np.float32
+    assert single._forces.dtype == np.float32
+    np.testing.assert_allclose(single.energy, exact.energy, rtol=1e-3)
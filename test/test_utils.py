@@ -25,14 +25,18 @@
 
 These have no GTK dependency, so they run without the application fixtures.
 """
+import asyncio
 import datetime
 import os
+import time
 
 import pytest
 
 from dtool_lookup_gui.utils import query as query_utils
 from dtool_lookup_gui.utils.environ import TemporaryOSEnviron
 from dtool_lookup_gui.utils import date as date_utils
+from dtool_lookup_gui.utils.multiprocessing import StatusReportingChildProcessBuilder
+from dtool_lookup_gui.utils.bandwidth import BandwidthLimit, acquire_bandwidth
 
 
 # ---------------------------------------------------------------------------
@@ -209,3 +213,159 @@ def test_default_filter_excludes_known_noise():
                                "a perfectly ordinary message", None, None)
     assert f.filter(noisy) is False
     assert f.filter(normal) is True
+
+
+# ---------------------------------------------------------------------------
+# utils.multiprocessing
+# ---------------------------------------------------------------------------
+
+
+def _report_steps(steps, status_report_callback):
+    for n in range(steps):
+        status_report_callback.update(n)
+    return steps
+
+
+def _raise_error(status_report_callback):
+    status_report_callback.update(0)
+    raise ValueError("copy failed")
+
+
+def _exit_silently(status_report_callback):
+    os._exit(3)
+
+
+def _report_pid_and_hang(status_report_callback):
+    status_report_callback.update(os.getpid())
+    time.sleep(60)
+
+
+class _Reports:
+    def __init__(self):
+        self.reports = []
+
+    def update(self, report):
+        self.reports.append(report)
+
+
+@pytest.mark.asyncio
+async def test_child_process_forwards_all_status_reports():
+    handler = _Reports()
+    return_value = await StatusReportingChildProcessBuilder(_report_steps, handler)(1000)
+    assert return_value == 1000
+    assert handler.reports == list(range(1000))
+
+
+@pytest.mark.asyncio
+async def test_child_process_forwards_all_status_reports_without_add_reader(monkeypatch):
+    loop = asyncio.get_running_loop()
+
+    def add_reader(*args):
+        raise NotImplementedError
+
+    monkeypatch.setattr(loop, 'add_reader', add_reader)
+    handler = _Reports()
+    assert await StatusReportingChildProcessBuilder(_report_steps, handler)(100) == 100
+    assert handler.reports == list(range(100))
+
+
+@pytest.mark.asyncio
+async def test_child_process_exception_raises_child_process_error():
+    handler = _Reports()
+    with pytest.raises(ChildProcessError, match="copy failed"):
+        await StatusReportingChildProcessBuilder(_raise_error, handler)()
+    assert handler.reports == [0]
+
+
+@pytest.mark.asyncio
+async def test_child_process_terminating_silently_raises_child_process_error():
+    with pytest.raises(ChildProcessError, match="exit code 3"):
+        await asyncio.wait_for(StatusReportingChildProcessBuilder(_exit_silently, _Reports())(), 10)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_terminates_child_process():
+    reported = asyncio.Event()
+
+    class Handler:
+        pid = None
+
+        def update(self, pid):
+            self.pid = pid
+            reported.set()
+
+    handler = Handler()
+    task = asyncio.ensure_future(StatusReportingChildProcessBuilder(_report_pid_and_hang, handler)())
+    await asyncio.wait_for(reported.wait(), 10)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # the child has been terminated and reaped
+    with pytest.raises(ProcessLookupError):
+        os.kill(handler.pid, 0)
+
+
+# ---------------------------------------------------------------------------
+# utils.bandwidth
+# ---------------------------------------------------------------------------
+
+class _FakeTime:
+    def __init__(self):
+        self.now = 0.
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_bandwidth_limit_paces_transfers():
+    fake = _FakeTime()
+    limit = BandwidthLimit(100., clock=fake.clock, sleep=fake.sleep)
+    limit.acquire(100)
+    assert fake.now == 0.
+    limit.acquire(50)
+    assert fake.now == pytest.approx(1.)
+    limit.acquire(10)
+    assert fake.now == pytest.approx(1.5)
+    # waiting happens in short slices
+    assert max(fake.sleeps) <= 0.25
+
+
+def test_bandwidth_limit_rate_change_applies_to_waiting_transfer():
+    fake = _FakeTime()
+    limit = BandwidthLimit(10., clock=fake.clock, sleep=fake.sleep)
+    limit.acquire(1000)
+
+    def sleep(seconds):
+        fake.sleep(seconds)
+        if fake.now >= 1.:
+            limit.rate = 0.
+
+    limit._sleep = sleep
+    limit.acquire(1)
+    assert fake.now == pytest.approx(1.)
+
+
+def test_unlimited_bandwidth_does_not_wait():
+    fake = _FakeTime()
+    limits = [BandwidthLimit(clock=fake.clock, sleep=fake.sleep), BandwidthLimit(clock=fake.clock, sleep=fake.sleep)]
+    for _ in range(10):
+        acquire_bandwidth(limits, 10**9)
+    assert fake.sleeps == []
+
+
+def _report_rate(limit, status_report_callback):
+    status_report_callback.update(limit.rate)
+
+
+@pytest.mark.asyncio
+async def test_bandwidth_limit_is_shared_with_child_process():
+    limit = BandwidthLimit()
+    limit.rate = 1234.
+    handler = _Reports()
+    await StatusReportingChildProcessBuilder(_report_rate, handler)(limit)
+    assert handler.reports == [1234.]